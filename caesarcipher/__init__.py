@@ -1,12 +1,31 @@
-try:
-    from caesarcipher.caesarcipher import CaesarCipher
-    from caesarcipher.caesarcipher import CaesarCipherError
-except ImportError:
-    from caesarcipher import CaesarCipher
-    from caesarcipher import CaesarCipherError
-
 __title__ = 'caesarcipher'
 __version__ = '1.0'
 __author__ = 'Rob Spectre'
 __license__ = 'MIT'
 __copyright__ = 'Copyright 2014 Rob Spectre'
+
+# Where each public name lives.  They are imported on first use so entry
+# points like the co-process only load the modules they need.
+_exports = {
+    'CaesarCipher': 'caesarcipher.caesarcipher',
+    'CaesarCipherError': 'caesarcipher.caesarcipher',
+    'Codec': 'caesarcipher.codec',
+    'aencode': 'caesarcipher.aio',
+    'adecode': 'caesarcipher.aio',
+    'acrack_stream': 'caesarcipher.aio',
+}
+
+
+def __getattr__(name):
+    module = _exports.get(name)
+    if module is None:
+        raise AttributeError("module {0!r} has no attribute {1!r}".format(
+            __name__, name))
+    from importlib import import_module
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_exports))
@@ -0,0 +1,111 @@
+# Caesar shift and cracking over async iterables of chunks, for asyncio
+# applications reading ciphertext from sockets or HTTP bodies.
+import asyncio
+from functools import partial
+
+from caesarcipher.crack import CONFIDENCE
+from caesarcipher.engine import normalize_alphabet
+from caesarcipher.engine import shift
+from caesarcipher.incremental import IncrementalCracker
+
+
+# Chunks at least this long leave the event loop for an executor, in slices
+# of this size.  Shifting a slice takes about a millisecond; below that the
+# hand-off costs more than the event loop would wait.
+OFFLOAD_SIZE = 1 << 18
+
+
+def _slices(chunk, offload_size):
+    if len(chunk) < offload_size:
+        yield chunk
+        return
+    for start in range(0, len(chunk), offload_size):
+        yield chunk[start:start + offload_size]
+
+
+async def _run(executor, offload_size, function, chunk, *args):
+    if len(chunk) < offload_size:
+        return function(chunk, *args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor,
+                                      partial(function, chunk, *args))
+
+
+async def aencode(chunks, offset, alphabet=None, executor=None,
+                  offload_size=OFFLOAD_SIZE):
+    """Encodes an async iterable of chunks, yielding each as it is shifted.
+
+    Chunks of at least offload_size characters are split into slices of
+    that size, each shifted in an executor and yielded on its own.  A
+    single translate call holds the GIL until it returns, so slicing is
+    what keeps even a thread executor from stalling the event loop.
+
+    Args:
+        chunks: Async iterable of str or bytes.
+        offset: Integer by which to shift each letter.
+        alphabet: Iterable of characters, or None for the default alphabet.
+        executor: concurrent.futures executor, thread or process based, or
+            None for the event loop's default.
+        offload_size: Length from which chunks are sliced and shifted in the
+            executor.
+
+    Yields:
+        Encoded chunks of the same type as the input, in order.
+    """
+    alphabet = normalize_alphabet(alphabet)
+    async for chunk in chunks:
+        for piece in _slices(chunk, offload_size):
+            yield await _run(executor, offload_size, shift, piece, offset,
+                             alphabet)
+
+
+async def adecode(chunks, offset, alphabet=None, executor=None,
+                  offload_size=OFFLOAD_SIZE):
+    """Decodes an async iterable of chunks encoded with aencode()."""
+    async for chunk in aencode(chunks, -offset, alphabet, executor,
+                               offload_size):
+        yield chunk
+
+
+async def acrack_stream(chunks, frequency=None, alphabet=None,
+                        threshold=CONFIDENCE, executor=None,
+                        offload_size=OFFLOAD_SIZE, cracker=None):
+    """Cracks an async iterable of chunks while it is still arriving.
+
+    Chunks are held back until the offset is confidently known, as with
+    IncrementalCracker, then decoded and yielded as they arrive.  Large
+    chunks are sliced as in aencode().  Slices are counted on a thread of
+    the event loop's default executor, since the cracker's state lives in
+    this process; once the offset is locked they are decoded in the given
+    executor.
+
+    Args:
+        chunks: Async iterable of str or bytes.
+        frequency: Dict of lowercase letter to expected frequency, a
+            LanguageModel, or None for CaesarCipher.frequency.
+        alphabet: Iterable of characters, or None for the default alphabet.
+        threshold: Confidence at which the offset is locked.
+        executor: concurrent.futures executor to decode locked chunks in, or
+            None for the event loop's default.
+        offload_size: Length from which chunks leave the event loop.
+        cracker: IncrementalCracker to feed, for reading the offset
+            afterwards, or None for a new one.
+
+    Yields:
+        Plaintext chunks of the same type as the input, in order.
+    """
+    if cracker is None:
+        cracker = IncrementalCracker(frequency, alphabet, threshold)
+    async for chunk in chunks:
+        for piece in _slices(chunk, offload_size):
+            if cracker.locked:
+                plaintext = await _run(executor, offload_size, shift, piece,
+                                       -cracker.offset, cracker.alphabet)
+            else:
+                plaintext = await _run(None, offload_size, cracker.feed,
+                                       piece)
+            if plaintext:
+                yield plaintext
+    plaintext = cracker.close()
+    if plaintext:
+        yield plaintext
@@ -0,0 +1,414 @@
+# Registry of the engines that can shift and count text, and the rules for
+# picking one per call from the input's size, type and alphabet.
+import importlib.util
+import json
+import logging
+import os
+import platform
+from collections import OrderedDict
+from functools import lru_cache
+from functools import partial
+from timeit import default_timer
+
+from caesarcipher.crack import letter_counts
+from caesarcipher.engine import _compile_mapping
+from caesarcipher.engine import compile_byte_table
+from caesarcipher.engine import normalize_alphabet
+from caesarcipher.engine import shift
+from caesarcipher.shared import PARALLEL_THRESHOLD
+from caesarcipher.shared import parallel_shift
+
+
+OPERATIONS = ('shift', 'count')
+KINDS = ('str', 'bytes')
+
+# Engine used whenever no other has been calibrated to beat it.
+BASELINE = 'translate'
+
+# Crossover sizes used until calibrate() has been run on this machine, keyed
+# by 'operation/kind'.  An engine is picked for inputs of at least its size.
+DEFAULT_THRESHOLDS = {
+    'shift/str': {'multiprocess': PARALLEL_THRESHOLD},
+    'shift/bytes': {'multiprocess': PARALLEL_THRESHOLD},
+}
+
+# Input sizes timed by calibrate(), in characters or bytes.
+CALIBRATION_SIZES = (1 << 10, 1 << 14, 1 << 18, 1 << 22, 1 << 24)
+CALIBRATION_REPEATS = 3
+
+# An engine taking longer than this on one size is not timed on larger ones.
+MAX_SAMPLE_TIME = 0.1
+
+# How much faster than translate an engine must run to count as beating it,
+# so timing noise between equivalent engines does not flip the choice.
+MIN_SPEEDUP = 1.1
+
+CALIBRATION_TEXT = "The Quick Brown Fox jumps over the Lazy Dog. "
+
+
+class Backend(object):
+    def __init__(self, name, shift, count=None, accepts=None):
+        """One engine able to shift and count text.
+
+        Attributes:
+            name: Name the engine is registered and selected under.
+            shift: Callable taking (data, offset, alphabet, workers) and
+                returning shifted data of the same type.
+            count: Callable taking (data, alphabet) and returning letter
+                counts, or None if the engine only shifts.
+            accepts: Callable taking (data, alphabet) and returning True if
+                the engine handles that input, or None to accept anything.
+        """
+        self.name = name
+        self.shift = shift
+        self.count = count
+        self.accepts = accepts
+
+    def supports(self, operation, data, alphabet=None):
+        """Returns True if the engine can run an operation on an input."""
+        if getattr(self, operation) is None:
+            return False
+        return self.accepts is None or self.accepts(data, alphabet)
+
+    def __repr__(self):
+        return "Backend(name={0!r})".format(self.name)
+
+
+_backends = OrderedDict()
+
+
+def register(backend):
+    """Adds an engine to the registry, replacing any of the same name."""
+    _backends[backend.name] = backend
+    return backend
+
+
+def names():
+    """Returns the names of the registered engines, in registration order."""
+    return list(_backends)
+
+
+def get_backend(name):
+    """Returns the registered engine called name.
+
+    Raises:
+        ValueError: If no engine of that name is registered.
+    """
+    try:
+        return _backends[name]
+    except KeyError:
+        raise ValueError("Unknown engine {0!r}, choose from {1}.".format(
+            name, ', '.join(_backends)))
+
+
+def _kind(data):
+    return 'str' if isinstance(data, str) else 'bytes'
+
+
+def _python_shift(data, offset, alphabet=None, workers=None):
+    alphabet = normalize_alphabet(alphabet)
+    mapping = _compile_mapping(alphabet, offset % len(alphabet))
+    if isinstance(data, str):
+        return ''.join([mapping.get(character, character)
+                        for character in data])
+    table = compile_byte_table(alphabet, offset)
+    return type(data)([table[byte] for byte in data])
+
+
+def _python_count(data, alphabet=None):
+    alphabet = normalize_alphabet(alphabet)
+    binary = not isinstance(data, str)
+    positions = {}
+    for i, character in enumerate(alphabet):
+        for form in (character, character.upper()):
+            if len(form) == 1:
+                positions.setdefault(ord(form) if binary else form, i)
+    counts = [0] * len(alphabet)
+    for character in data:
+        position = positions.get(character)
+        if position is not None:
+            counts[position] += 1
+    return counts
+
+
+def _accepts_text(data, alphabet):
+    return isinstance(data, (str, bytes, bytearray)) and (
+        isinstance(data, str) or
+        compile_byte_table(alphabet, 0) is not None)
+
+
+def _translate_shift(data, offset, alphabet=None, workers=None):
+    return shift(data, offset, alphabet)
+
+
+def _numpy_shift(data, offset, alphabet=None, workers=None):
+    from caesarcipher import numpy_backend
+    if isinstance(data, str):
+        return numpy_backend.shift(data.encode('ascii'), offset,
+                                   alphabet).decode('ascii')
+    result = numpy_backend.shift(data, offset, alphabet)
+    if isinstance(data, bytearray):
+        return bytearray(result)
+    return result
+
+
+def _numpy_count(data, alphabet=None):
+    from caesarcipher import numpy_backend
+    if isinstance(data, str):
+        data = data.encode('ascii')
+    return numpy_backend.letter_counts(data, alphabet)
+
+
+@lru_cache(maxsize=None)
+def _numpy_installed():
+    # Found without importing NumPy, which would slow down every import of
+    # the package.
+    return importlib.util.find_spec('numpy') is not None
+
+
+def _numpy_accepts(data, alphabet):
+    # A str is only handled when it is pure ASCII, which it can report
+    # without scanning itself.
+    if isinstance(data, str) and not data.isascii():
+        return False
+    return (isinstance(data, (str, bytes, bytearray)) and
+            compile_byte_table(alphabet, 0) is not None and
+            _numpy_installed())
+
+
+def _multiprocess_shift(data, offset, alphabet=None, workers=None):
+    return parallel_shift(data, offset, alphabet, workers, threshold=0)
+
+
+def _multiprocess_accepts(data, alphabet):
+    return (isinstance(data, (str, bytes, bytearray)) and
+            compile_byte_table(alphabet, 0) is not None)
+
+
+register(Backend('python', _python_shift, _python_count, _accepts_text))
+register(Backend('translate', _translate_shift, letter_counts,
+                 _accepts_text))
+register(Backend('numpy', _numpy_shift, _numpy_count, _numpy_accepts))
+register(Backend('multiprocess', _multiprocess_shift, None,
+                 _multiprocess_accepts))
+
+
+def calibration_path():
+    """Returns where calibration results are cached.
+
+    Follows the XDG base directory specification: $XDG_CACHE_HOME, falling
+    back to ~/.cache.
+    """
+    root = os.environ.get('XDG_CACHE_HOME') or \
+        os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(root, 'caesarcipher', 'calibration.json')
+
+
+def fingerprint():
+    """Describes this machine, so results calibrated elsewhere are ignored."""
+    return {'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'numpy': _numpy_installed()}
+
+
+_thresholds = {}
+
+
+def load_thresholds(path=None):
+    """Returns the calibrated crossover sizes, or the defaults.
+
+    Results are read once per process and path.  Missing, unreadable or
+    stale calibrations fall back to DEFAULT_THRESHOLDS.
+
+    Args:
+        path: Calibration file, or None for calibration_path().
+
+    Returns:
+        Dict of 'operation/kind' to a dict of engine name to size.
+    """
+    path = path or calibration_path()
+    if path not in _thresholds:
+        thresholds = DEFAULT_THRESHOLDS
+        try:
+            with open(path) as handle:
+                calibration = json.load(handle)
+        except (OSError, ValueError):
+            calibration = None
+        if isinstance(calibration, dict) and \
+                calibration.get('fingerprint') == fingerprint():
+            thresholds = calibration['thresholds']
+        _thresholds[path] = thresholds
+    return _thresholds[path]
+
+
+def select_backend(operation, data, alphabet=None, engine=None,
+                   thresholds=None):
+    """Picks the engine to run an operation on an input with.
+
+    Of the engines that handle the input, the one calibrated for the
+    largest inputs not bigger than this one wins, falling back to the
+    translate engine.
+
+    Args:
+        operation: 'shift' or 'count'.
+        data: The input, as str or bytes.
+        alphabet: Iterable of characters, or None for the default alphabet.
+        engine: Name of an engine to use regardless of size, or None or
+            'auto' to choose.  Engines that lack the operation entirely
+            are chosen for automatically.
+        thresholds: Crossover sizes as from load_thresholds(), or None to
+            load them.
+
+    Returns:
+        Backend.
+
+    Raises:
+        ValueError: If the named engine is unknown or cannot handle the
+            input.
+    """
+    if engine not in (None, 'auto'):
+        backend = get_backend(engine)
+        if backend.supports(operation, data, alphabet):
+            return backend
+        # Engines without the operation at all, such as multiprocess for
+        # counting, leave it to automatic selection.
+        if getattr(backend, operation) is not None:
+            raise ValueError("Engine {0!r} cannot {1} this {2} with this "
+                             "alphabet.".format(engine, operation,
+                                                _kind(data)))
+    if thresholds is None:
+        thresholds = load_thresholds()
+    size = len(data)
+    chosen, chosen_size = _backends[BASELINE], 0
+    crossovers = thresholds.get(operation + '/' + _kind(data), {})
+    for name, crossover in crossovers.items():
+        backend = _backends.get(name)
+        if backend is None or crossover is None:
+            continue
+        if chosen_size <= crossover <= size and \
+                backend.supports(operation, data, alphabet):
+            chosen, chosen_size = backend, crossover
+    return chosen
+
+
+def crossover(timings, baseline, speedup=MIN_SPEEDUP):
+    """Finds the smallest size from which an engine keeps beating another.
+
+    Args:
+        timings: Dict of size to seconds for the engine.
+        baseline: Dict of size to seconds for the engine to beat.
+        speedup: Factor by which the engine must be faster.
+
+    Returns:
+        Integer size, or None if the engine is not faster on the largest
+        size the baseline was timed on.
+    """
+    result = None
+    for size in sorted(baseline, reverse=True):
+        if size not in timings or \
+                timings[size] * speedup > baseline[size]:
+            break
+        result = size
+    return result
+
+
+def _sample(kind, size):
+    text = (CALIBRATION_TEXT * (size // len(CALIBRATION_TEXT) + 1))[:size]
+    return text if kind == 'str' else text.encode('ascii')
+
+
+def _time(function, repeats=CALIBRATION_REPEATS):
+    best = None
+    for _ in range(repeats):
+        start = default_timer()
+        function()
+        elapsed = default_timer() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def calibrate(sizes=CALIBRATION_SIZES, path=None, workers=None):
+    """Times every engine and caches where each starts beating translate.
+
+    Engines are timed from the smallest size up, dropping each once a run
+    takes longer than MAX_SAMPLE_TIME, so slow engines cost little.
+
+    Args:
+        sizes: Input sizes to time, in characters or bytes.
+        path: File to cache the results in, or None for calibration_path().
+        workers: Number of processes for the multiprocess engine, or None
+            for one per CPU.
+
+    Returns:
+        Dict of crossover sizes, as from load_thresholds().
+    """
+    path = path or calibration_path()
+    thresholds = {}
+    for operation in OPERATIONS:
+        for kind in KINDS:
+            timings = dict((name, {}) for name in _backends)
+            slow = set()
+            for size in sorted(sizes):
+                data = _sample(kind, size)
+                for name, backend in _backends.items():
+                    if name in slow or not backend.supports(operation, data):
+                        continue
+                    if operation == 'shift':
+                        run = partial(backend.shift, data, 3, None, workers)
+                    else:
+                        run = partial(backend.count, data, None)
+                    timings[name][size] = _time(run)
+                    if timings[name][size] > MAX_SAMPLE_TIME:
+                        slow.add(name)
+            crossovers = {}
+            for name in _backends:
+                if name == BASELINE:
+                    continue
+                size = crossover(timings[name], timings[BASELINE])
+                if size is not None:
+                    crossovers[name] = size
+            thresholds[operation + '/' + kind] = crossovers
+            logging.debug("Crossovers for %s/%s: %s", operation, kind,
+                          crossovers)
+
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    with open(path, 'w') as handle:
+        json.dump({'fingerprint': fingerprint(), 'thresholds': thresholds},
+                  handle, indent=2, sort_keys=True)
+    _thresholds[path] = thresholds
+    return thresholds
+
+
+def main(argv=None):
+    """Runs the calibration from the command line."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="caesarcipher calibrate",
+        description="Time every engine and cache the input sizes from which "
+                    "each is picked automatically.")
+    parser.add_argument('--output', metavar="FILE",
+                        help="Cache the results in FILE instead of "
+                             "{0}.".format(calibration_path()))
+    parser.add_argument('-s', '--sizes', type=int, nargs='+',
+                        default=CALIBRATION_SIZES,
+                        help="Input sizes to time.")
+    parser.add_argument('-w', '--workers', type=int,
+                        help="Number of worker processes to time the "
+                             "multiprocess engine with.")
+    arguments = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    path = arguments.output or calibration_path()
+    thresholds = calibrate(arguments.sizes, path, arguments.workers)
+    for key in sorted(thresholds):
+        chosen = ', '.join("{0} from {1}".format(name, size) for name, size
+                           in sorted(thresholds[key].items(),
+                                     key=lambda item: item[1]))
+        logging.info("{0}: {1}".format(key, chosen or BASELINE + " always"))
+    logging.info("Saved calibration to {0}".format(path))
+    return 0
@@ -0,0 +1,94 @@
+from functools import partial
+from multiprocessing import Pool
+
+from caesarcipher.crack import crack_candidates
+from caesarcipher.engine import normalize_alphabet
+from caesarcipher.engine import shift
+from caesarcipher.language import english
+
+
+# Number of messages handed to a worker process at a time.  Short records are
+# cheap to cipher, so they are dispatched in large chunks to amortize pickling.
+CHUNKSIZE = 256
+
+
+def ordered_map(function, messages, workers=None, chunksize=CHUNKSIZE):
+    """Applies a picklable function to each message, yielding in order.
+
+    Runs in this process unless more than one worker is asked for, in
+    which case messages are sent to a process pool in chunks.
+    """
+    if not workers or workers == 1:
+        for message in messages:
+            yield function(message)
+        return
+
+    pool = Pool(workers)
+    try:
+        for result in pool.imap(function, messages, chunksize):
+            yield result
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _crack(message, frequency, alphabet):
+    return crack_candidates(message, frequency, alphabet=alphabet)[0].plaintext
+
+
+def encode_many(messages, offset, alphabet=None, workers=None,
+                chunksize=CHUNKSIZE):
+    """Encodes many messages with one offset.
+
+    Args:
+        messages: Iterable of str or bytes messages.
+        offset: Integer by which to shift each letter.
+        alphabet: Iterable of characters, or None for the default alphabet.
+        workers: Number of worker processes, or None to run in this process.
+        chunksize: Number of messages sent to a worker at a time.
+
+    Returns:
+        Iterator of encoded messages in input order.
+    """
+    function = partial(shift, offset=offset,
+                       alphabet=normalize_alphabet(alphabet))
+    return ordered_map(function, messages, workers, chunksize)
+
+
+def decode_many(messages, offset, alphabet=None, workers=None,
+                chunksize=CHUNKSIZE):
+    """Decodes many messages with one offset.
+
+    Args:
+        messages: Iterable of str or bytes messages.
+        offset: Integer the messages were encoded with.
+        alphabet: Iterable of characters, or None for the default alphabet.
+        workers: Number of worker processes, or None to run in this process.
+        chunksize: Number of messages sent to a worker at a time.
+
+    Returns:
+        Iterator of decoded messages in input order.
+    """
+    return encode_many(messages, -offset, alphabet, workers, chunksize)
+
+
+def crack_many(messages, alphabet=None, workers=None, chunksize=CHUNKSIZE,
+               frequency=None):
+    """Cracks many messages, each with its own unknown offset.
+
+    Args:
+        messages: Iterable of str or bytes messages.
+        alphabet: Iterable of characters, or None for the default alphabet.
+        workers: Number of worker processes, or None to run in this process.
+        chunksize: Number of messages sent to a worker at a time.
+        frequency: Dict of lowercase letter to expected frequency or a
+            LanguageModel, or None for the shared English model.
+
+    Returns:
+        Iterator of the most likely plaintexts in input order.
+    """
+    if frequency is None:
+        frequency = english()
+    function = partial(_crack, frequency=frequency,
+                       alphabet=normalize_alphabet(alphabet))
+    return ordered_map(function, messages, workers, chunksize)
@@ -0,0 +1,191 @@
+import argparse
+import json
+import logging
+import platform
+import sys
+from timeit import default_timer
+
+from caesarcipher.caesarcipher import CaesarCipher
+
+
+# Progress is reported on this logger so the library's own INFO logging can
+# stay silenced while timing.
+logger = logging.getLogger(__name__)
+
+
+# Message sizes in characters, from a tweet-sized record to a large file.
+SIZES = (10, 1000, 100000, 10000000, 100000000)
+
+OPERATIONS = ('encode', 'decode', 'crack')
+
+ALPHABETS = {
+    'default': None,
+    'custom': 'ueyplkizjgncdbqshoaxmrwftv',
+}
+
+CORPORA = {
+    'mixed': "The Quick Brown Fox jumps over the Lazy Dog while London "
+             "calls to the Faraway Towns. ",
+    'punctuation': "--> [x] {\"a\": 1, 'b': (2, 3)}; /* ok? */ #!@$%^&*_+=|~ "
+                   "<we> ... ",
+}
+
+# Fraction by which a benchmark may slow down before it counts as a
+# regression against the baseline.
+THRESHOLD = 0.2
+
+# Minimum wall time spent on each benchmark, repeating it as needed.
+MIN_TIME = 0.2
+MAX_REPEATS = 50
+
+
+def make_message(corpus, size):
+    """Returns a message of exactly size characters built from a corpus."""
+    sample = CORPORA[corpus]
+    return (sample * (size // len(sample) + 1))[:size]
+
+
+def _run_once(operation, message, alphabet):
+    if operation == 'encode':
+        CaesarCipher(message, offset=7, alphabet=alphabet).encoded
+    elif operation == 'decode':
+        CaesarCipher(message, offset=7, alphabet=alphabet).decoded
+    else:
+        CaesarCipher(message, alphabet=alphabet).cracked
+
+
+def time_operation(operation, message, alphabet=None, min_time=MIN_TIME,
+                   max_repeats=MAX_REPEATS):
+    """Times an operation, returning the best of several runs in seconds."""
+    best = None
+    spent = 0.0
+    repeats = 0
+    while repeats < max_repeats and (repeats == 0 or spent < min_time):
+        start = default_timer()
+        _run_once(operation, message, alphabet)
+        elapsed = default_timer() - start
+        spent += elapsed
+        repeats += 1
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def run(sizes=SIZES, operations=OPERATIONS, alphabets=None, corpora=None,
+        min_time=MIN_TIME):
+    """Runs the benchmark suite.
+
+    Args:
+        sizes: Iterable of message sizes in characters.
+        operations: Iterable of operation names from OPERATIONS.
+        alphabets: Iterable of names from ALPHABETS, or None for all.
+        corpora: Iterable of names from CORPORA, or None for all.
+        min_time: Minimum seconds spent repeating each benchmark.
+
+    Returns:
+        Dict suitable for JSON, with results keyed by benchmark name.
+    """
+    results = {}
+    for corpus in sorted(corpora or CORPORA):
+        for size in sizes:
+            message = make_message(corpus, size)
+            for alphabet in sorted(alphabets or ALPHABETS):
+                for operation in operations:
+                    name = "{0}/{1}/{2}/{3}".format(operation, corpus,
+                                                    alphabet, size)
+                    seconds = time_operation(operation, message,
+                                             ALPHABETS[alphabet], min_time)
+                    results[name] = {
+                        'operation': operation,
+                        'corpus': corpus,
+                        'alphabet': alphabet,
+                        'size': size,
+                        'seconds': seconds,
+                        'throughput': size / seconds if seconds else None,
+                    }
+                    logger.info("{0}: {1:.6f}s".format(name, seconds))
+    return {'python': platform.python_version(), 'results': results}
+
+
+def compare(current, baseline, threshold=THRESHOLD):
+    """Finds benchmarks that slowed down beyond a threshold.
+
+    Args:
+        current: Results from run().
+        baseline: Results from an earlier run().
+        threshold: Fraction of slowdown allowed before flagging.
+
+    Returns:
+        List of dicts describing each regression, sorted by name.
+    """
+    regressions = []
+    for name, result in sorted(current['results'].items()):
+        previous = baseline['results'].get(name)
+        if previous is None or not previous['seconds']:
+            continue
+        ratio = result['seconds'] / previous['seconds']
+        if ratio > 1 + threshold:
+            regressions.append({'name': name,
+                                'seconds': result['seconds'],
+                                'baseline': previous['seconds'],
+                                'ratio': ratio})
+    return regressions
+
+
+parser = argparse.ArgumentParser(prog="caesarcipher bench",
+                                 description="Benchmark encoding, decoding "
+                                             "and cracking.")
+parser.add_argument('-s', '--sizes', type=int, nargs='+', default=SIZES,
+                    help="Message sizes in characters to benchmark.")
+parser.add_argument('--operations', nargs='+', choices=OPERATIONS,
+                    default=OPERATIONS, help="Operations to benchmark.")
+parser.add_argument('--alphabets', nargs='+', choices=sorted(ALPHABETS),
+                    help="Alphabets to benchmark.")
+parser.add_argument('--corpora', nargs='+', choices=sorted(CORPORA),
+                    help="Kinds of text to benchmark.")
+parser.add_argument('--min-time', type=float, default=MIN_TIME,
+                    help="Minimum seconds spent repeating each benchmark.")
+parser.add_argument('--output', metavar="FILE",
+                    help="Write JSON results to FILE, or - for stdout.")
+parser.add_argument('--baseline', metavar="FILE",
+                    help="Compare results against the JSON in FILE.")
+parser.add_argument('--save-baseline', metavar="FILE",
+                    help="Store the results as the baseline in FILE.")
+parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                    help="Fraction of slowdown flagged as a regression.")
+
+
+def main(argv=None):
+    """Runs the benchmarks from the command line.
+
+    Returns:
+        Exit status, 1 if any regression was found.
+    """
+    arguments = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    logger.setLevel(logging.INFO)
+
+    current = run(arguments.sizes, arguments.operations, arguments.alphabets,
+                  arguments.corpora, arguments.min_time)
+
+    if arguments.output == '-':
+        json.dump(current, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write("\n")
+    elif arguments.output:
+        with open(arguments.output, 'w') as output:
+            json.dump(current, output, indent=2, sort_keys=True)
+    if arguments.save_baseline:
+        with open(arguments.save_baseline, 'w') as output:
+            json.dump(current, output, indent=2, sort_keys=True)
+
+    if arguments.baseline:
+        with open(arguments.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(current, baseline, arguments.threshold)
+        for regression in regressions:
+            logger.error("Regression in {name}: {seconds:.6f}s against "
+                         "{baseline:.6f}s baseline "
+                         "({ratio:.2f}x)".format(**regression))
+        if regressions:
+            return 1
+    return 0
@@ -0,0 +1,84 @@
+# Caesar shift between buffer-protocol objects (bytes, bytearray, memoryview,
+# array, mmap), writing into a destination the caller already owns instead
+# of returning new bytes.  Buffers are treated as raw ASCII bytes.
+from caesarcipher.engine import compile_byte_table
+
+
+# Buffers are translated a block at a time so temporary memory never exceeds
+# a block.  bytes.translate over cache-sized blocks also outruns np.take,
+# which does not vectorize byte lookups.
+BLOCK_SIZE = 1 << 16
+
+
+def _byte_view(buffer, writable=False):
+    view = memoryview(buffer)
+    if view.format != 'B' or view.ndim != 1:
+        view = view.cast('B')
+    if writable and view.readonly:
+        raise TypeError("Destination buffer must be writable.")
+    return view
+
+
+def translate_into(source, destination, table, block_size=BLOCK_SIZE):
+    """Translates a byte buffer into another with a 256 byte table.
+
+    Args:
+        source: Any C-contiguous buffer-protocol object.
+        destination: A writable buffer at least as long as the source.  May
+            be the source itself to translate in place.
+        table: A 256 byte translation table.
+        block_size: Most bytes translated per step.
+
+    Returns:
+        Integer number of bytes written.
+    """
+    source = _byte_view(source)
+    destination = _byte_view(destination, writable=True)
+    length = len(source)
+    if len(destination) < length:
+        raise ValueError("Destination buffer is shorter than the source.")
+    for start in range(0, length, block_size):
+        end = min(start + block_size, length)
+        destination[start:end] = source[start:end].tobytes().translate(table)
+    return length
+
+
+def shift_into(source, destination, offset, alphabet=None,
+               block_size=BLOCK_SIZE):
+    """Applies the Caesar shift from one byte buffer into another.
+
+    Args:
+        source: Any C-contiguous buffer-protocol object.
+        destination: A writable buffer at least as long as the source.  May
+            be the source itself to shift in place.
+        offset: Integer by which to shift each letter.  Negative offsets
+            decode.
+        alphabet: Iterable of ASCII characters, or None for the default
+            alphabet.
+        block_size: Most bytes translated per step.
+
+    Returns:
+        Integer number of bytes written.
+    """
+    table = compile_byte_table(alphabet, offset)
+    if table is None:
+        raise ValueError("Alphabet must be ASCII to shift bytes.")
+    return translate_into(source, destination, table, block_size)
+
+
+def encode_into(source, destination, offset, alphabet=None):
+    """Encodes a byte buffer into a writable destination buffer.
+
+    Examples:
+        >>> buffer = bytearray(b'I want to encode this string.')
+        >>> encode_into(buffer, buffer, 14)
+        29
+        >>> buffer
+        bytearray(b'W kobh hc sbqcrs hvwg ghfwbu.')
+    """
+    return shift_into(source, destination, offset, alphabet)
+
+
+def decode_into(source, destination, offset, alphabet=None):
+    """Decodes a byte buffer into a writable destination buffer."""
+    return shift_into(source, destination, -offset, alphabet)
@@ -0,0 +1,199 @@
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from caesarcipher.crack import CrackCandidate
+from caesarcipher.crack import crack_candidates
+from caesarcipher.crack import letter_counts
+from caesarcipher.crack import sample_crack
+from caesarcipher.engine import normalize_alphabet
+
+
+# Results kept in memory in front of the on-disk store.
+MEMORY_SIZE = 1024
+
+# Rows kept on disk before the least recently used are evicted, and the
+# fraction of them dropped at once so eviction stays rare.
+MAX_ENTRIES = 100000
+EVICT_FRACTION = 0.1
+
+
+class CrackCache(object):
+    def __init__(self, path=None, memory_size=MEMORY_SIZE,
+                 max_entries=MAX_ENTRIES):
+        """Remembers crack results keyed by a hash of the ciphertext.
+
+        Results live in an in-memory LRU and, if a path is given, in a
+        SQLite database that outlives the process.  The database is capped
+        at max_entries rows, evicting the least recently used.
+
+        Attributes:
+            path: Path of the SQLite database, or None for memory only.
+            memory_size: Number of results kept in memory.
+            max_entries: Number of results kept on disk.
+            hits: Number of lookups answered from the cache.
+            misses: Number of lookups that were not.
+        """
+        self.path = path
+        self.memory_size = memory_size
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = None
+        self._rows = 0
+        self._clock = 0
+        if path is not None:
+            self._open(path)
+
+    def _open(self, path):
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS cracks ("
+            "key BLOB PRIMARY KEY, offset INTEGER NOT NULL, "
+            "score REAL NOT NULL, used INTEGER NOT NULL)")
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS cracks_used ON cracks (used)")
+        self._connection.commit()
+        self._rows, self._clock = self._connection.execute(
+            "SELECT COUNT(*), COALESCE(MAX(used), 0) FROM cracks").fetchone()
+
+    @staticmethod
+    def key(text, alphabet, language, mode=None):
+        """Returns the cache key for a ciphertext, alphabet and model.
+
+        Cracks made another way than scoring the whole text, such as from a
+        sample, pass a mode string so their results are kept apart.
+        """
+        digest = hashlib.sha256()
+        digest.update(''.join(normalize_alphabet(alphabet)).encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(language.digest.encode('ascii'))
+        words = getattr(language, 'words', None)
+        if words is not None:
+            digest.update(words.digest.encode('ascii'))
+        if mode is not None:
+            digest.update(b'\0m')
+            digest.update(mode.encode('utf-8'))
+        if isinstance(text, str):
+            digest.update(b'\0s')
+            text = text.encode('utf-8')
+        else:
+            digest.update(b'\0b')
+        digest.update(text)
+        return digest.digest()
+
+    def get(self, key):
+        """Returns the cached (offset, score) for a key, or None."""
+        with self._lock:
+            result = self._memory.get(key)
+            if result is not None:
+                self._memory.move_to_end(key)
+            elif self._connection is not None:
+                row = self._connection.execute(
+                    "SELECT offset, score FROM cracks WHERE key = ?",
+                    (key,)).fetchone()
+                if row is not None:
+                    result = (row[0], row[1])
+                    self._clock += 1
+                    self._connection.execute(
+                        "UPDATE cracks SET used = ? WHERE key = ?",
+                        (self._clock, key))
+                    self._connection.commit()
+                    self._remember(key, result)
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return result
+
+    def put(self, key, offset, score):
+        """Stores the offset and score cracked for a key."""
+        with self._lock:
+            self._remember(key, (offset, score))
+            if self._connection is None:
+                return
+            self._clock += 1
+            exists = self._connection.execute(
+                "SELECT 1 FROM cracks WHERE key = ?", (key,)).fetchone()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO cracks (key, offset, score, used) "
+                "VALUES (?, ?, ?, ?)", (key, offset, score, self._clock))
+            if exists is None:
+                self._rows += 1
+            if self._rows > self.max_entries:
+                self._evict()
+            self._connection.commit()
+
+    def _remember(self, key, result):
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _evict(self):
+        keep = int(self.max_entries * (1 - EVICT_FRACTION))
+        self._connection.execute(
+            "DELETE FROM cracks WHERE key IN (SELECT key FROM cracks "
+            "ORDER BY used LIMIT ?)", (max(self._rows - keep, 0),))
+        self._rows = self._connection.execute(
+            "SELECT COUNT(*) FROM cracks").fetchone()[0]
+
+    def __len__(self):
+        with self._lock:
+            if self._connection is not None:
+                return self._rows
+            return len(self._memory)
+
+    def __reduce__(self):
+        # Worker processes open their own connection to the same database.
+        return CrackCache, (self.path, self.memory_size, self.max_entries)
+
+    def close(self):
+        """Closes the database, keeping the in-memory results."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+def cached_crack(text, language, alphabet=None, cache=None, stats=None,
+                 counter=letter_counts, sample_size=None):
+    """Cracks a ciphertext, answering from a cache when possible.
+
+    A cache hit skips letter counting and scoring entirely.
+
+    Args:
+        text: The ciphertext, as str or bytes.
+        language: LanguageModel to score against.
+        alphabet: Iterable of characters, or None for the default alphabet.
+        cache: CrackCache to consult and fill, or None.
+        stats: Optional Stats object to record scoring time and margin in.
+        counter: Callable counting the letters of the text, with the
+            signature of letter_counts().
+        sample_size: Crack with sample_crack() from a sample of about this
+            many characters, or None to score the whole text.  Sampled
+            results are cached apart from whole-text ones.
+
+    Returns:
+        CrackCandidate for the most likely offset.
+    """
+    alphabet = normalize_alphabet(alphabet)
+    key = None
+    if cache is not None:
+        mode = None if not sample_size else 'sample:{0}'.format(sample_size)
+        key = cache.key(text, alphabet, language, mode)
+        result = cache.get(key)
+        if result is not None:
+            return CrackCandidate(text, result[0], result[1], alphabet)
+    if sample_size:
+        candidate = sample_crack(text, language, alphabet, sample_size,
+                                 stats=stats)
+    else:
+        candidate = crack_candidates(text, language, alphabet=alphabet,
+                                     stats=stats, counter=counter)[0]
+    if key is not None:
+        cache.put(key, candidate.offset, candidate.score)
+    return candidate
@@ -1,12 +1,49 @@
 from random import randrange
 import string
-import math
 import logging
 
+from caesarcipher.backends import select_backend
+from caesarcipher.cache import cached_crack
+from caesarcipher.crack import crack_candidates
+from caesarcipher.language import english
+from caesarcipher.stats import measure
+
 
 class CaesarCipher(object):
+    # Frequency of letters used in English, taken from Wikipedia.
+    # http://en.wikipedia.org/wiki/Letter_frequency
+    frequency = {
+        'a': 0.08167,
+        'b': 0.01492,
+        'c': 0.02782,
+        'd': 0.04253,
+        'e': 0.130001,
+        'f': 0.02228,
+        'g': 0.02015,
+        'h': 0.06094,
+        'i': 0.06966,
+        'j': 0.00153,
+        'k': 0.00772,
+        'l': 0.04025,
+        'm': 0.02406,
+        'n': 0.06749,
+        'o': 0.07507,
+        'p': 0.01929,
+        'q': 0.00095,
+        'r': 0.05987,
+        's': 0.06327,
+        't': 0.09056,
+        'u': 0.02758,
+        'v': 0.00978,
+        'w': 0.02360,
+        'x': 0.00150,
+        'y': 0.01974,
+        'z': 0.00074}
+
     def __init__(self, message=None, encode=False, decode=False, offset=False,
-                 crack=None, verbose=None, alphabet=None):
+                 crack=None, verbose=None, alphabet=None, stats=None,
+                 sample_size=None, language=None, cache=None, workers=None,
+                 engine=None):
         """
         A class that encodes, decodes and cracks strings using the Caesar shift
         cipher.
@@ -32,6 +69,21 @@ class CaesarCipher(object):
                 use as command line script flag.
             offset: Integer by which you want to shift the value of a letter.
             alphabet: A tuple containing the ASCII alphabet in uppercase.
+            stats: A Stats object to collect timings and crack scores in, or
+                None to skip instrumentation.
+            sample_size: Integer number of characters to crack from a strided
+                sample of, widening only if the result is ambiguous, or None
+                to score the whole message.
+            language: A LanguageModel to score cracks against, or None for
+                the shared English model.
+            cache: A CrackCache to answer repeated cracks from, or None to
+                always score.
+            workers: Number of processes to shift messages of at least
+                PARALLEL_THRESHOLD bytes with, or None for one per CPU.
+                Smaller messages are always shifted in this process.
+            engine: Name of the registered engine to shift and count with,
+                or None to pick one from the size, type and alphabet of the
+                message.
 
         Examples:
             Encode a string with a random letter offset.
@@ -64,41 +116,30 @@ class CaesarCipher(object):
         self.verbose = verbose
         self.crack = crack
         self.alphabet = alphabet
-
-        # Frequency of letters used in English, taken from Wikipedia.
-        # http://en.wikipedia.org/wiki/Letter_frequency
-        self.frequency = {
-            'a': 0.08167,
-            'b': 0.01492,
-            'c': 0.02782,
-            'd': 0.04253,
-            'e': 0.130001,
-            'f': 0.02228,
-            'g': 0.02015,
-            'h': 0.06094,
-            'i': 0.06966,
-            'j': 0.00153,
-            'k': 0.00772,
-            'l': 0.04025,
-            'm': 0.02406,
-            'n': 0.06749,
-            'o': 0.07507,
-            'p': 0.01929,
-            'q': 0.00095,
-            'r': 0.05987,
-            's': 0.06327,
-            't': 0.09056,
-            'u': 0.02758,
-            'v': 0.00978,
-            'w': 0.02360,
-            'x': 0.00150,
-            'y': 0.01974,
-            'z': 0.00074}
+        self.stats = stats
+        self.sample_size = sample_size
+        self.language = language
+        self.cache = cache
+        self.workers = workers
+        self.engine = engine
 
         # Get ASCII alphabet if one is not provided by the user.
         if alphabet is None:
             self.alphabet = tuple(string.ascii_lowercase)
 
+        if language is None:
+            self.language = english()
+
+    def select_offset(self):
+        """Picks a random offset with sufficient distance from original.
+
+        Returns:
+            Integer offset selected.
+        """
+        self.offset = randrange(5, 25)
+        logging.info("Random offset selected: {0}".format(self.offset))
+        return self.offset
+
     def cipher(self):
         """Applies the Caesar shift cipher.
 
@@ -113,37 +154,30 @@ class CaesarCipher(object):
         Returns:
             String with cipher applied.
         """
-        # If no offset is selected, pick random one with sufficient distance
-        # from original.
         if self.offset is False:
-            self.offset = randrange(5, 25)
-            logging.info("Random offset selected: {0}".format(self.offset))
-        logging.debug("Offset set: {0}".format(self.offset))
+            self.select_offset()
+        logging.debug("Offset set: %s", self.offset)
 
         # Cipher
-        ciphered_message_list = list(self.message)
-        for i, letter in enumerate(ciphered_message_list):
-            if letter.isalpha():
-                # Use default upper and lower case characters if alphabet
-                # not supplied by user.
-                if letter.isupper():
-                    alphabet = [character.upper()
-                                for character in self.alphabet]
-                else:
-                    alphabet = self.alphabet
-
-                logging.debug("Letter: {0}".format(letter))
-                logging.debug("Alphabet: {0}".format(alphabet))
-                value = alphabet.index(letter)
-                cipher_value = value + self.offset
-                if cipher_value > 25 or cipher_value < 0:
-                    cipher_value = cipher_value % 26
-                logging.debug("Cipher value: {0}".format(cipher_value))
-                ciphered_message_list[i] = alphabet[cipher_value]
-                logging.debug("Ciphered letter: {0}".format(letter))
-        self.message = ''.join(ciphered_message_list)
+        self.message = self._shift(self.offset)
         return self.message
 
+    def _backend(self, operation):
+        backend = select_backend(operation, self.message, self.alphabet,
+                                 self.engine)
+        logging.debug("Engine for %s: %s", operation, backend.name)
+        if self.stats is not None:
+            self.stats.record_engine(operation, backend.name)
+        return backend
+
+    def _shift(self, offset):
+        backend = self._backend('shift')
+        message = measure(self.stats, 'cipher', backend.shift, self.message,
+                          offset, self.alphabet, self.workers)
+        if self.stats is not None:
+            self.stats.characters += len(message)
+        return message
+
     def calculate_entropy(self, entropy_string):
         """Calculates the entropy of a string based on known frequency of
         English letters.
@@ -155,14 +189,30 @@ class CaesarCipher(object):
             A negative float with the total entropy of the string (higher
             is better).
         """
+        index = self.language.index
+        weights = self.language.weights
         total = 0
         for char in entropy_string:
             if char.isalpha():
-                prob = self.frequency[char.lower()]
-                total += - math.log(prob) / math.log(2)
-        logging.debug("Entropy score: {0}".format(total))
+                total += weights[index[char.lower()]]
+        logging.debug("Entropy score: %s", total)
         return total
 
+    def crack_candidates(self, k=5):
+        """Ranks the offsets the message is most likely encoded with.
+
+        Letters are counted once and every offset is scored against that
+        histogram; candidates are only decoded when their plaintext is read.
+
+        Args:
+            k: Number of candidates to return.
+
+        Returns:
+            List of CrackCandidate objects, most likely first.
+        """
+        return crack_candidates(self.message, self.language, k=k,
+                                alphabet=self.alphabet, stats=self.stats)
+
     @property
     def cracked(self):
         """Attempts to crack ciphertext using frequency of letters in English.
@@ -170,32 +220,21 @@ class CaesarCipher(object):
         Returns:
             String of most likely message.
         """
-        logging.info("Cracking message: {0}".format(self.message))
-        entropy_values = {}
-        attempt_cache = {}
-        message = self.message
-        for i in range(25):
-            self.message = message
-            self.offset = i * -1
-            logging.debug("Attempting crack with offset: "
-                          "{0}".format(self.offset))
-            test_cipher = self.cipher()
-            logging.debug("Attempting plaintext: {0}".format(test_cipher))
-            entropy_values[i] = self.calculate_entropy(test_cipher)
-            attempt_cache[i] = test_cipher
-
-        sorted_by_entropy = sorted(entropy_values, key=entropy_values.get)
-        self.offset = sorted_by_entropy[0] * -1
-        cracked_text = attempt_cache[sorted_by_entropy[0]]
-        self.message = cracked_text
-
-        logging.debug("Entropy scores: {0}".format(entropy_values))
-        logging.debug("Lowest entropy score: "
-                      "{0}".format(str(entropy_values[sorted_by_entropy[0]])))
-        logging.debug("Most likely offset: {0}".format(self.offset))
-        logging.debug("Most likely message: {0}".format(cracked_text))
-
-        return cracked_text
+        logging.info("Cracking message: %s", self.message)
+        candidate = cached_crack(self.message, self.language, self.alphabet,
+                                 self.cache, self.stats,
+                                 self._backend('count').count,
+                                 self.sample_size)
+        if candidate.confidence is not None:
+            logging.info("Confidence: %s", candidate.confidence)
+        self.offset = candidate.offset * -1
+        self.message = self._shift(self.offset)
+
+        logging.debug("Lowest entropy score: %s", candidate.score)
+        logging.debug("Most likely offset: %s", self.offset)
+        logging.debug("Most likely message: %s", self.message)
+
+        return self.message
 
     @property
     def encoded(self):
@@ -204,7 +243,7 @@ class CaesarCipher(object):
         Returns:
             String encoded with cipher.
         """
-        logging.info("Encoding message: {0}".format(self.message))
+        logging.info("Encoding message: %s", self.message)
         return self.cipher()
 
     @property
@@ -217,7 +256,7 @@ class CaesarCipher(object):
         Returns:
             String decoded with cipher.
         """
-        logging.info("Decoding message: {0}".format(self.message))
+        logging.info("Decoding message: %s", self.message)
         self.offset = self.offset * -1
         return self.cipher()
 
@@ -1,36 +1,111 @@
-import logging
-import argparse
-
-from caesarcipher import CaesarCipher
-from caesarcipher import CaesarCipherError
-
-# Parser configuration
-parser = argparse.ArgumentParser(description="Caesar Cipher - encode, decode "
-                                             "or crack messages with an "
-                                             "English alphabet offset.",
-                                 epilog="Written by Rob Spectre for Hacker "
-                                 "Olympics London.\n"
-                                 "http://www.brooklynhacker.com")
-parser.add_argument('message',
-                    help="Message to be encoded, decoded or cracked.")
-parser.add_argument('-e', '--encode', action="store_true",
-                    help="Encode this message.")
-parser.add_argument('-d', '--decode', action="store_true",
-                    help="Decode this message.")
-parser.add_argument('-c', '--crack', action="store_true",
-                    help="Crack this ciphertext to find most likely message.")
-parser.add_argument('-v', '--verbose', action="store_true",
-                    help="Turn on verbose output.")
-parser.add_argument('-o', '--offset',
-                    help="Integer offset to encode/decode message against.")
-parser.add_argument('-a', '--alphabet',
-                    help="String of alphabet you want to use to apply the "
-                         "cipher against.")
+import sys
+
+
+def build_parser():
+    """Builds the command line parser.
+
+    argparse is only imported here so the co-process starts without it.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Caesar Cipher - encode, "
+                                                 "decode or crack messages "
+                                                 "with an English alphabet "
+                                                 "offset.",
+                                     epilog="Written by Rob Spectre for "
+                                     "Hacker Olympics London.\n"
+                                     "http://www.brooklynhacker.com")
+    parser.add_argument('message', nargs='?',
+                        help="Message to be encoded, decoded or cracked.")
+    parser.add_argument('-e', '--encode', action="store_true",
+                        help="Encode this message.")
+    parser.add_argument('-d', '--decode', action="store_true",
+                        help="Decode this message.")
+    parser.add_argument('-c', '--crack', action="store_true",
+                        help="Crack this ciphertext to find most likely "
+                             "message.")
+    parser.add_argument('-v', '--verbose', action="store_true",
+                        help="Turn on verbose output.")
+    parser.add_argument('-o', '--offset',
+                        help="Integer offset to encode/decode message "
+                             "against.")
+    parser.add_argument('-a', '--alphabet',
+                        help="String of alphabet you want to use to apply the "
+                             "cipher against.")
+    parser.add_argument('-i', '--input', metavar="FILE",
+                        help="Read the message from FILE, or - for stdin, in "
+                             "fixed-size chunks.")
+    parser.add_argument('--output', metavar="FILE",
+                        help="Write the result to FILE, or - for stdout.")
+    parser.add_argument('--compress', choices=('gzip', 'bz2', 'xz'),
+                        help="Compress the output, which otherwise follows "
+                             "the extension of --output.  Compressed input "
+                             "is always detected.")
+    parser.add_argument('--in-place', metavar="FILE",
+                        help="Rewrite FILE in place through memory maps.")
+    parser.add_argument('-w', '--workers', type=int,
+                        help="Number of worker processes to use.")
+    parser.add_argument('--corpus', nargs='*', metavar="PATH",
+                        help="Treat the files, directories or glob patterns "
+                             "given as one corpus sharing a single offset, "
+                             "writing decoded files beneath the --output "
+                             "directory.  With --format, give no paths: the "
+                             "records of the -i input are the corpus.")
+    parser.add_argument('--format', choices=('jsonl', 'csv'),
+                        help="Treat the input as JSON lines or CSV records.")
+    parser.add_argument('--field', default='message',
+                        help="Name of the record field holding the message.")
+    parser.add_argument('--sample', type=int, dest="sample_size", metavar="N",
+                        help="Crack from a strided sample of about N "
+                             "characters, widening it only when ambiguous.")
+    parser.add_argument('--stats', action="store_true", dest="show_stats",
+                        help="Report throughput, stage timings and crack "
+                             "scores.")
+    parser.add_argument('--cache', metavar="PATH", dest="cache_path",
+                        help="Remember cracked messages and --format records "
+                             "in a SQLite database at PATH and answer repeats "
+                             "from it.")
+    parser.add_argument('-f', '--follow', action="store_true",
+                        help="Crack input as it arrives, writing plaintext "
+                             "once the offset is confidently known.")
+    parser.add_argument('--engine', metavar="NAME",
+                        help="Engine to shift and count a message given on "
+                             "the command line with: python, translate, "
+                             "numpy, multiprocess, or auto to pick by size.  "
+                             "Run 'caesarcipher calibrate' once to tune the "
+                             "automatic choice.")
+    parser.add_argument('--coprocess', action="store_true",
+                        help="Answer 'encode <offset> <text>', 'decode "
+                             "<offset> <text>' and 'crack <text>' commands, "
+                             "one per line on stdin, until it closes.")
+    return parser
 
 
 def main():
+    # The co-process is checked for before anything else is imported so a
+    # long-lived pipe pays as little startup as possible.
+    if sys.argv[1:2] == ['--coprocess']:
+        from caesarcipher.coprocess import main as coprocess_main
+        sys.exit(coprocess_main(sys.argv[2:]))
+    if sys.argv[1:2] == ['bench']:
+        from caesarcipher.bench import main as bench_main
+        sys.exit(bench_main(sys.argv[2:]))
+    if sys.argv[1:2] == ['calibrate']:
+        from caesarcipher.backends import main as calibrate_main
+        sys.exit(calibrate_main(sys.argv[2:]))
+    if sys.argv[1:2] == ['serve']:
+        from caesarcipher.server import main as serve_main
+        sys.exit(serve_main(sys.argv[2:]))
+
+    import logging
+    from caesarcipher import CaesarCipher
+    from caesarcipher import CaesarCipherError
+
     caesar_cipher = CaesarCipher()
-    parser.parse_args(namespace=caesar_cipher)
+    build_parser().parse_args(namespace=caesar_cipher)
+    if caesar_cipher.coprocess is True:
+        from caesarcipher.coprocess import main as coprocess_main
+        sys.exit(coprocess_main())
 
     # Logging configuration
     if caesar_cipher.verbose is True:
@@ -53,7 +128,68 @@ def main():
         raise CaesarCipherError("Please select to encode or encode a message, "
                                 "not both.")
 
-    # Required arguments.
+    # Only a message given on the command line runs through CaesarCipher's
+    # engine selection; the other modes have shift paths of their own.
+    records = caesar_cipher.in_place is None and \
+        caesar_cipher.format is not None and caesar_cipher.corpus is None
+    message = caesar_cipher.in_place is None and \
+        caesar_cipher.format is None and not caesar_cipher.corpus and \
+        caesar_cipher.input is None and caesar_cipher.output is None
+
+    if caesar_cipher.engine not in (None, 'auto'):
+        from caesarcipher.backends import get_backend
+        try:
+            get_backend(caesar_cipher.engine)
+        except ValueError as error:
+            raise CaesarCipherError(str(error))
+        if not message:
+            raise CaesarCipherError("The --engine switch only applies to "
+                                    "messages given on the command line.")
+
+    if caesar_cipher.message is None and caesar_cipher.input is None and \
+            caesar_cipher.in_place is None and caesar_cipher.format is None \
+            and not caesar_cipher.corpus:
+        raise CaesarCipherError("Please provide a message, or a file with "
+                                "the -i switch.")
+
+    if caesar_cipher.format is not None and caesar_cipher.corpus:
+        raise CaesarCipherError("The --corpus switch takes no paths with "
+                                "--format.  Please give the records with the "
+                                "-i switch.")
+
+    if caesar_cipher.cache_path is not None and not (records or message):
+        raise CaesarCipherError("The --cache switch only applies to "
+                                "messages and --format records.")
+
+    if caesar_cipher.show_stats is True:
+        from caesarcipher.stats import Stats
+        caesar_cipher.stats = Stats()
+    if caesar_cipher.cache_path is not None:
+        from caesarcipher.cache import CrackCache
+        caesar_cipher.cache = CrackCache(caesar_cipher.cache_path)
+
+    if caesar_cipher.in_place is not None:
+        in_place_main(caesar_cipher)
+    elif caesar_cipher.format is not None:
+        records_main(caesar_cipher)
+    elif caesar_cipher.corpus:
+        corpus_main(caesar_cipher)
+    elif caesar_cipher.input is not None or caesar_cipher.output is not None:
+        stream_main(caesar_cipher)
+    else:
+        message_main(caesar_cipher)
+
+    if caesar_cipher.cache is not None:
+        caesar_cipher.cache.close()
+    if caesar_cipher.stats is not None:
+        for line in caesar_cipher.stats.report():
+            logging.info(line)
+
+
+def message_main(caesar_cipher):
+    """Runs the selected operation on the message argument."""
+    import logging
+
     if caesar_cipher.decode is True:
         logging.info("Decoded message: {0}".format(caesar_cipher.decoded))
     elif caesar_cipher.crack is True:
@@ -63,3 +199,189 @@ def main():
     else:
         logging.error("Please select a message to encode, decode or "
                       "crack.  For more information, use --help.")
+
+
+def stream_main(caesar_cipher):
+    """Runs the selected operation between files or standard streams."""
+    import io
+    import logging
+    from caesarcipher.stream import close_stream
+    from caesarcipher.stream import crack_stream
+    from caesarcipher.stream import follow_stream
+    from caesarcipher.stream import is_compressed
+    from caesarcipher.stream import open_input
+    from caesarcipher.stream import open_output
+    from caesarcipher.stream import shift_stream
+
+    source_path = caesar_cipher.input
+    destination_path = caesar_cipher.output or '-'
+    if caesar_cipher.encode is True and caesar_cipher.offset is False:
+        caesar_cipher.select_offset()
+
+    if source_path is None:
+        source = io.BytesIO(caesar_cipher.message.encode('utf-8'))
+    else:
+        source = open_input(source_path)
+    destination = open_output(destination_path, caesar_cipher.compress)
+    # (De)compression releases the GIL, so it is worth running beside the
+    # cipher on threads of its own.
+    overlap = is_compressed(source) or is_compressed(destination)
+    try:
+        if caesar_cipher.decode is True:
+            shift_stream(source, destination, -caesar_cipher.offset,
+                         caesar_cipher.alphabet, stats=caesar_cipher.stats,
+                         overlap=overlap)
+        elif caesar_cipher.crack is True and caesar_cipher.follow is True:
+            offset = follow_stream(source, destination,
+                                   caesar_cipher.language,
+                                   caesar_cipher.alphabet,
+                                   stats=caesar_cipher.stats)
+            logging.info("Most likely offset: {0}".format(offset))
+        elif caesar_cipher.crack is True:
+            offset = crack_stream(source, destination,
+                                  caesar_cipher.language,
+                                  caesar_cipher.alphabet,
+                                  stats=caesar_cipher.stats,
+                                  sample_size=caesar_cipher.sample_size,
+                                  overlap=overlap)
+            logging.info("Most likely offset: {0}".format(offset))
+        elif caesar_cipher.encode is True:
+            shift_stream(source, destination, caesar_cipher.offset,
+                         caesar_cipher.alphabet, stats=caesar_cipher.stats,
+                         overlap=overlap)
+        else:
+            logging.error("Please select a message to encode, decode or "
+                          "crack.  For more information, use --help.")
+    finally:
+        if source_path is not None:
+            close_stream(source)
+        close_stream(destination)
+
+
+def in_place_main(caesar_cipher):
+    """Runs the selected operation on a file, rewriting it in place."""
+    import logging
+    from caesarcipher import inplace
+
+    path = caesar_cipher.in_place
+    workers = caesar_cipher.workers
+    if caesar_cipher.decode is True:
+        inplace.shift_file(path, -caesar_cipher.offset,
+                           caesar_cipher.alphabet, workers,
+                           stats=caesar_cipher.stats)
+    elif caesar_cipher.crack is True:
+        offset = inplace.crack_file(path, caesar_cipher.language,
+                                    caesar_cipher.alphabet, workers,
+                                    stats=caesar_cipher.stats)
+        logging.info("Most likely offset: {0}".format(offset))
+    elif caesar_cipher.encode is True:
+        if caesar_cipher.offset is False:
+            caesar_cipher.select_offset()
+        inplace.shift_file(path, caesar_cipher.offset,
+                           caesar_cipher.alphabet, workers,
+                           stats=caesar_cipher.stats)
+    else:
+        logging.error("Please select a message to encode, decode or "
+                      "crack.  For more information, use --help.")
+
+
+def corpus_main(caesar_cipher):
+    """Runs the selected operation on many files sharing one offset."""
+    import logging
+    import os
+    from caesarcipher import CaesarCipherError
+    from caesarcipher import corpus
+
+    directory = caesar_cipher.output
+    workers = caesar_cipher.workers or os.cpu_count()
+    if caesar_cipher.crack is True:
+        try:
+            offset = corpus.crack_corpus(caesar_cipher.corpus,
+                                         caesar_cipher.language,
+                                         caesar_cipher.alphabet, workers,
+                                         directory, stats=caesar_cipher.stats)
+        except ValueError as error:
+            raise CaesarCipherError(str(error))
+        logging.info("Most likely offset: {0}".format(offset))
+        return
+    if caesar_cipher.encode is True:
+        if caesar_cipher.offset is False:
+            caesar_cipher.select_offset()
+        offset = caesar_cipher.offset
+    elif caesar_cipher.decode is True:
+        offset = -caesar_cipher.offset
+    else:
+        logging.error("Please select a message to encode, decode or "
+                      "crack.  For more information, use --help.")
+        return
+    if directory is None:
+        raise CaesarCipherError("Please give an --output directory to write "
+                                "the corpus to.")
+    paths = corpus.expand_paths(caesar_cipher.corpus)
+    try:
+        corpus.check_destinations(paths, directory, caesar_cipher.corpus)
+        corpus.shift_files(paths, offset, directory, caesar_cipher.alphabet,
+                           workers, stats=caesar_cipher.stats)
+    except ValueError as error:
+        raise CaesarCipherError(str(error))
+    logging.info("Wrote {0} files beneath {1}".format(len(paths), directory))
+
+
+def records_main(caesar_cipher):
+    """Runs the selected operation on one field of JSON lines or CSV."""
+    import io
+    import logging
+    from caesarcipher.records import crack_records_corpus
+    from caesarcipher.records import process_records
+    from caesarcipher.stream import close_stream
+    from caesarcipher.stream import open_input
+    from caesarcipher.stream import open_output
+
+    if caesar_cipher.decode is True:
+        operation = 'decode'
+    elif caesar_cipher.crack is True:
+        operation = 'crack'
+    elif caesar_cipher.encode is True:
+        operation = 'encode'
+        if caesar_cipher.offset is False:
+            caesar_cipher.select_offset()
+    else:
+        logging.error("Please select a message to encode, decode or "
+                      "crack.  For more information, use --help.")
+        return
+
+    source_path = caesar_cipher.input or '-'
+    destination_path = caesar_cipher.output or '-'
+    source = io.TextIOWrapper(open_input(source_path), encoding='utf-8',
+                              newline='')
+    destination = io.TextIOWrapper(open_output(destination_path,
+                                               caesar_cipher.compress),
+                                   encoding='utf-8', newline='')
+    try:
+        if operation == 'crack' and caesar_cipher.corpus is not None:
+            offset = crack_records_corpus(source, destination,
+                                          caesar_cipher.format,
+                                          caesar_cipher.field,
+                                          alphabet=caesar_cipher.alphabet,
+                                          workers=caesar_cipher.workers,
+                                          language=caesar_cipher.language,
+                                          stats=caesar_cipher.stats)
+            logging.info("Most likely offset: {0}".format(offset))
+        else:
+            process_records(source, destination, caesar_cipher.format,
+                            caesar_cipher.field, operation,
+                            offset=caesar_cipher.offset or 0,
+                            alphabet=caesar_cipher.alphabet,
+                            workers=caesar_cipher.workers,
+                            language=caesar_cipher.language,
+                            stats=caesar_cipher.stats,
+                            cache=caesar_cipher.cache)
+    finally:
+        if source_path == '-':
+            close_stream(source.detach())
+        else:
+            source.close()
+        if destination_path == '-':
+            close_stream(destination.detach())
+        else:
+            destination.close()
@@ -0,0 +1,139 @@
+from caesarcipher.buffers import translate_into
+from caesarcipher.crack import crack_candidates
+from caesarcipher.engine import compile_byte_table
+from caesarcipher.engine import compile_table
+from caesarcipher.engine import normalize_alphabet
+from caesarcipher.language import english
+
+
+class Codec(object):
+    __slots__ = ('alphabet', 'offset', 'language', '_encode_table',
+                 '_decode_table', '_encode_byte_table', '_decode_byte_table')
+
+    def __init__(self, alphabet=None, offset=0, language=None):
+        """An immutable, reusable Caesar shift codec.
+
+        Unlike CaesarCipher, a Codec holds no message and never changes
+        after construction, so one instance can be shared freely between
+        threads.  All translation tables are compiled up front.
+
+        Attributes:
+            alphabet: Tuple of characters the cipher shifts along.
+            offset: Integer by which each letter is shifted when encoding,
+                normalized to the length of the alphabet.
+            language: LanguageModel used to score cracks.
+
+        Examples:
+            >>> codec = Codec(offset=14)
+            >>> codec.encode('I want to encode this string.')
+            'W kobh hc sbqcrs hvwg ghfwbu.'
+            >>> codec.decode('W kobh hc sbqcrs hvwg ghfwbu.')
+            'I want to encode this string.'
+        """
+        alphabet = normalize_alphabet(alphabet)
+        offset = offset % len(alphabet)
+        language = language or english()
+        set_slot = object.__setattr__
+        set_slot(self, 'alphabet', alphabet)
+        set_slot(self, 'offset', offset)
+        set_slot(self, 'language', language)
+        set_slot(self, '_encode_table', compile_table(alphabet, offset))
+        set_slot(self, '_decode_table', compile_table(alphabet, -offset))
+        set_slot(self, '_encode_byte_table',
+                 compile_byte_table(alphabet, offset))
+        set_slot(self, '_decode_byte_table',
+                 compile_byte_table(alphabet, -offset))
+        # Warm the model's weight cache so cracking only reads shared state.
+        language.weights_for(alphabet)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Codec objects are immutable.")
+
+    def __delattr__(self, name):
+        raise AttributeError("Codec objects are immutable.")
+
+    def _translate(self, text, table, byte_table):
+        if isinstance(text, str):
+            return text.translate(table)
+        if byte_table is None:
+            raise ValueError("Alphabet must be ASCII to shift bytes.")
+        return text.translate(byte_table)
+
+    def encode(self, text):
+        """Encodes a str or bytes-like object with the codec's offset."""
+        return self._translate(text, self._encode_table,
+                               self._encode_byte_table)
+
+    def decode(self, text):
+        """Decodes a str or bytes-like object with the codec's offset."""
+        return self._translate(text, self._decode_table,
+                               self._decode_byte_table)
+
+    def _translate_into(self, source, destination, byte_table):
+        if byte_table is None:
+            raise ValueError("Alphabet must be ASCII to shift bytes.")
+        return translate_into(source, destination, byte_table)
+
+    def encode_into(self, source, destination):
+        """Encodes a byte buffer into a writable buffer, which may be the
+        source itself.
+
+        Returns:
+            Integer number of bytes written.
+        """
+        return self._translate_into(source, destination,
+                                    self._encode_byte_table)
+
+    def decode_into(self, source, destination):
+        """Decodes a byte buffer into a writable buffer, which may be the
+        source itself.
+
+        Returns:
+            Integer number of bytes written.
+        """
+        return self._translate_into(source, destination,
+                                    self._decode_byte_table)
+
+    def crack_candidates(self, text, k=5):
+        """Ranks the offsets a ciphertext is most likely encoded with.
+
+        The codec's own offset is ignored.
+
+        Returns:
+            List of up to k CrackCandidate objects, most likely first.
+        """
+        return crack_candidates(text, self.language, k=k,
+                                alphabet=self.alphabet)
+
+    def crack(self, text):
+        """Decodes a ciphertext with its most likely offset.
+
+        The codec's own offset is ignored.
+
+        Returns:
+            The most likely plaintext, of the same type as the input.
+        """
+        return self.crack_candidates(text, k=1)[0].plaintext
+
+    def with_offset(self, offset):
+        """Returns a codec sharing this one's alphabet and language."""
+        return Codec(self.alphabet, offset, self.language)
+
+    def __eq__(self, other):
+        if not isinstance(other, Codec):
+            return NotImplemented
+        return (self.alphabet, self.offset, self.language.digest) == \
+            (other.alphabet, other.offset, other.language.digest)
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    def __hash__(self):
+        return hash((self.alphabet, self.offset, self.language.digest))
+
+    def __repr__(self):
+        return "Codec(alphabet={0!r}, offset={1})".format(
+            ''.join(self.alphabet), self.offset)
@@ -0,0 +1,84 @@
+import sys
+
+from caesarcipher.codec import Codec
+from caesarcipher.engine import DEFAULT_ALPHABET
+
+
+# Prefix of answers to commands that could not be run.
+ERROR_PREFIX = 'error: '
+
+
+class CommandError(Exception):
+    pass
+
+
+def answer(line, codecs):
+    """Runs one co-process command and returns its answer.
+
+    Commands are 'encode <offset> <text>', 'decode <offset> <text>' or
+    'crack <text>'.  The text is everything after the single space that
+    follows the command or offset, so it may contain spaces of its own.
+
+    Args:
+        line: A command line without its trailing newline.
+        codecs: Dict of offset to Codec, reused across commands.  Offsets
+            are reduced modulo the alphabet length first, so the dict holds
+            at most one codec per distinct shift.
+
+    Returns:
+        The resulting text.
+    """
+    command, _, rest = line.partition(' ')
+    if command == 'crack':
+        codec = codecs.get(0)
+        if codec is None:
+            codec = codecs[0] = Codec()
+        return codec.crack(rest)
+    if command not in ('encode', 'decode'):
+        raise CommandError("Unknown command: {0!r}".format(command))
+    offset, _, text = rest.partition(' ')
+    try:
+        offset = int(offset)
+    except ValueError:
+        raise CommandError("Offset must be an integer: {0!r}".format(offset))
+    offset %= len(DEFAULT_ALPHABET)
+    codec = codecs.get(offset)
+    if codec is None:
+        codec = codecs[offset] = Codec(offset=offset)
+    if command == 'encode':
+        return codec.encode(text)
+    return codec.decode(text)
+
+
+def serve(source, destination):
+    """Answers commands from a text stream, one line each, until it closes.
+
+    Every answer is flushed as soon as it is written so a caller can hold
+    both pipes open and exchange one line at a time.  Commands that fail
+    are answered with a line starting with ERROR_PREFIX.
+
+    Args:
+        source: Text stream of commands, one per line.
+        destination: Text stream to write answers to.
+
+    Returns:
+        Integer number of commands answered.
+    """
+    codecs = {}
+    answered = 0
+    for line in iter(source.readline, ''):
+        line = line.rstrip('\r\n')
+        try:
+            result = answer(line, codecs)
+        except CommandError as error:
+            result = ERROR_PREFIX + str(error)
+        destination.write(result + '\n')
+        destination.flush()
+        answered += 1
+    return answered
+
+
+def main(argv=None):
+    """Runs the co-process on standard input and output."""
+    serve(sys.stdin, sys.stdout)
+    return 0
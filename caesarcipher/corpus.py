@@ -0,0 +1,262 @@
+# Cracking many files that share one offset by pooling their letter counts.
+# Each file alone may be too short to crack, but their merged histogram is
+# scored once and the winning offset applied to all of them.
+import glob
+import os
+from functools import partial
+
+from caesarcipher.batch import ordered_map
+from caesarcipher.crack import letter_counts
+from caesarcipher.crack import letter_weights
+from caesarcipher.crack import rank_offsets
+from caesarcipher.crack import score_offsets
+from caesarcipher.engine import normalize_alphabet
+from caesarcipher.stats import measure
+from caesarcipher.stream import close_stream
+from caesarcipher.stream import count_stream
+from caesarcipher.stream import open_input
+from caesarcipher.stream import open_output
+from caesarcipher.stream import shift_stream
+
+
+def expand_paths(patterns):
+    """Lists the files named by paths, directories and glob patterns.
+
+    Directories contribute every file beneath them and patterns may use **
+    to match across directories.  Each file is listed once, in sorted order
+    within each pattern.
+
+    Args:
+        patterns: Iterable of file paths, directory paths or glob patterns.
+
+    Returns:
+        List of file paths.
+    """
+    paths = []
+    seen = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = [os.path.join(directory, name)
+                       for directory, _, names in os.walk(pattern)
+                       for name in names]
+        else:
+            matches = glob.glob(pattern, recursive=True)
+        for path in sorted(matches):
+            if os.path.isfile(path) and path not in seen:
+                seen.add(path)
+                paths.append(path)
+    return paths
+
+
+def merge_counts(histograms, size):
+    """Adds up letter histograms of the same alphabet.
+
+    Args:
+        histograms: Iterable of lists of integer counts.
+        size: Length of the alphabet.
+
+    Returns:
+        List of integers, one per alphabet position.
+    """
+    totals = [0] * size
+    for counts in histograms:
+        for i, count in enumerate(counts):
+            totals[i] += count
+    return totals
+
+
+def solve(counts, frequency, alphabet=None, stats=None):
+    """Finds the offset a letter histogram was most likely encoded with.
+
+    Args:
+        counts: List of integer counts, one per alphabet position.
+        frequency: Dict of lowercase letter to expected frequency, or a
+            LanguageModel.
+        alphabet: Iterable of characters, or None for the default alphabet.
+        stats: Optional Stats object to record scores in.
+
+    Returns:
+        Integer offset.
+    """
+    alphabet = normalize_alphabet(alphabet)
+    scores = score_offsets(counts, letter_weights(alphabet, frequency))
+    if stats is not None:
+        stats.record_crack(scores)
+    return rank_offsets(scores)[0]
+
+
+def _count_path(path, alphabet):
+    source = open_input(path)
+    try:
+        return count_stream(source, alphabet)
+    finally:
+        close_stream(source)
+
+
+def count_files(paths, alphabet=None, workers=None, stats=None):
+    """Counts the letters of the alphabet across many files.
+
+    Compressed files are decompressed as they are read.
+
+    Args:
+        paths: List of file paths.
+        alphabet: Iterable of characters, or None for the default alphabet.
+        workers: Number of worker processes, or None to run in this process.
+        stats: Optional Stats object to record timings in.
+
+    Returns:
+        List of integers, one per alphabet position.
+    """
+    alphabet = normalize_alphabet(alphabet)
+    function = partial(_count_path, alphabet=alphabet)
+    return measure(stats, 'scoring', merge_counts,
+                   ordered_map(function, paths, workers, 1), len(alphabet))
+
+
+def destination_paths(paths, directory):
+    """Maps files to where their output goes beneath a directory.
+
+    Paths keep their layout relative to the deepest directory all of them
+    share, so files of the same name in different directories do not
+    collide.
+
+    Args:
+        paths: List of file paths.
+        directory: Directory to write output beneath.
+
+    Returns:
+        List of output paths, in the order of the input paths.
+    """
+    if not paths:
+        return []
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(path))
+                               for path in paths])
+    return [os.path.join(directory, os.path.relpath(os.path.abspath(path),
+                                                    root))
+            for path in paths]
+
+
+def check_destinations(paths, directory, patterns=()):
+    """Refuses to write output over the files it is read from.
+
+    Paths are compared once symbolic links are resolved, so a link cannot
+    route output back onto its input.
+
+    Args:
+        paths: List of file paths.
+        directory: Directory output will be written beneath, laid out as by
+            destination_paths().
+        patterns: Iterable of the paths and patterns the files came from.
+            The directory may not lie inside any of them that is a
+            directory.
+
+    Raises:
+        ValueError: If the directory is inside an input directory, or a
+            destination is one of the input files.
+    """
+    directory = os.path.realpath(directory)
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            root = os.path.realpath(pattern)
+            if os.path.commonpath([root, directory]) == root:
+                raise ValueError("Output directory {0} is inside input "
+                                 "directory {1}.".format(directory, pattern))
+    sources = set(os.path.realpath(path) for path in paths)
+    for path, destination in zip(paths, destination_paths(paths, directory)):
+        if os.path.realpath(destination) in sources:
+            raise ValueError("Output {0} would overwrite input "
+                             "{1}.".format(destination, path))
+
+
+def _shift_path(paths, offset, alphabet):
+    path, destination_path = paths
+    parent = os.path.dirname(destination_path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    source = open_input(path)
+    try:
+        destination = open_output(destination_path)
+        try:
+            shift_stream(source, destination, offset, alphabet)
+        finally:
+            close_stream(destination)
+    finally:
+        close_stream(source)
+    return destination_path
+
+
+def shift_files(paths, offset, directory, alphabet=None, workers=None,
+                stats=None):
+    """Applies one Caesar shift to many files, writing copies elsewhere.
+
+    Outputs are compressed when their extension asks for it, so compressed
+    inputs give compressed outputs.
+
+    Args:
+        paths: List of file paths.
+        offset: Integer by which to shift each letter.  Negative offsets
+            decode.
+        directory: Directory to write the shifted copies beneath, laid out
+            as by destination_paths().
+        alphabet: Iterable of characters, or None for the default alphabet.
+        workers: Number of worker processes, or None to run in this process.
+        stats: Optional Stats object to record timings in.
+
+    Returns:
+        List of the paths written.
+
+    Raises:
+        ValueError: If an output would overwrite an input.
+    """
+    check_destinations(paths, directory)
+    function = partial(_shift_path, offset=offset,
+                       alphabet=normalize_alphabet(alphabet))
+    pairs = list(zip(paths, destination_paths(paths, directory)))
+    return measure(stats, 'cipher', list,
+                   ordered_map(function, pairs, workers, 1))
+
+
+def count_messages(messages, alphabet=None):
+    """Counts the letters of the alphabet across many str or bytes."""
+    alphabet = normalize_alphabet(alphabet)
+    return merge_counts((letter_counts(message, alphabet)
+                         for message in messages), len(alphabet))
+
+
+def crack_corpus(patterns, frequency, alphabet=None, workers=None,
+                 directory=None, stats=None):
+    """Cracks files that all share one offset from their merged histogram.
+
+    Letters are counted in every file, in parallel, and the combined
+    histogram is scored once.  If a directory is given every file is then
+    decoded into it.
+
+    Args:
+        patterns: Iterable of file paths, directory paths or glob patterns.
+        frequency: Dict of lowercase letter to expected frequency, or a
+            LanguageModel.
+        alphabet: Iterable of characters, or None for the default alphabet.
+        workers: Number of worker processes, or None to run in this process.
+        directory: Directory to write the decoded files beneath, or None to
+            only find the offset.
+        stats: Optional Stats object to record timings and scores in.
+
+    Returns:
+        Integer offset the files were most likely encoded with.
+
+    Raises:
+        ValueError: If the patterns match no files, or the directory would
+            overwrite them.
+    """
+    alphabet = normalize_alphabet(alphabet)
+    patterns = list(patterns)
+    paths = expand_paths(patterns)
+    if not paths:
+        raise ValueError("No files match {0}.".format(', '.join(patterns)))
+    if directory is not None:
+        check_destinations(paths, directory, patterns)
+    counts = count_files(paths, alphabet, workers, stats)
+    offset = solve(counts, frequency, alphabet, stats)
+    if directory is not None:
+        shift_files(paths, -offset, directory, alphabet, workers, stats)
+    return offset
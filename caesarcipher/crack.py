@@ -0,0 +1,276 @@
+import math
+
+from caesarcipher.engine import normalize_alphabet
+from caesarcipher.engine import shift
+from caesarcipher.stats import measure
+
+
+# Characters scored by sample_crack() before it considers widening.  A few
+# kilobytes of English almost always identify the offset.
+SAMPLE_SIZE = 4096
+
+# Confidence sample_crack() must reach before it stops widening the sample.
+CONFIDENCE = 0.999
+
+# Ciphertexts with fewer letters than this have their best few candidates
+# re-ranked with the language model's bigrams, when it has them, since a
+# handful of letters says little about unigram frequency.  The best VERIFY
+# candidates are then re-ranked by how much of their plaintext is in the
+# model's dictionary, when it has one.
+SHORT_TEXT = 64
+RERANK = 5
+VERIFY = 10
+
+
+def letter_counts(text, alphabet=None):
+    """Counts the letters of the alphabet in a string in one pass per letter.
+
+    Counting is case insensitive, mirroring the cipher itself.
+
+    Args:
+        text: A str or bytes-like object to count.
+        alphabet: Iterable of characters, or None for the default alphabet.
+
+    Returns:
+        List of integers, one per alphabet position.
+    """
+    alphabet = normalize_alphabet(alphabet)
+    if not isinstance(text, str):
+        alphabet = [character.encode('ascii') for character in alphabet]
+    counts = []
+    for character in alphabet:
+        upper = character.upper()
+        count = text.count(character)
+        if upper != character and len(upper) == 1:
+            count += text.count(upper)
+        counts.append(count)
+    return counts
+
+
+def letter_weights(alphabet, frequency):
+    """Returns the entropy weight of each alphabet position.
+
+    The weight of a letter is -log2 of its expected frequency, so lower totals
+    indicate more likely plaintext.  Letters missing from the frequency table
+    are weighted as the rarest known letter.
+
+    Args:
+        alphabet: Iterable of characters, or None for the default alphabet.
+        frequency: Dict of lowercase letter to expected frequency, or a
+            LanguageModel whose cached weights are used instead.
+
+    Returns:
+        List of floats, one per alphabet position.
+    """
+    alphabet = normalize_alphabet(alphabet)
+    if hasattr(frequency, 'weights_for'):
+        return frequency.weights_for(alphabet)
+    rarest = min(frequency.values())
+    return [- math.log(frequency.get(character.lower(), rarest)) / math.log(2)
+            for character in alphabet]
+
+
+def score_offsets(counts, weights):
+    """Scores every offset against a letter histogram.
+
+    Args:
+        counts: Letter counts of the ciphertext, as from letter_counts().
+        weights: Letter weights, as from letter_weights().
+
+    Returns:
+        List of entropy scores indexed by offset (lower is better).
+    """
+    length = len(counts)
+    present = [(i, count) for i, count in enumerate(counts) if count]
+    return [sum(count * weights[(i - offset) % length]
+                for i, count in present)
+            for offset in range(length)]
+
+
+class CrackCandidate(object):
+    def __init__(self, text, offset, score, alphabet=None, confidence=None,
+                 bigram_score=None):
+        """A possible offset for a ciphertext, decrypted only on demand.
+
+        Attributes:
+            text: The ciphertext.
+            offset: Integer offset the ciphertext is believed to be encoded
+                with.
+            score: Unigram entropy score of the plaintext (lower is better).
+            alphabet: Alphabet the ciphertext was encoded against.
+            confidence: Probability between 0 and 1 that this offset is the
+                right one, if known.
+            bigram_score: Bigram entropy score of the plaintext, if short
+                text re-ranking computed one (lower is better).
+        """
+        self.text = text
+        self.offset = offset
+        self.score = score
+        self.alphabet = alphabet
+        self.confidence = confidence
+        self.bigram_score = bigram_score
+        self._plaintext = None
+
+    @property
+    def plaintext(self):
+        """Decodes the ciphertext with this candidate's offset.
+
+        Returns:
+            String decoded with cipher.
+        """
+        if self._plaintext is None:
+            self._plaintext = shift(self.text, -self.offset, self.alphabet)
+        return self._plaintext
+
+    def __repr__(self):
+        return "CrackCandidate(offset={0}, score={1})".format(self.offset,
+                                                              self.score)
+
+
+def rank_offsets(scores):
+    """Returns offsets ordered from most to least likely.
+
+    Ties are broken by the lower offset.
+    """
+    return sorted(range(len(scores)), key=lambda offset: scores[offset])
+
+
+def crack_candidates(text, frequency, k=1, alphabet=None, stats=None,
+                     counter=letter_counts):
+    """Ranks the offsets a ciphertext is most likely encoded with.
+
+    Counts letters once and scores every offset against the histogram, so
+    the cost is a single pass over the text plus a constant.  Short texts
+    scored against a LanguageModel with bigrams have their leading
+    candidates re-ranked by bigram score, and then by how much of each
+    plaintext is dictionary words if the model has a word filter.
+
+    Args:
+        text: The ciphertext, as str or bytes.
+        frequency: Dict of lowercase letter to expected frequency, or a
+            LanguageModel.
+        k: Number of candidates to return.
+        alphabet: Iterable of characters, or None for the default alphabet.
+        stats: Optional Stats object to record scoring time and margin in.
+        counter: Callable counting the letters of the text, with the
+            signature of letter_counts().
+
+    Returns:
+        List of up to k CrackCandidate objects, most likely first.
+    """
+    alphabet = normalize_alphabet(alphabet)
+    weights = letter_weights(alphabet, frequency)
+    counts = measure(stats, 'scoring', counter, text, alphabet)
+    scores = measure(stats, 'scoring', score_offsets, counts, weights)
+    short = sum(counts) < SHORT_TEXT and isinstance(text, str)
+    words = getattr(frequency, 'words', None) if short else None
+    limit = max(k, VERIFY if words is not None else RERANK)
+    candidates = [CrackCandidate(text, offset, scores[offset], alphabet)
+                  for offset in rank_offsets(scores)[:limit]]
+    if short and getattr(frequency, 'bigram_weights', None) is not None:
+        candidates[:RERANK] = rerank_bigrams(candidates[:RERANK], frequency)
+    if words is not None:
+        candidates = rerank_words(candidates, words)
+    if stats is not None:
+        stats.record_crack(scores, candidates[0].offset)
+    return candidates[:k]
+
+
+def rerank_bigrams(candidates, model):
+    """Orders candidates by unigram and bigram score of their plaintext.
+
+    Each candidate's bigram_score is set, and candidates are ranked by the
+    sum of both scores, which ranks short texts better than either score
+    alone.  The score attribute keeps the unigram score.
+
+    Args:
+        candidates: List of CrackCandidate objects for a str ciphertext.
+        model: LanguageModel with a bigram table.
+
+    Returns:
+        List of the candidates, most likely first.
+    """
+    for candidate in candidates:
+        candidate.bigram_score = model.score_text(candidate.plaintext)
+    return sorted(candidates, key=lambda candidate: (candidate.score +
+                                                     candidate.bigram_score))
+
+
+def rerank_words(candidates, words):
+    """Orders candidates by how much of their plaintext is known words.
+
+    Coverage ranks first, however far apart the candidates' scores are: on
+    a few letters the scores barely separate the offsets, while a plaintext
+    of real words is rarely wrong.  Scores only order candidates whose
+    plaintexts cover the dictionary equally, as those keep their order.
+
+    Args:
+        candidates: List of CrackCandidate objects for a str ciphertext,
+            most likely first.
+        words: WordFilter to check plaintexts against.
+
+    Returns:
+        List of the candidates, most likely first.
+    """
+    return sorted(candidates,
+                  key=lambda candidate: -words.coverage(candidate.plaintext))
+
+
+def confidence(scores):
+    """Returns the probability that the best scoring offset is correct.
+
+    Scores are -log2 likelihoods, so each offset's weight is 2 ** -score.
+    The result is dominated by the margin between the best and second best
+    offsets and approaches 1 as that margin grows.
+
+    Args:
+        scores: List of entropy scores indexed by offset.
+
+    Returns:
+        Float between 0 and 1.
+    """
+    best = min(scores)
+    return 1.0 / sum(2.0 ** (best - score) for score in scores)
+
+
+def sample_crack(text, frequency, alphabet=None, sample_size=SAMPLE_SIZE,
+                 threshold=CONFIDENCE, stats=None):
+    """Cracks a ciphertext from an evenly strided sample of it.
+
+    Scores a sample of about sample_size characters spread across the whole
+    text and widens it fourfold while the best offset is not clearly ahead
+    of the rest, so cost depends on the sample rather than the text size.
+
+    Args:
+        text: The ciphertext, as str, bytes or any sliceable buffer such as
+            an mmap.
+        frequency: Dict of lowercase letter to expected frequency, or a
+            LanguageModel.
+        alphabet: Iterable of characters, or None for the default alphabet.
+        sample_size: Number of characters in the first sample.
+        threshold: Confidence to reach before stopping.
+        stats: Optional Stats object to record scoring time and margin in.
+
+    Returns:
+        CrackCandidate for the most likely offset, with the confidence
+        reached.
+    """
+    alphabet = normalize_alphabet(alphabet)
+    weights = letter_weights(alphabet, frequency)
+    length = len(text)
+    size = max(sample_size, 1)
+    while True:
+        stride = max(length // size, 1)
+        sample = text[::stride] if stride > 1 else text
+        counts = measure(stats, 'scoring', letter_counts, sample, alphabet)
+        scores = measure(stats, 'scoring', score_offsets, counts, weights)
+        reached = confidence(scores)
+        if reached >= threshold or stride == 1:
+            break
+        size *= 4
+
+    if stats is not None:
+        stats.record_crack(scores)
+    offset = rank_offsets(scores)[0]
+    return CrackCandidate(text, offset, scores[offset], alphabet,
+                          confidence=reached)
@@ -0,0 +1,114 @@
+from functools import lru_cache
+
+
+# Spelled out rather than taken from string.ascii_lowercase, which would pull
+# the re module into every import.
+DEFAULT_ALPHABET = tuple('abcdefghijklmnopqrstuvwxyz')
+
+# Number of compiled (alphabet, offset) tables kept around.  A full set of
+# offsets for a handful of alphabets fits comfortably.
+TABLE_CACHE_SIZE = 256
+
+
+def normalize_alphabet(alphabet=None):
+    """Returns the alphabet as a hashable tuple of characters.
+
+    Args:
+        alphabet: Any iterable of single characters, or None for the default
+            ASCII lowercase alphabet.
+
+    Returns:
+        Tuple of characters.
+    """
+    if alphabet is None:
+        return DEFAULT_ALPHABET
+    return tuple(alphabet)
+
+
+def _compile_mapping(alphabet, offset):
+    """Builds the character to character mapping for a shift.
+
+    Mirrors the rules of CaesarCipher.cipher(): each alphabetic character of
+    the alphabet is mapped to the character offset positions along, and the
+    uppercase form of the alphabet is mapped the same way.  Letters whose
+    uppercase form is more than one character, such as 'ß', have no
+    uppercase entry.
+    """
+    length = len(alphabet)
+    mapping = {}
+    for i, character in enumerate(alphabet):
+        if not character.isalpha() or character in mapping:
+            continue
+        shifted = alphabet[(i + offset) % length]
+        mapping[character] = shifted
+        upper = character.upper()
+        if upper != character and len(upper) == 1:
+            mapping[upper] = shifted.upper()
+    return mapping
+
+
+@lru_cache(maxsize=TABLE_CACHE_SIZE)
+def _compile(alphabet, offset):
+    mapping = _compile_mapping(alphabet, offset)
+    str_table = dict((ord(source), target)
+                     for source, target in mapping.items())
+    try:
+        sources = ''.join(mapping).encode('ascii')
+        targets = ''.join(mapping.values()).encode('ascii')
+    except UnicodeEncodeError:
+        byte_table = None
+    else:
+        byte_table = bytes.maketrans(sources, targets)
+    return str_table, byte_table
+
+
+def compile_table(alphabet, offset):
+    """Returns the str.translate table for an alphabet and offset.
+
+    Tables are cached, so repeated calls with the same alphabet and an
+    equivalent offset are free.
+
+    Args:
+        alphabet: Iterable of characters, or None for the default alphabet.
+        offset: Integer by which to shift each letter.
+
+    Returns:
+        Dict suitable for str.translate().
+    """
+    alphabet = normalize_alphabet(alphabet)
+    return _compile(alphabet, offset % len(alphabet))[0]
+
+
+def compile_byte_table(alphabet, offset):
+    """Returns the bytes.translate table for an alphabet and offset.
+
+    Args:
+        alphabet: Iterable of characters, or None for the default alphabet.
+        offset: Integer by which to shift each letter.
+
+    Returns:
+        A 256 byte translation table, or None if the alphabet cannot be
+        represented in ASCII.
+    """
+    alphabet = normalize_alphabet(alphabet)
+    return _compile(alphabet, offset % len(alphabet))[1]
+
+
+def shift(text, offset, alphabet=None):
+    """Applies the Caesar shift to a string or bytes-like object.
+
+    Args:
+        text: A str, bytes or bytearray to shift.
+        offset: Integer by which to shift each letter.  Negative offsets
+            decode.
+        alphabet: Iterable of characters, or None for the default alphabet.
+
+    Returns:
+        Shifted text of the same type as the input.
+    """
+    if isinstance(text, str):
+        return text.translate(compile_table(alphabet, offset))
+    table = compile_byte_table(alphabet, offset)
+    if table is None:
+        raise ValueError("Alphabet must be ASCII to shift bytes.")
+    return text.translate(table)
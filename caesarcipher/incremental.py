@@ -0,0 +1,130 @@
+from caesarcipher.caesarcipher import CaesarCipher
+from caesarcipher.crack import CONFIDENCE
+from caesarcipher.crack import SHORT_TEXT
+from caesarcipher.crack import confidence
+from caesarcipher.crack import letter_counts
+from caesarcipher.crack import letter_weights
+from caesarcipher.crack import rank_offsets
+from caesarcipher.crack import score_offsets
+from caesarcipher.engine import normalize_alphabet
+from caesarcipher.engine import shift
+
+
+# Most characters held back while the offset is still uncertain.  Past this
+# the best offset so far is locked in so memory stays bounded.
+MAX_BUFFER = 1 << 20
+
+
+class IncrementalCracker(object):
+    def __init__(self, frequency=None, alphabet=None, threshold=CONFIDENCE,
+                 min_letters=SHORT_TEXT, max_buffer=MAX_BUFFER):
+        """Learns the offset of a ciphertext while it is still arriving.
+
+        Each chunk fed in adds to a running letter histogram.  Until at
+        least min_letters letters have been seen and the best offset reaches
+        the confidence threshold, chunks are held back; then the offset is
+        locked and every chunk is decoded and returned as soon as it is fed,
+        so memory use stays constant.
+
+        Attributes:
+            alphabet: Tuple of characters the cipher shifts along.
+            threshold: Confidence at which the offset is locked.
+            min_letters: Fewest letters the offset is locked on, since a
+                handful of letters can look confident by chance.
+            max_buffer: Most characters held back before the offset is
+                locked regardless of confidence.
+            counts: Running letter counts, one per alphabet position.
+            locked: True once the offset no longer changes.
+
+        Examples:
+            >>> cracker = IncrementalCracker()
+            >>> cracker.feed('W kobh hc ')
+            ''
+            >>> cracker.offset
+            14
+            >>> cracker.feed('sbqcrs hvwg ghfwbu.')
+            ''
+            >>> cracker.close()
+            'I want to encode this string.'
+        """
+        self.alphabet = normalize_alphabet(alphabet)
+        self.threshold = threshold
+        self.min_letters = min_letters
+        self.max_buffer = max_buffer
+        self.counts = [0] * len(self.alphabet)
+        self.locked = False
+        self._weights = letter_weights(
+            self.alphabet,
+            CaesarCipher.frequency if frequency is None else frequency)
+        self._scores = None
+        self._offset = None
+        self._buffer = []
+        self._buffered = 0
+        self._empty = ''
+
+    @property
+    def scores(self):
+        """Entropy score of every offset against the letters seen so far."""
+        if self._scores is None:
+            self._scores = score_offsets(self.counts, self._weights)
+        return self._scores
+
+    @property
+    def offset(self):
+        """The most likely offset so far, or None before any letters."""
+        if self._offset is not None:
+            return self._offset
+        if not any(self.counts):
+            return None
+        return rank_offsets(self.scores)[0]
+
+    @property
+    def confidence(self):
+        """Probability that the current offset is right, or 0 before any
+        letters."""
+        if not any(self.counts):
+            return 0.0
+        return confidence(self.scores)
+
+    def feed(self, chunk):
+        """Adds a chunk of ciphertext.
+
+        Args:
+            chunk: The next str or bytes of the ciphertext.
+
+        Returns:
+            Plaintext that can be released now, of the same type as the
+            chunk; empty while the offset is still being learned.
+        """
+        self._empty = chunk[:0]
+        if self.locked:
+            return shift(chunk, -self._offset, self.alphabet)
+
+        for i, count in enumerate(letter_counts(chunk, self.alphabet)):
+            self.counts[i] += count
+        self._scores = None
+        self._buffer.append(chunk)
+        self._buffered += len(chunk)
+        if self._buffered >= self.max_buffer or \
+                (sum(self.counts) >= self.min_letters and
+                 self.confidence >= self.threshold):
+            return self._lock()
+        return self._empty
+
+    def close(self):
+        """Ends the ciphertext, locking the best offset found.
+
+        Returns:
+            Plaintext of everything still held back.
+        """
+        if self.locked:
+            return self._empty
+        return self._lock()
+
+    def _lock(self):
+        self._offset = self.offset or 0
+        self.locked = True
+        buffered = self._empty.join(self._buffer)
+        self._buffer = []
+        self._buffered = 0
+        return shift(buffered, -self._offset, self.alphabet)
@@ -0,0 +1,168 @@
+import mmap
+import os
+from multiprocessing import Pool
+
+from caesarcipher.crack import letter_counts
+from caesarcipher.crack import letter_weights
+from caesarcipher.crack import rank_offsets
+from caesarcipher.crack import score_offsets
+from caesarcipher.engine import compile_byte_table
+from caesarcipher.engine import normalize_alphabet
+from caesarcipher.stats import measure
+
+
+# Size of the window mapped at any one time.  Each worker maps, shifts and
+# unmaps one window before moving on, so resident memory stays flat however
+# large the file is.
+BLOCK_SIZE = 1 << 22
+
+
+def _windows(start, end, block_size):
+    position = start
+    while position < end:
+        base = position - position % mmap.ALLOCATIONGRANULARITY
+        stop = min(position + block_size, end)
+        yield base, position - base, stop - base
+        position = stop
+
+
+def _shift_range(path, start, end, table, block_size=BLOCK_SIZE):
+    with open(path, 'r+b') as handle:
+        for base, low, high in _windows(start, end, block_size):
+            window = mmap.mmap(handle.fileno(), high, offset=base)
+            try:
+                window[low:high] = window[low:high].translate(table)
+            finally:
+                window.close()
+    return end - start
+
+
+def _count_range(path, start, end, alphabet, block_size=BLOCK_SIZE):
+    totals = [0] * len(alphabet)
+    with open(path, 'rb') as handle:
+        for base, low, high in _windows(start, end, block_size):
+            window = mmap.mmap(handle.fileno(), high, offset=base,
+                               access=mmap.ACCESS_READ)
+            try:
+                counts = letter_counts(window[low:high], alphabet)
+            finally:
+                window.close()
+            for i, count in enumerate(counts):
+                totals[i] += count
+    return totals
+
+
+def byte_ranges(size, parts, block_size=BLOCK_SIZE):
+    """Splits a file size into contiguous byte ranges.
+
+    Args:
+        size: Integer size of the file in bytes.
+        parts: Number of ranges wanted.
+        block_size: Ranges are never smaller than this, except the last.
+
+    Returns:
+        List of (start, end) tuples covering the whole file.
+    """
+    step = max(block_size, -(-size // max(parts, 1)))
+    return [(start, min(start + step, size))
+            for start in range(0, size, step)]
+
+
+def _map_ranges(function, arguments, workers):
+    if len(arguments) < 2 or workers == 1:
+        return [function(*argument) for argument in arguments]
+    pool = Pool(min(workers, len(arguments)))
+    try:
+        return pool.starmap(function, arguments)
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def shift_file(path, offset, alphabet=None, workers=None,
+               block_size=BLOCK_SIZE, stats=None):
+    """Applies the Caesar shift to a file in place through memory maps.
+
+    The file is split into byte ranges that worker processes shift in
+    parallel, one mapped window at a time.
+
+    Args:
+        path: Path of the file to rewrite.
+        offset: Integer by which to shift each letter.  Negative offsets
+            decode.
+        alphabet: Iterable of ASCII characters, or None for the default
+            alphabet.
+        workers: Number of worker processes, or None for one per CPU.
+        block_size: Number of bytes mapped at a time by each worker.
+        stats: Optional Stats object to record timings in.
+
+    Returns:
+        Integer number of bytes shifted.
+    """
+    table = compile_byte_table(alphabet, offset)
+    if table is None:
+        raise ValueError("Alphabet must be ASCII to shift files in place.")
+    workers = workers or os.cpu_count() or 1
+    size = os.path.getsize(path)
+    arguments = [(path, start, end, table, block_size)
+                 for start, end in byte_ranges(size, workers, block_size)]
+    shifted = sum(measure(stats, 'cipher', _map_ranges, _shift_range,
+                          arguments, workers))
+    if stats is not None:
+        stats.characters += shifted
+    return shifted
+
+
+def count_file(path, alphabet=None, workers=None, block_size=BLOCK_SIZE,
+               stats=None):
+    """Counts the letters of the alphabet in a file through memory maps.
+
+    Args:
+        path: Path of the file to count.
+        alphabet: Iterable of ASCII characters, or None for the default
+            alphabet.
+        workers: Number of worker processes, or None for one per CPU.
+        block_size: Number of bytes mapped at a time by each worker.
+        stats: Optional Stats object to record timings in.
+
+    Returns:
+        List of integers, one per alphabet position.
+    """
+    alphabet = normalize_alphabet(alphabet)
+    workers = workers or os.cpu_count() or 1
+    size = os.path.getsize(path)
+    arguments = [(path, start, end, alphabet, block_size)
+                 for start, end in byte_ranges(size, workers, block_size)]
+    totals = [0] * len(alphabet)
+    for counts in measure(stats, 'scoring', _map_ranges, _count_range,
+                          arguments, workers):
+        for i, count in enumerate(counts):
+            totals[i] += count
+    return totals
+
+
+def crack_file(path, frequency, alphabet=None, workers=None,
+               block_size=BLOCK_SIZE, stats=None):
+    """Cracks a file in place, decoding it with the most likely offset.
+
+    Args:
+        path: Path of the file to rewrite.
+        frequency: Dict of lowercase letter to expected frequency, or a
+            LanguageModel.
+        alphabet: Iterable of ASCII characters, or None for the default
+            alphabet.
+        workers: Number of worker processes, or None for one per CPU.
+        block_size: Number of bytes mapped at a time by each worker.
+        stats: Optional Stats object to record timings and scores in.
+
+    Returns:
+        Integer offset the file was most likely encoded with.
+    """
+    alphabet = normalize_alphabet(alphabet)
+    counts = count_file(path, alphabet, workers, block_size, stats=stats)
+    scores = score_offsets(counts, letter_weights(alphabet, frequency))
+    offset = rank_offsets(scores)[0]
+    if stats is not None:
+        stats.record_crack(scores)
+    shift_file(path, -offset, alphabet, workers, block_size, stats=stats)
+    return offset
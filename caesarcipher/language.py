@@ -0,0 +1,231 @@
+import hashlib
+import math
+import os
+import struct
+from array import array
+
+
+# Packed model layout: header, name, letters, unigram probabilities as
+# doubles, then optionally a letters x letters table of bigram weights as
+# floats.
+MAGIC = b'CCLM'
+VERSION = 1
+HEADER = struct.Struct('<4sBBHH')
+FLAG_BIGRAMS = 1
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              'data')
+
+
+class LanguageModel(object):
+    def __init__(self, name, letters, probabilities, bigram_weights=None):
+        """Letter statistics of a language, compiled once and shared.
+
+        Attributes:
+            name: Short name of the language.
+            letters: String of the lowercase letters the model knows.
+            probabilities: Array of expected letter frequencies, indexed like
+                letters.
+            weights: Array of -log2 letter frequencies, indexed like letters.
+            bigram_weights: Flat array of -log2 P(second | first) for every
+                pair of letters, indexed first * len(letters) + second, or
+                None for a unigram only model.
+            words: WordFilter of the language's dictionary, if the package
+                ships one under the model's name.
+        """
+        self.name = name
+        self.letters = letters
+        self.probabilities = array('d', probabilities)
+        self.weights = array('d', [- math.log(probability) / math.log(2)
+                                   for probability in self.probabilities])
+        self.bigram_weights = bigram_weights
+        self.index = dict((letter, i) for i, letter in enumerate(letters))
+        self.digest = hashlib.sha1(self.dumps()).hexdigest()
+        self._alphabet_weights = {}
+        self._words = None
+
+    @classmethod
+    def from_frequency(cls, name, frequency):
+        """Builds a unigram model from a dict of letter to frequency."""
+        letters = ''.join(sorted(frequency))
+        return cls(name, letters, [frequency[letter] for letter in letters])
+
+    @classmethod
+    def train(cls, name, frequency, corpus):
+        """Builds a model with bigrams counted from a corpus of text.
+
+        Unigram frequencies come from the frequency dict so scores stay
+        comparable with the unigram model; bigrams are add-one smoothed
+        counts of adjacent letters within words of the corpus.
+        """
+        return cls.train_words(name, frequency, [(corpus, 1)])
+
+    @classmethod
+    def train_words(cls, name, frequency, counts):
+        """Builds a model with bigrams counted from a word frequency list.
+
+        As train(), but the letter pairs of each word count as often as the
+        word occurred, so a frequency list stands in for the corpus it was
+        counted from.
+
+        Args:
+            name: Short name of the language.
+            frequency: Dict of lowercase letter to expected frequency.
+            counts: Iterable of (word, count) pairs.
+
+        Returns:
+            LanguageModel.
+        """
+        model = cls.from_frequency(name, frequency)
+        size = len(model.letters)
+        pairs = [1] * (size * size)
+        for word, count in counts:
+            previous = None
+            for character in word.lower():
+                current = model.index.get(character)
+                if previous is not None and current is not None:
+                    pairs[previous * size + current] += count
+                previous = current
+        weights = array('f')
+        for first in range(size):
+            row = pairs[first * size:(first + 1) * size]
+            total = float(sum(row))
+            weights.extend(- math.log(count / total) / math.log(2)
+                           for count in row)
+        return cls(name, model.letters, model.probabilities, weights)
+
+    @classmethod
+    def loads(cls, data):
+        """Builds a model from its packed bytes."""
+        magic, version, flags, name_length, letters_length = \
+            HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a version {0} language "
+                             "model.".format(VERSION))
+        position = HEADER.size
+        name = data[position:position + name_length].decode('utf-8')
+        position += name_length
+        letters = data[position:position + letters_length].decode('utf-8')
+        position += letters_length
+
+        size = len(letters)
+        probabilities = array('d')
+        probabilities.frombytes(data[position:position + 8 * size])
+        position += 8 * size
+        bigram_weights = None
+        if flags & FLAG_BIGRAMS:
+            bigram_weights = array('f')
+            bigram_weights.frombytes(data[position:position +
+                                          4 * size * size])
+        return cls(name, letters, probabilities, bigram_weights)
+
+    @classmethod
+    def load(cls, path):
+        """Reads a model from a packed file."""
+        with open(path, 'rb') as handle:
+            return cls.loads(handle.read())
+
+    def dumps(self):
+        """Returns the model packed as bytes."""
+        name = self.name.encode('utf-8')
+        letters = self.letters.encode('utf-8')
+        flags = FLAG_BIGRAMS if self.bigram_weights is not None else 0
+        data = [HEADER.pack(MAGIC, VERSION, flags, len(name), len(letters)),
+                name, letters, self.probabilities.tobytes()]
+        if self.bigram_weights is not None:
+            data.append(self.bigram_weights.tobytes())
+        return b''.join(data)
+
+    def save(self, path):
+        """Writes the model to a packed file."""
+        with open(path, 'wb') as handle:
+            handle.write(self.dumps())
+
+    @property
+    def words(self):
+        if self._words is None:
+            # Imported here since the word filter module needs this one.
+            from caesarcipher.words import load_words
+            self._words = load_words(self.name) or False
+        return self._words or None
+
+    def weights_for(self, alphabet):
+        """Returns the weight of each position of a cipher alphabet.
+
+        Letters the model does not know are weighted as its rarest letter.
+        Results are cached per alphabet.
+
+        Args:
+            alphabet: Tuple of characters.
+
+        Returns:
+            List of floats, one per alphabet position.
+        """
+        weights = self._alphabet_weights.get(alphabet)
+        if weights is None:
+            rarest = max(self.weights)
+            weights = [self.weights[self.index[character.lower()]]
+                       if character.lower() in self.index else rarest
+                       for character in alphabet]
+            self._alphabet_weights[alphabet] = weights
+        return weights
+
+    def score_text(self, text):
+        """Scores a plaintext with bigrams, falling back to unigrams.
+
+        Each word's first letter is weighted by its frequency and every
+        following letter by its probability given the letter before it.
+
+        Args:
+            text: A str to score.
+
+        Returns:
+            Float -log2 likelihood of the text (lower is better).
+        """
+        bigrams = self.bigram_weights
+        size = len(self.letters)
+        total = 0.0
+        previous = None
+        for character in text.lower():
+            current = self.index.get(character)
+            if current is not None:
+                if previous is None or bigrams is None:
+                    total += self.weights[current]
+                else:
+                    total += bigrams[previous * size + current]
+            previous = current
+        return total
+
+    def __reduce__(self):
+        # Pickle as packed bytes, leaving per-alphabet caches behind.
+        return LanguageModel.loads, (self.dumps(),)
+
+    def __repr__(self):
+        return "LanguageModel({0!r})".format(self.name)
+
+
+_models = {}
+
+
+def load_language(name):
+    """Returns the shared model for a language shipped with the package.
+
+    Models are loaded from the package data directory once per process.
+
+    Args:
+        name: Name of the language, such as 'english'.
+
+    Returns:
+        LanguageModel.
+    """
+    model = _models.get(name)
+    if model is None:
+        model = LanguageModel.load(os.path.join(DATA_DIRECTORY,
+                                                name + '.lm'))
+        _models[name] = model
+    return model
+
+
+def english():
+    """Returns the shared English model."""
+    return load_language('english')
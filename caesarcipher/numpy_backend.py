@@ -0,0 +1,123 @@
+# Vectorized Caesar shift and letter counting for byte buffers.  Only
+# available when NumPy is installed; buffers are treated as ASCII.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from caesarcipher.crack import letter_weights
+from caesarcipher.engine import compile_byte_table
+from caesarcipher.engine import normalize_alphabet
+
+
+def available():
+    """Returns True if NumPy could be imported."""
+    return numpy is not None
+
+
+def _require_numpy():
+    if numpy is None:
+        raise ImportError("NumPy is required for the numpy backend.")
+
+
+def as_array(data):
+    """Views a bytes-like object or uint8 ndarray as a flat uint8 array.
+
+    No data is copied; read-only inputs give read-only arrays.
+    """
+    _require_numpy()
+    if isinstance(data, numpy.ndarray):
+        if data.dtype != numpy.uint8:
+            raise ValueError("Arrays must have dtype uint8.")
+        return data.reshape(-1)
+    return numpy.frombuffer(data, dtype=numpy.uint8)
+
+
+def lookup_table(offset, alphabet=None):
+    """Returns the 256 entry uint8 lookup table for an alphabet and offset."""
+    _require_numpy()
+    table = compile_byte_table(alphabet, offset)
+    if table is None:
+        raise ValueError("Alphabet must be ASCII to shift bytes.")
+    return numpy.frombuffer(table, dtype=numpy.uint8)
+
+
+def shift(data, offset, alphabet=None, out=None):
+    """Applies the Caesar shift to a byte buffer with a single np.take.
+
+    Args:
+        data: bytes, bytearray, memoryview or uint8 ndarray.
+        offset: Integer by which to shift each letter.  Negative offsets
+            decode.
+        alphabet: Iterable of characters, or None for the default alphabet.
+        out: Optional writable uint8 ndarray of the same length to write
+            into.  May be the input array itself to shift in place.
+
+    Returns:
+        A uint8 ndarray for ndarray input or when out is given, otherwise
+        bytes.
+    """
+    array = as_array(data)
+    result = numpy.take(lookup_table(offset, alphabet), array, out=out)
+    if out is None and not isinstance(data, numpy.ndarray):
+        return result.tobytes()
+    return result
+
+
+def letter_counts(data, alphabet=None):
+    """Counts the letters of the alphabet in a byte buffer with np.bincount.
+
+    Args:
+        data: bytes, bytearray, memoryview or uint8 ndarray.
+        alphabet: Iterable of ASCII characters, or None for the default
+            alphabet.
+
+    Returns:
+        List of integers, one per alphabet position.
+    """
+    _require_numpy()
+    histogram = numpy.bincount(as_array(data), minlength=256)
+    counts = []
+    for character in normalize_alphabet(alphabet):
+        count = int(histogram[ord(character)])
+        upper = character.upper()
+        if upper != character:
+            count += int(histogram[ord(upper)])
+        counts.append(count)
+    return counts
+
+
+def score_offsets(counts, weights):
+    """Scores every offset against a letter histogram as one matrix product.
+
+    Returns:
+        List of entropy scores indexed by offset (lower is better).
+    """
+    _require_numpy()
+    length = len(counts)
+    positions = numpy.arange(length)
+    rotations = (positions[numpy.newaxis, :] -
+                 positions[:, numpy.newaxis]) % length
+    weights = numpy.asarray(weights, dtype=numpy.float64)
+    counts = numpy.asarray(counts, dtype=numpy.float64)
+    return (weights[rotations] * counts).sum(axis=1).tolist()
+
+
+def crack(data, frequency, alphabet=None):
+    """Finds the offset a byte buffer was most likely encoded with.
+
+    Args:
+        data: bytes, bytearray, memoryview or uint8 ndarray.
+        frequency: Dict of lowercase letter to expected frequency, or a
+            LanguageModel.
+        alphabet: Iterable of ASCII characters, or None for the default
+            alphabet.
+
+    Returns:
+        Tuple of the integer offset and its entropy score.
+    """
+    alphabet = normalize_alphabet(alphabet)
+    scores = score_offsets(letter_counts(data, alphabet),
+                           letter_weights(alphabet, frequency))
+    offset = min(range(len(scores)), key=scores.__getitem__)
+    return offset, scores[offset]
@@ -0,0 +1,271 @@
+from collections import Counter
+
+from caesarcipher.caesarcipher import CaesarCipher
+from caesarcipher.crack import letter_weights
+from caesarcipher.crack import rank_offsets
+from caesarcipher.crack import score_offsets
+from caesarcipher.engine import compile_table
+from caesarcipher.engine import normalize_alphabet
+
+
+# Longest key tried when searching for the key length.
+MAX_KEY_LENGTH = 20
+
+# A key length is accepted once the mean index of coincidence of its columns
+# covers this fraction of the way from random letters to the language's own.
+# Multiples of the true length score about as well, so the shortest length
+# to qualify wins.
+KEY_LENGTH_THRESHOLD = 0.75
+
+
+def normalize_key(key, alphabet=None):
+    """Returns a key as a tuple of integer offsets.
+
+    Args:
+        key: Iterable of integer offsets, or a str of alphabet characters
+            where each character stands for its position in the alphabet.
+        alphabet: Iterable of characters, or None for the default alphabet.
+
+    Returns:
+        Tuple of integers.
+    """
+    if isinstance(key, str):
+        alphabet = normalize_alphabet(alphabet)
+        return tuple(alphabet.index(character) for character in key.lower())
+    return tuple(key)
+
+
+def _periodic_shift(text, key, alphabet):
+    if not key:
+        raise ValueError("Keys must have at least one offset.")
+    tables = [compile_table(alphabet, offset) for offset in key]
+    letters = tables[0].keys() if tables[0] else ()
+    length = len(tables)
+    shifted = []
+    position = 0
+    for character in text:
+        code = ord(character)
+        if code in letters:
+            shifted.append(tables[position % length][code])
+            position += 1
+        else:
+            shifted.append(character)
+    return ''.join(shifted)
+
+
+def encode_periodic(text, key, alphabet=None):
+    """Encodes a str with a Caesar shift that rotates through a key.
+
+    Only letters of the alphabet advance the key, so spaces and punctuation
+    pass through without using up a shift.
+
+    Args:
+        text: A str to encode.
+        key: Iterable of integer offsets, or a str of alphabet characters.
+        alphabet: Iterable of characters, or None for the default alphabet.
+
+    Returns:
+        The encoded str.
+
+    Examples:
+        >>> encode_periodic('Attack at dawn', 'lemon')
+        'Lxfopv ef rnhr'
+    """
+    alphabet = normalize_alphabet(alphabet)
+    return _periodic_shift(text, normalize_key(key, alphabet), alphabet)
+
+
+def decode_periodic(text, key, alphabet=None):
+    """Decodes a str encoded with encode_periodic()."""
+    alphabet = normalize_alphabet(alphabet)
+    return _periodic_shift(text, tuple(- offset for offset in
+                                       normalize_key(key, alphabet)),
+                           alphabet)
+
+
+def letter_positions(text, alphabet=None):
+    """Returns the alphabet position of every letter of a str, in order.
+
+    Uppercase letters share the position of their lowercase form and
+    characters outside the alphabet are skipped.
+    """
+    alphabet = normalize_alphabet(alphabet)
+    positions = {}
+    for i, character in enumerate(alphabet):
+        if character.isalpha():
+            positions.setdefault(character, i)
+            positions.setdefault(character.upper(), i)
+    return [positions[character] for character in text
+            if character in positions]
+
+
+def column_counts(positions, key_length, size):
+    """Counts letters in each column of a text split by key position.
+
+    Args:
+        positions: List of alphabet positions, as from letter_positions().
+        key_length: Number of columns.
+        size: Length of the alphabet.
+
+    Returns:
+        List of key_length lists of integer counts, one per alphabet
+        position.
+    """
+    columns = []
+    for column in range(key_length):
+        counts = Counter(positions[column::key_length])
+        columns.append([counts[i] for i in range(size)])
+    return columns
+
+
+def index_of_coincidence(counts):
+    """Returns the chance two letters drawn from a histogram are the same.
+
+    English text scores about 0.066 and uniformly random letters about
+    0.038, whatever Caesar shift has been applied.
+    """
+    total = sum(counts)
+    if total < 2:
+        return 0.0
+    return sum(count * (count - 1) for count in counts) / \
+        float(total * (total - 1))
+
+
+def key_lengths(positions, size, max_length=MAX_KEY_LENGTH):
+    """Ranks key lengths by the mean index of coincidence of their columns.
+
+    Each length costs one pass over the letters, so ranking every length up
+    to max_length is O(n * max_length).
+
+    Args:
+        positions: List of alphabet positions, as from letter_positions().
+        size: Length of the alphabet.
+        max_length: Longest key length to try.
+
+    Returns:
+        List of (key length, mean index of coincidence) tuples, highest
+        first.
+    """
+    scores = []
+    for length in range(1, min(max_length, max(len(positions) // 2, 1)) + 1):
+        columns = column_counts(positions, length, size)
+        scores.append((length, sum(index_of_coincidence(counts)
+                                   for counts in columns) / length))
+    return sorted(scores, key=lambda score: -score[1])
+
+
+def expected_coincidence(weights):
+    """Returns the index of coincidence of plaintext in a language.
+
+    Args:
+        weights: Letter weights, as from letter_weights().
+    """
+    probabilities = [2.0 ** - weight for weight in weights]
+    total = sum(probabilities)
+    return sum((probability / total) ** 2 for probability in probabilities)
+
+
+def likely_key_length(scores, expected, size):
+    """Picks the key length from the scores of key_lengths().
+
+    The shortest length whose columns look like plaintext is chosen, since
+    multiples of the true length score about as well as it does.
+
+    Args:
+        scores: List of (key length, index of coincidence) tuples.
+        expected: Index of coincidence of plaintext, as from
+            expected_coincidence().
+        size: Length of the alphabet.
+
+    Returns:
+        Integer key length.
+    """
+    if not scores:
+        return 1
+    random = 1.0 / size
+    threshold = random + KEY_LENGTH_THRESHOLD * (expected - random)
+    qualified = [length for length, coincidence in scores
+                 if coincidence >= threshold]
+    if not qualified:
+        return scores[0][0]
+    return min(qualified)
+
+
+def shortest_period(key):
+    """Returns the shortest key that repeats to the given one."""
+    length = len(key)
+    for period in range(1, length):
+        if length % period == 0 and key == key[:period] * (length // period):
+            return key[:period]
+    return key
+
+
+class PeriodicCandidate(object):
+    def __init__(self, text, key, score, alphabet=None):
+        """A possible key for a periodic ciphertext, decrypted on demand.
+
+        Attributes:
+            text: The ciphertext.
+            key: Tuple of integer offsets the ciphertext is believed to be
+                encoded with.
+            score: Entropy score of the plaintext (lower is better).
+            alphabet: Alphabet the ciphertext was encoded against.
+        """
+        self.text = text
+        self.key = key
+        self.score = score
+        self.alphabet = alphabet
+        self._plaintext = None
+
+    @property
+    def plaintext(self):
+        """Decodes the ciphertext with this candidate's key."""
+        if self._plaintext is None:
+            self._plaintext = decode_periodic(self.text, self.key,
+                                              self.alphabet)
+        return self._plaintext
+
+    def __repr__(self):
+        return "PeriodicCandidate(key={0}, score={1})".format(self.key,
+                                                              self.score)
+
+
+def crack_periodic(text, frequency=None, alphabet=None,
+                   max_length=MAX_KEY_LENGTH, key_length=None):
+    """Cracks a ciphertext encoded with a rotating Caesar shift.
+
+    The key length is found by index of coincidence, then each column of
+    letters sharing a key position is cracked on its own with the histogram
+    scorer, so the cost is O(n * max_length) rather than exponential in the
+    key length.
+
+    Args:
+        text: The ciphertext, as a str.
+        frequency: Dict of lowercase letter to expected frequency, a
+            LanguageModel, or None for CaesarCipher.frequency.
+        alphabet: Iterable of characters, or None for the default alphabet.
+        max_length: Longest key length to try.
+        key_length: Known key length, skipping the search.
+
+    Returns:
+        PeriodicCandidate with the most likely key.
+    """
+    alphabet = normalize_alphabet(alphabet)
+    if frequency is None:
+        frequency = CaesarCipher.frequency
+    weights = letter_weights(alphabet, frequency)
+    positions = letter_positions(text, alphabet)
+    if key_length is None:
+        key_length = likely_key_length(
+            key_lengths(positions, len(alphabet), max_length),
+            expected_coincidence(weights), len(alphabet))
+
+    key = []
+    score = 0.0
+    for counts in column_counts(positions, key_length, len(alphabet)):
+        scores = score_offsets(counts, weights)
+        offset = rank_offsets(scores)[0]
+        key.append(offset)
+        score += scores[offset]
+    return PeriodicCandidate(text, shortest_period(tuple(key)), score,
+                             alphabet)
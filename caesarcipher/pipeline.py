@@ -0,0 +1,116 @@
+# Background threads that let reading, shifting and writing a stream overlap.
+# Only pays off where a stage releases the GIL, as zlib, bz2 and lzma do while
+# they decompress or compress.
+import queue
+import threading
+
+
+# Chunks buffered between two stages.  Bounds memory to a few chunks while
+# leaving each thread something to work on.
+QUEUE_DEPTH = 4
+
+
+def prefetch(iterable, depth=QUEUE_DEPTH):
+    """Yields the items of an iterable, producing them on a background thread.
+
+    Exceptions raised while producing are raised again in the consumer.
+    Abandoning the generator stops the thread.
+
+    Args:
+        iterable: Any iterable, such as iter_chunks() over a stream.
+        depth: Number of items produced ahead of the consumer.
+
+    Yields:
+        The items of the iterable, in order.
+    """
+    items = queue.Queue(depth)
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for item in iterable:
+                items.put((True, item))
+                if stop.is_set():
+                    return
+            items.put((False, None))
+        except Exception as error:
+            items.put((False, error))
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            more, item = items.get()
+            if not more:
+                if item is not None:
+                    raise item
+                break
+            yield item
+    finally:
+        stop.set()
+        # Make room for a producer blocked on a full queue, so it sees the
+        # stop flag.
+        while thread.is_alive():
+            try:
+                items.get(timeout=0.01)
+            except queue.Empty:
+                pass
+        thread.join()
+
+
+class BackgroundWriter(object):
+    def __init__(self, destination, depth=QUEUE_DEPTH):
+        """Writes to a binary stream from a background thread.
+
+        Chunks passed to write() must not be modified afterwards.  The first
+        error raised by the destination is raised again by every later
+        write(), flush() or close(), and no chunk queued after it is
+        written, so a failed write never leaves a silent hole.
+
+        Attributes:
+            destination: Binary file object written to.
+        """
+        self.destination = destination
+        self._chunks = queue.Queue(depth)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            chunk = self._chunks.get()
+            try:
+                if chunk is None:
+                    return
+                if self._error is None:
+                    self.destination.write(chunk)
+            except Exception as error:
+                self._error = error
+            finally:
+                self._chunks.task_done()
+
+    def _check(self):
+        if self._error is not None:
+            raise self._error
+
+    def write(self, chunk):
+        """Queues a chunk to be written, returning its length."""
+        self._check()
+        self._chunks.put(chunk)
+        return len(chunk)
+
+    def flush(self):
+        """Waits for every queued chunk to be written, then flushes."""
+        self._chunks.join()
+        self._check()
+        self.destination.flush()
+
+    def close(self):
+        """Writes every queued chunk and stops the thread.
+
+        The destination itself is left open.
+        """
+        if self._thread.is_alive():
+            self._chunks.put(None)
+            self._thread.join()
+        self._check()
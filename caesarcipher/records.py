@@ -0,0 +1,199 @@
+import csv
+import io
+import json
+import shutil
+import tempfile
+from functools import partial
+
+from caesarcipher.batch import CHUNKSIZE
+from caesarcipher.batch import ordered_map
+from caesarcipher.cache import cached_crack
+from caesarcipher.corpus import count_messages
+from caesarcipher.corpus import solve
+from caesarcipher.engine import normalize_alphabet
+from caesarcipher.engine import shift
+from caesarcipher.language import english
+from caesarcipher.stats import measure
+
+
+FORMATS = ('jsonl', 'csv')
+OPERATIONS = ('encode', 'decode', 'crack')
+
+# Fields added to each record by a crack.
+OFFSET_FIELD = 'offset'
+SCORE_FIELD = 'score'
+
+_END = object()
+
+
+def read_records(source, format):
+    """Yields records as dicts from a text stream of JSON lines or CSV."""
+    if format == 'csv':
+        for record in csv.DictReader(source):
+            yield record
+        return
+    for line in source:
+        if line.strip():
+            yield json.loads(line)
+
+
+def process_record(record, field, operation, offset=0, alphabet=None,
+                   language=None, cache=None):
+    """Encodes, decodes or cracks one field of a record.
+
+    Records without the field, and JSON values that are not objects, are
+    returned unchanged.  Cracked records gain the detected offset and its
+    score.
+
+    Args:
+        record: Dict of field name to value.
+        field: Name of the field holding the text.
+        operation: One of 'encode', 'decode' or 'crack'.
+        offset: Integer offset for encode and decode.
+        alphabet: Iterable of characters, or None for the default alphabet.
+        language: LanguageModel to crack against, or None for English.
+        cache: CrackCache to answer repeated cracks from, or None.
+
+    Returns:
+        The updated record.
+    """
+    if not isinstance(record, dict):
+        return record
+    text = record.get(field)
+    if not isinstance(text, str):
+        return record
+    if operation == 'encode':
+        record[field] = shift(text, offset, alphabet)
+    elif operation == 'decode':
+        record[field] = shift(text, -offset, alphabet)
+    else:
+        candidate = cached_crack(text, language or english(), alphabet,
+                                 cache)
+        record[field] = candidate.plaintext
+        record[OFFSET_FIELD] = candidate.offset
+        record[SCORE_FIELD] = candidate.score
+    return record
+
+
+def process_records(source, destination, format, field, operation, offset=0,
+                    alphabet=None, workers=None, chunksize=CHUNKSIZE,
+                    language=None, stats=None, cache=None):
+    """Streams records from one text stream to another, shifting a field.
+
+    Records are handled one chunk at a time, across worker processes if
+    asked, and written in input order.  JSON lines that are not objects are
+    written unchanged.
+
+    Args:
+        source: Text stream of JSON lines or CSV to read.
+        destination: Text stream to write the same format to.
+        format: One of 'jsonl' or 'csv'.
+        field: Name of the field holding the text.
+        operation: One of 'encode', 'decode' or 'crack'.
+        offset: Integer offset for encode and decode.
+        alphabet: Iterable of characters, or None for the default alphabet.
+        workers: Number of worker processes, or None to run in this process.
+        chunksize: Number of records sent to a worker at a time.
+        language: LanguageModel to crack against, or None for English.
+        stats: Optional Stats object to record timings in.
+        cache: CrackCache to answer repeated cracks from, or None.  Worker
+            processes open their own connection to its database.
+
+    Returns:
+        Integer number of records written.
+    """
+    if format not in FORMATS:
+        raise ValueError("Format must be one of {0}.".format(
+            ', '.join(FORMATS)))
+    if operation not in OPERATIONS:
+        raise ValueError("Operation must be one of {0}.".format(
+            ', '.join(OPERATIONS)))
+
+    function = partial(process_record, field=field, operation=operation,
+                       offset=offset, alphabet=normalize_alphabet(alphabet),
+                       language=language, cache=cache)
+
+    if format == 'csv':
+        reader = csv.DictReader(source)
+        fieldnames = list(reader.fieldnames or [])
+        if operation == 'crack':
+            fieldnames.extend(added for added in (OFFSET_FIELD, SCORE_FIELD)
+                              if added not in fieldnames)
+        writer = csv.DictWriter(destination, fieldnames)
+        if fieldnames:
+            writer.writeheader()
+        write = writer.writerow
+    else:
+        reader = read_records(source, format)
+
+        def write(record):
+            destination.write(json.dumps(record) + '\n')
+
+    records = ordered_map(function, reader, workers, chunksize)
+    written = 0
+    while True:
+        record = measure(stats, 'cipher', next, records, _END)
+        if record is _END:
+            break
+        if stats is not None and isinstance(record, dict) and \
+                isinstance(record.get(field), str):
+            stats.characters += len(record[field])
+        write(record)
+        written += 1
+    destination.flush()
+    return written
+
+
+def _seekable(stream):
+    try:
+        return stream.seekable()
+    except AttributeError:
+        return False
+
+
+def crack_records_corpus(source, destination, format, field, alphabet=None,
+                         workers=None, chunksize=CHUNKSIZE, language=None,
+                         stats=None):
+    """Cracks records that all share one offset, decoding every one.
+
+    The field is counted across all records and the merged histogram is
+    scored once, so records too short to crack alone are still decoded
+    correctly.  This takes two passes, so input that cannot be rewound is
+    spooled to a temporary file during the first.
+
+    Args:
+        source: Text stream of JSON lines or CSV to read.
+        destination: Text stream to write the same format to.
+        format: One of 'jsonl' or 'csv'.
+        field: Name of the field holding the text.
+        alphabet: Iterable of characters, or None for the default alphabet.
+        workers: Number of worker processes, or None to run in this process.
+        chunksize: Number of records sent to a worker at a time.
+        language: LanguageModel to crack against, or None for English.
+        stats: Optional Stats object to record timings and scores in.
+
+    Returns:
+        Integer offset the records were most likely encoded with.
+    """
+    alphabet = normalize_alphabet(alphabet)
+    spool = None
+    if not _seekable(source):
+        spool = io.TextIOWrapper(tempfile.TemporaryFile(), encoding='utf-8',
+                                 newline='')
+        shutil.copyfileobj(source, spool)
+        source = spool
+        source.seek(0)
+    try:
+        start = source.tell()
+        texts = (record.get(field) for record in read_records(source, format)
+                 if isinstance(record, dict))
+        counts = count_messages((text for text in texts
+                                 if isinstance(text, str)), alphabet)
+        offset = solve(counts, language or english(), alphabet, stats)
+        source.seek(start)
+        process_records(source, destination, format, field, 'decode', offset,
+                        alphabet, workers, chunksize, language, stats)
+    finally:
+        if spool is not None:
+            spool.close()
+    return offset
@@ -0,0 +1,298 @@
+import argparse
+import asyncio
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from timeit import default_timer
+
+from caesarcipher.codec import Codec
+
+
+# Requests arriving within this many seconds of each other are handled as one
+# batch.
+BATCH_WINDOW = 0.002
+BATCH_SIZE = 256
+
+# Cracks of ciphertexts longer than this run in the process pool so the event
+# loop stays responsive.
+OFFLOAD_SIZE = 1 << 16
+
+# Longest request line read, in bytes.  Must stay well above OFFLOAD_SIZE so
+# the cracks worth offloading can arrive at all.
+LINE_LIMIT = 1 << 24
+
+OPERATIONS = ('encode', 'decode', 'crack')
+
+
+class RequestError(Exception):
+    pass
+
+
+def handle(request, codecs=None):
+    """Runs a single decoded request and returns the response fields.
+
+    Requests are dicts with an op of 'encode', 'decode' or 'crack', the
+    text, and an offset for encode and decode.  An alphabet string may be
+    given to override the default.
+
+    Args:
+        request: Dict decoded from a JSON request line.
+        codecs: Optional dict of (alphabet, offset) to Codec, shared by the
+            requests of a batch so each codec is built once.
+
+    Returns:
+        Dict of response fields.
+    """
+    operation = request.get('op')
+    if operation not in OPERATIONS:
+        raise RequestError("Unknown op: {0!r}".format(operation))
+    text = request.get('text')
+    if not isinstance(text, str):
+        raise RequestError("Requests need a text string.")
+    alphabet = request.get('alphabet')
+    if alphabet is not None and (not isinstance(alphabet, str) or
+                                 not alphabet):
+        raise RequestError("Alphabets must be non-empty strings.")
+    offset = request.get('offset', 0)
+    if operation != 'crack' and (not isinstance(offset, int) or
+                                 isinstance(offset, bool)):
+        raise RequestError("Encode and decode need an integer offset.")
+    if operation == 'crack':
+        offset = 0
+
+    if codecs is None:
+        codecs = {}
+    codec = codecs.get((alphabet, offset))
+    if codec is None:
+        codec = codecs[(alphabet, offset)] = Codec(alphabet, offset)
+    if operation == 'encode':
+        return {'result': codec.encode(text)}
+    if operation == 'decode':
+        return {'result': codec.decode(text)}
+    candidate = codec.crack_candidates(text, k=1)[0]
+    return {'result': candidate.plaintext, 'offset': candidate.offset,
+            'score': candidate.score}
+
+
+class CipherServer(object):
+    def __init__(self, workers=None, batch_window=BATCH_WINDOW,
+                 batch_size=BATCH_SIZE, offload_size=OFFLOAD_SIZE,
+                 line_limit=LINE_LIMIT):
+        """An asyncio server speaking JSON lines for encode, decode and crack.
+
+        Each line received is a JSON request; each line sent back is a JSON
+        response carrying the request's id, the result or an error, and the
+        time the request took in milliseconds.  Concurrent requests are
+        gathered into micro-batches and handled together; large cracks are
+        sent to a process pool.  Lines longer than line_limit are skipped
+        and answered with an error.
+
+        Attributes:
+            workers: Number of processes in the crack pool, or None for one
+                per CPU.
+            batch_window: Seconds to wait for more requests to join a batch.
+            batch_size: Most requests handled in one batch.
+            offload_size: Crack texts longer than this run in the pool.
+            line_limit: Longest request line read, in bytes.
+        """
+        self.workers = workers
+        self.batch_window = batch_window
+        self.batch_size = batch_size
+        self.offload_size = offload_size
+        self.line_limit = line_limit
+        self.executor = None
+        self.queue = None
+        self.batcher = None
+        self.server = None
+
+    async def start(self, host=None, port=None, path=None):
+        """Starts listening on a TCP host and port or a unix socket path."""
+        self.executor = ProcessPoolExecutor(self.workers)
+        self.queue = asyncio.Queue()
+        self.batcher = asyncio.ensure_future(self._batch_loop())
+        if path is not None:
+            self.server = await asyncio.start_unix_server(
+                self._connection, path, limit=self.line_limit)
+        else:
+            self.server = await asyncio.start_server(
+                self._connection, host, port, limit=self.line_limit)
+        return self.server
+
+    async def close(self):
+        """Stops listening, finishing the batcher and the process pool."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.batcher is not None:
+            self.batcher.cancel()
+            try:
+                await self.batcher
+            except asyncio.CancelledError:
+                pass
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    async def submit(self, request):
+        """Queues a decoded request and waits for its response fields."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((request, future))
+        return await future
+
+    async def _connection(self, reader, writer):
+        # Lines are handled concurrently so one connection can pipeline many
+        # requests; responses carry the request id and may come back out of
+        # order.
+        pending = set()
+
+        async def send(response):
+            writer.write(json.dumps(response).encode('utf-8') + b'\n')
+            await writer.drain()
+
+        async def respond(line):
+            await send(await self._respond(line))
+
+        try:
+            while True:
+                try:
+                    line = await reader.readuntil(b'\n')
+                except asyncio.IncompleteReadError as error:
+                    line = error.partial
+                except asyncio.LimitOverrunError as error:
+                    start = default_timer()
+                    await _skip_line(reader, error.consumed)
+                    await send({'id': None,
+                                'error': "Request lines are limited to {0} "
+                                         "bytes.".format(self.line_limit),
+                                'latency_ms': (default_timer() - start) *
+                                1000.0})
+                    continue
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.ensure_future(respond(line))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.wait(pending)
+        finally:
+            writer.close()
+
+    async def _respond(self, line):
+        start = default_timer()
+        response = {}
+        try:
+            request = json.loads(line.decode('utf-8'))
+            if not isinstance(request, dict):
+                raise RequestError("Requests must be JSON objects.")
+            response['id'] = request.get('id')
+            response.update(await self.submit(request))
+        except (ValueError, RequestError) as error:
+            response['error'] = str(error)
+        except Exception as error:
+            # Anything else is a bug, but the client still gets its line.
+            logging.exception("Request failed: %r", line)
+            response['error'] = "{0}: {1}".format(type(error).__name__,
+                                                  error)
+        response['latency_ms'] = (default_timer() - start) * 1000.0
+        return response
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(),
+                                                        timeout))
+                except asyncio.TimeoutError:
+                    break
+            self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        loop = asyncio.get_running_loop()
+        codecs = {}
+        for request, future in batch:
+            if future.cancelled():
+                continue
+            text = request.get('text')
+            # A failing request fails only its own future; letting the
+            # exception out would end the batcher and stall every client.
+            try:
+                if request.get('op') == 'crack' and isinstance(text, str) \
+                        and len(text) > self.offload_size:
+                    pooled = loop.run_in_executor(self.executor, handle,
+                                                  request)
+                    pooled.add_done_callback(
+                        lambda result, future=future: _settle(future, result))
+                else:
+                    future.set_result(handle(request, codecs))
+            except Exception as error:
+                future.set_exception(error)
+
+
+async def _skip_line(reader, consumed):
+    # Drops the rest of an overlong line, consumed bytes at a time, as
+    # readuntil() reports how much of the buffer holds no newline.
+    while True:
+        await reader.readexactly(consumed)
+        try:
+            await reader.readuntil(b'\n')
+            return
+        except asyncio.LimitOverrunError as error:
+            consumed = error.consumed
+        except asyncio.IncompleteReadError:
+            return
+
+
+def _settle(future, result):
+    if future.cancelled():
+        return
+    if result.exception() is not None:
+        future.set_exception(result.exception())
+    else:
+        future.set_result(result.result())
+
+
+parser = argparse.ArgumentParser(prog="caesarcipher serve",
+                                 description="Serve encode, decode and crack "
+                                             "requests as JSON lines.")
+parser.add_argument('--host', default='127.0.0.1',
+                    help="Host to listen on.")
+parser.add_argument('-p', '--port', type=int, default=7777,
+                    help="TCP port to listen on.")
+parser.add_argument('-u', '--unix', metavar="PATH",
+                    help="Listen on a unix socket at PATH instead of TCP.")
+parser.add_argument('-w', '--workers', type=int,
+                    help="Number of processes for large cracks.")
+parser.add_argument('--line-limit', type=int, default=LINE_LIMIT,
+                    metavar="BYTES",
+                    help="Longest request line accepted.")
+
+
+def main(argv=None):
+    """Runs the server from the command line until interrupted."""
+    arguments = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    server = CipherServer(workers=arguments.workers,
+                          line_limit=arguments.line_limit)
+
+    async def serve():
+        await server.start(arguments.host, arguments.port, arguments.unix)
+        logging.info("Listening on {0}".format(
+            arguments.unix or "{0}:{1}".format(arguments.host,
+                                               arguments.port)))
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -0,0 +1,78 @@
+import os
+from multiprocessing import shared_memory
+
+from caesarcipher.buffers import translate_into
+from caesarcipher.engine import compile_byte_table
+from caesarcipher.engine import shift
+from caesarcipher.inplace import _map_ranges
+from caesarcipher.inplace import byte_ranges
+
+
+# Messages smaller than this are shifted in this process; below it, starting
+# workers costs more than it saves.
+PARALLEL_THRESHOLD = 1 << 24
+
+# Smallest slice handed to a worker.
+SLICE_SIZE = 1 << 20
+
+
+def _shift_slice(name, start, end, table):
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        view = block.buf[start:end]
+        try:
+            translate_into(view, view, table)
+        finally:
+            view.release()
+    finally:
+        block.close()
+    return end - start
+
+
+def parallel_shift(data, offset, alphabet=None, workers=None,
+                   threshold=PARALLEL_THRESHOLD):
+    """Applies the Caesar shift to one large message across processes.
+
+    The message is copied once into shared memory, worker processes shift
+    disjoint slices of it in place, and the result is copied back out, so
+    the payload itself is never pickled.  Empty messages, messages below
+    the threshold, a single worker, or an alphabet that is not ASCII use the
+    serial shift.
+
+    A str is shifted as its UTF-8 encoding, which leaves multibyte
+    characters alone since only ASCII bytes are translated.
+
+    Args:
+        data: A str, bytes or bytearray to shift.
+        offset: Integer by which to shift each letter.  Negative offsets
+            decode.
+        alphabet: Iterable of characters, or None for the default alphabet.
+        workers: Number of worker processes, or None for one per CPU.
+        threshold: Size in bytes from which work is split across processes.
+
+    Returns:
+        Shifted data of the same type as the input.
+    """
+    workers = workers or os.cpu_count() or 1
+    table = compile_byte_table(alphabet, offset)
+    if workers == 1 or table is None or not data or len(data) < threshold:
+        return shift(data, offset, alphabet)
+
+    payload = data.encode('utf-8') if isinstance(data, str) else data
+    size = len(payload)
+    block = shared_memory.SharedMemory(create=True, size=size)
+    try:
+        block.buf[:size] = payload
+        arguments = [(block.name, start, end, table) for start, end in
+                     byte_ranges(size, workers, SLICE_SIZE)]
+        _map_ranges(_shift_slice, arguments, workers)
+        result = bytes(block.buf[:size])
+    finally:
+        block.close()
+        block.unlink()
+
+    if isinstance(data, str):
+        return result.decode('utf-8')
+    if isinstance(data, bytearray):
+        return bytearray(result)
+    return result
@@ -0,0 +1,124 @@
+from contextlib import contextmanager
+from timeit import default_timer
+
+
+# Stages reported on, in order.
+STAGES = ('io', 'cipher', 'scoring')
+
+
+class Stats(object):
+    def __init__(self):
+        """Counters and timers for cipher operations.
+
+        Pass an instance wherever a stats argument is accepted to collect
+        numbers; code paths given None skip all bookkeeping, so leaving stats
+        off costs a single comparison per call.
+
+        Attributes:
+            characters: Number of characters or bytes run through the cipher.
+            timings: Dict of stage name to seconds spent in that stage.
+            candidates: Number of crack candidates scored.
+            score: Entropy score of the winning crack candidate.
+            margin: Score difference between the winning candidate and the
+                best scoring other offset (higher is more decisive, negative
+                when re-ranking overruled the scores).
+            engines: Dict of operation name to the name of the engine that
+                last ran it.
+        """
+        self.characters = 0
+        self.timings = dict((stage, 0.0) for stage in STAGES)
+        self.candidates = 0
+        self.score = None
+        self.margin = None
+        self.engines = {}
+
+    @contextmanager
+    def stage(self, name):
+        """Context manager adding the time spent inside it to a stage."""
+        start = default_timer()
+        try:
+            yield
+        finally:
+            self.timings[name] = (self.timings.get(name, 0.0) +
+                                  default_timer() - start)
+
+    def record_crack(self, scores, offset=None):
+        """Records the scores of every offset tried in a crack.
+
+        Args:
+            scores: List of entropy scores indexed by offset.
+            offset: Offset the crack picked, or None for the best scoring.
+        """
+        self.candidates += len(scores)
+        if not scores:
+            return
+        if offset is None:
+            offset = min(range(len(scores)), key=scores.__getitem__)
+        self.score = scores[offset]
+        others = scores[:offset] + scores[offset + 1:]
+        if others:
+            self.margin = min(others) - self.score
+
+    def record_engine(self, operation, name):
+        """Records which engine ran an operation."""
+        self.engines[operation] = name
+
+    @property
+    def throughput(self):
+        """Characters per second through the cipher and scoring stages."""
+        elapsed = self.timings['cipher'] + self.timings['scoring']
+        if not elapsed:
+            return 0.0
+        return self.characters / elapsed
+
+    def as_dict(self):
+        """Returns the collected numbers as a plain dict."""
+        return {'characters': self.characters,
+                'throughput': self.throughput,
+                'timings': dict(self.timings),
+                'candidates': self.candidates,
+                'score': self.score,
+                'margin': self.margin,
+                'engines': dict(self.engines)}
+
+    def report(self):
+        """Returns the collected numbers as human readable lines."""
+        lines = ["Characters: {0}".format(self.characters),
+                 "Throughput: {0:.0f} characters/second".format(
+                     self.throughput)]
+        for stage in sorted(self.timings, key=_stage_order):
+            lines.append("Time in {0}: {1:.6f}s".format(
+                stage, self.timings[stage]))
+        for operation in sorted(self.engines):
+            lines.append("Engine for {0}: {1}".format(
+                operation, self.engines[operation]))
+        if self.candidates:
+            lines.append("Crack candidates evaluated: {0}".format(
+                self.candidates))
+            lines.append("Winning score: {0}".format(self.score))
+            lines.append("Winning margin: {0}".format(self.margin))
+        return lines
+
+
+def measure(stats, stage, function, *args):
+    """Calls a function, timing it against a stage only if stats is given.
+
+    Args:
+        stats: A Stats object, or None to skip timing.
+        stage: Name of the stage to add the time to.
+        function: Callable to run.
+        args: Positional arguments for the callable.
+
+    Returns:
+        Whatever the callable returns.
+    """
+    if stats is None:
+        return function(*args)
+    with stats.stage(stage):
+        return function(*args)
+
+
+def _stage_order(stage):
+    if stage in STAGES:
+        return STAGES.index(stage), stage
+    return len(STAGES), stage
@@ -0,0 +1,401 @@
+import bz2
+import codecs
+import gzip
+import io
+import lzma
+import mmap
+import os
+import re
+import sys
+import tempfile
+
+from caesarcipher.crack import CONFIDENCE
+from caesarcipher.crack import letter_counts
+from caesarcipher.crack import letter_weights
+from caesarcipher.crack import rank_offsets
+from caesarcipher.crack import sample_crack
+from caesarcipher.crack import score_offsets
+from caesarcipher.engine import compile_byte_table
+from caesarcipher.engine import normalize_alphabet
+from caesarcipher.engine import shift
+from caesarcipher.incremental import IncrementalCracker
+from caesarcipher.pipeline import BackgroundWriter
+from caesarcipher.pipeline import prefetch
+from caesarcipher.stats import measure
+
+
+# Size of each read from the input stream.  Memory use is bounded by this no
+# matter how large the input is.
+CHUNK_SIZE = 1 << 16
+
+
+# Compression formats read and written transparently: the file extension
+# written with each, and a pattern matching the header its streams start
+# with.  A bz2 header is checked through the magic of its first block, or of
+# the end of an empty stream, since "BZh" alone is ordinary text.
+COMPRESSIONS = {
+    'gzip': ('.gz', re.compile(b'\x1f\x8b')),
+    'bz2': ('.bz2', re.compile(b'BZh[1-9](?:1AY&SY|\x17rE8P\x90)')),
+    'xz': ('.xz', re.compile(b'\xfd7zXZ\x00')),
+}
+
+# Bytes peeked at to match the headers above.
+HEADER_SIZE = 10
+
+# Matches the gzip command rather than the module's slower default of 9.
+GZIP_LEVEL = 6
+
+
+def _standard_streams():
+    return (getattr(sys.stdin, 'buffer', sys.stdin),
+            getattr(sys.stdout, 'buffer', sys.stdout))
+
+
+def detect_compression(stream):
+    """Returns the compression a binary stream starts with, or None.
+
+    The stream needs a peek() method, as buffered files and stdin have, so
+    that nothing is consumed.
+    """
+    peek = getattr(stream, 'peek', None)
+    if peek is None:
+        return None
+    head = peek(HEADER_SIZE)[:HEADER_SIZE]
+    for name, (_, header) in COMPRESSIONS.items():
+        if header.match(head):
+            return name
+    return None
+
+
+def compression_for(path):
+    """Returns the compression implied by a path's extension, or None."""
+    for name, (extension, _) in COMPRESSIONS.items():
+        if path.endswith(extension):
+            return name
+    return None
+
+
+def _open_compressed(target, compression, mode):
+    # Wrapping a file object leaves it open when the wrapper is closed, while
+    # a path is owned and closed by the wrapper.
+    if compression == 'gzip':
+        if isinstance(target, str):
+            return gzip.open(target, mode, compresslevel=GZIP_LEVEL)
+        return gzip.GzipFile(filename='', mode=mode, fileobj=target,
+                             compresslevel=GZIP_LEVEL)
+    if compression == 'bz2':
+        return bz2.BZ2File(target, mode)
+    if compression == 'xz':
+        return lzma.LZMAFile(target, mode)
+    raise ValueError("Unknown compression {0!r}, choose from {1}.".format(
+        compression, ', '.join(sorted(COMPRESSIONS))))
+
+
+def is_compressed(stream):
+    """Returns True if a stream decompresses or compresses as it goes."""
+    return isinstance(stream, (gzip.GzipFile, bz2.BZ2File, lzma.LZMAFile))
+
+
+def open_input(path, compression=None):
+    """Opens a path for binary reading, with '-' meaning stdin.
+
+    gzip, bz2 and xz input is recognized by its first bytes and
+    decompressed as it is read.
+
+    Args:
+        path: Path to open, or '-' for stdin.
+        compression: 'gzip', 'bz2' or 'xz' to force a format, or None to
+            detect it.
+    """
+    if path == '-':
+        source = _standard_streams()[0]
+        compression = compression or detect_compression(source)
+        if compression is None:
+            return source
+        return _open_compressed(source, compression, 'rb')
+    if compression is None:
+        with open(path, 'rb') as source:
+            compression = detect_compression(source)
+        if compression is None:
+            return open(path, 'rb')
+    return _open_compressed(path, compression, 'rb')
+
+
+def open_output(path, compression=None):
+    """Opens a path for binary writing, with '-' meaning stdout.
+
+    Args:
+        path: Path to open, or '-' for stdout.
+        compression: 'gzip', 'bz2' or 'xz' to compress the output as it is
+            written, or None to go by the extension of the path.
+    """
+    if path == '-':
+        destination = _standard_streams()[1]
+        if compression is None:
+            return destination
+        return _open_compressed(destination, compression, 'wb')
+    compression = compression or compression_for(path)
+    if compression is None:
+        return open(path, 'wb')
+    return _open_compressed(path, compression, 'wb')
+
+
+def close_stream(stream):
+    """Closes a stream from open_input() or open_output().
+
+    stdin and stdout are left open; compressed streams wrapping them are
+    closed, which writes the end of the compressed data, without closing the
+    standard stream underneath.
+    """
+    if stream in _standard_streams():
+        if stream.writable():
+            stream.flush()
+        return
+    stream.close()
+
+
+def iter_chunks(source, alphabet=None, chunk_size=CHUNK_SIZE):
+    """Yields fixed-size chunks from a binary stream.
+
+    Chunks are bytes when the alphabet is ASCII.  Otherwise the stream is
+    decoded as UTF-8 and chunks are str, which keeps multibyte characters
+    whole across chunk boundaries.
+    """
+    if compile_byte_table(alphabet, 0) is None:
+        source = io.TextIOWrapper(source, encoding='utf-8', newline='')
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+    if isinstance(source, io.TextIOWrapper):
+        source.detach()
+
+
+def _write(destination, chunk):
+    if isinstance(chunk, str):
+        chunk = chunk.encode('utf-8')
+    destination.write(chunk)
+
+
+def shift_stream(source, destination, offset, alphabet=None,
+                 chunk_size=CHUNK_SIZE, stats=None, overlap=False):
+    """Applies the Caesar shift from one binary stream to another.
+
+    With overlap, reading and writing run on their own threads so that
+    decompression, shifting and compression proceed at the same time.
+
+    Args:
+        source: Binary file object to read from.
+        destination: Binary file object to write to.
+        offset: Integer by which to shift each letter.  Negative offsets
+            decode.
+        alphabet: Iterable of characters, or None for the default alphabet.
+        chunk_size: Number of bytes or characters to shift at a time.
+        stats: Optional Stats object to record timings in.
+        overlap: Whether to read and write on background threads.
+
+    Returns:
+        Integer number of chunks written.
+    """
+    alphabet = normalize_alphabet(alphabet)
+    chunks = iter_chunks(source, alphabet, chunk_size)
+    if overlap:
+        chunks = prefetch(chunks)
+        destination = BackgroundWriter(destination)
+    written = 0
+    try:
+        while True:
+            chunk = measure(stats, 'io', next, chunks, None)
+            if chunk is None:
+                break
+            shifted = measure(stats, 'cipher', shift, chunk, offset,
+                              alphabet)
+            measure(stats, 'io', _write, destination, shifted)
+            if stats is not None:
+                stats.characters += len(chunk)
+            written += 1
+        measure(stats, 'io', destination.flush)
+    finally:
+        if overlap:
+            chunks.close()
+            destination.close()
+    return written
+
+
+def count_stream(source, alphabet=None, chunk_size=CHUNK_SIZE, spool=None,
+                 stats=None, overlap=False):
+    """Counts the letters of the alphabet in a binary stream.
+
+    Args:
+        source: Binary file object to read from.
+        alphabet: Iterable of characters, or None for the default alphabet.
+        chunk_size: Number of bytes or characters to count at a time.
+        spool: Optional binary file object each chunk is copied to.
+        stats: Optional Stats object to record timings in.
+        overlap: Whether to read on a background thread.
+
+    Returns:
+        List of integers, one per alphabet position.
+    """
+    alphabet = normalize_alphabet(alphabet)
+    chunks = iter_chunks(source, alphabet, chunk_size)
+    if overlap:
+        chunks = prefetch(chunks)
+    totals = [0] * len(alphabet)
+    try:
+        while True:
+            chunk = measure(stats, 'io', next, chunks, None)
+            if chunk is None:
+                break
+            if spool is not None:
+                measure(stats, 'io', _write, spool, chunk)
+            counts = measure(stats, 'scoring', letter_counts, chunk,
+                             alphabet)
+            for i, count in enumerate(counts):
+                totals[i] += count
+    finally:
+        if overlap:
+            chunks.close()
+    return totals
+
+
+def _seekable(stream):
+    try:
+        return stream.seekable()
+    except AttributeError:
+        return False
+
+
+def _sample_offset(source, frequency, alphabet, sample_size, stats=None):
+    # Only regular files read from the start can be mapped and sampled.
+    if compile_byte_table(alphabet, 0) is None or is_compressed(source) or \
+            source.tell() != 0:
+        return None
+    try:
+        fileno = source.fileno()
+    except (AttributeError, io.UnsupportedOperation):
+        return None
+    if os.fstat(fileno).st_size == 0:
+        return None
+    mapped = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    try:
+        candidate = sample_crack(mapped, frequency, alphabet, sample_size,
+                                 stats=stats)
+    finally:
+        mapped.close()
+    return candidate.offset
+
+
+def crack_stream(source, destination, frequency, alphabet=None,
+                 chunk_size=CHUNK_SIZE, stats=None, sample_size=None,
+                 overlap=False):
+    """Cracks a binary stream in two passes with constant memory.
+
+    The first pass builds the letter histogram and the second applies the
+    winning offset.  Input that cannot be rewound, such as a pipe, is spooled
+    to a temporary file during the first pass.  With a sample size, a
+    regular file is instead cracked from a strided sample read through a
+    memory map, so the first pass no longer reads the whole file.
+    Compressed input that can be rewound is decompressed again for the
+    second pass rather than spooled.
+
+    Args:
+        source: Binary file object to read from.
+        destination: Binary file object to write to.
+        frequency: Dict of lowercase letter to expected frequency, or a
+            LanguageModel.
+        alphabet: Iterable of characters, or None for the default alphabet.
+        chunk_size: Number of bytes or characters to handle at a time.
+        stats: Optional Stats object to record timings and scores in.
+        sample_size: Integer number of characters to crack from a strided
+            sample of, or None to count the whole stream.
+        overlap: Whether to read and write on background threads.
+
+    Returns:
+        Integer offset the stream was most likely encoded with.
+    """
+    alphabet = normalize_alphabet(alphabet)
+    if sample_size and _seekable(source):
+        offset = _sample_offset(source, frequency, alphabet, sample_size,
+                                stats)
+        if offset is not None:
+            shift_stream(source, destination, -offset, alphabet, chunk_size,
+                         stats=stats, overlap=overlap)
+            return offset
+
+    spool = None
+    if _seekable(source):
+        start = source.tell()
+    else:
+        spool = tempfile.TemporaryFile()
+        start = 0
+
+    try:
+        counts = count_stream(source, alphabet, chunk_size, spool=spool,
+                              stats=stats, overlap=overlap)
+        scores = score_offsets(counts, letter_weights(alphabet, frequency))
+        offset = rank_offsets(scores)[0]
+        if stats is not None:
+            stats.record_crack(scores)
+
+        if spool is not None:
+            source = spool
+        source.seek(start)
+        shift_stream(source, destination, -offset, alphabet, chunk_size,
+                     stats=stats, overlap=overlap)
+    finally:
+        if spool is not None:
+            spool.close()
+    return offset
+
+
+def follow_stream(source, destination, frequency=None, alphabet=None,
+                  chunk_size=CHUNK_SIZE, threshold=CONFIDENCE, stats=None):
+    """Cracks a growing binary stream in one pass, such as tail -f output.
+
+    Data is read as soon as it arrives rather than in full chunks.  Nothing
+    is written until the offset is confidently known; from then on each
+    read is decoded and flushed straight away.
+
+    Args:
+        source: Binary file object to read from.
+        destination: Binary file object to write to.
+        frequency: Dict of lowercase letter to expected frequency, a
+            LanguageModel, or None for CaesarCipher.frequency.
+        alphabet: Iterable of characters, or None for the default alphabet.
+        chunk_size: Most bytes to read at a time.
+        threshold: Confidence at which the offset is locked.
+        stats: Optional Stats object to record timings in.
+
+    Returns:
+        Integer offset the stream was most likely encoded with.
+    """
+    alphabet = normalize_alphabet(alphabet)
+    cracker = IncrementalCracker(frequency, alphabet, threshold)
+    read = getattr(source, 'read1', source.read)
+    decoder = None
+    if compile_byte_table(alphabet, 0) is None:
+        decoder = codecs.getincrementaldecoder('utf-8')()
+
+    while True:
+        chunk = measure(stats, 'io', read, chunk_size)
+        if decoder is not None:
+            text = decoder.decode(chunk, final=not chunk)
+        else:
+            text = chunk
+        if text:
+            plaintext = measure(stats, 'cipher', cracker.feed, text)
+            if stats is not None:
+                stats.characters += len(text)
+            if plaintext:
+                measure(stats, 'io', _write, destination, plaintext)
+                measure(stats, 'io', destination.flush)
+        if not chunk:
+            break
+
+    measure(stats, 'io', _write, destination, cracker.close())
+    measure(stats, 'io', destination.flush)
+    if stats is not None:
+        stats.record_crack(cracker.scores)
+    return cracker.offset
@@ -0,0 +1,205 @@
+import hashlib
+import math
+import mmap
+import os
+import re
+import struct
+
+from caesarcipher.language import DATA_DIRECTORY
+
+
+# Packed filter layout: header, then the bit array.  Words are stored once
+# per tier they belong to, so common words can count for more than rare ones
+# without a second structure.
+MAGIC = b'CCWF'
+VERSION = 1
+HEADER = struct.Struct('<4sBBBxQ')
+
+# Words of the most common tier count this many times their length.
+TIERS = 2
+
+ERROR_RATE = 0.001
+
+# Words shorter than this are too easy to hit by chance to mean anything.
+MIN_LENGTH = 2
+
+WORD = re.compile(r'[^\W\d_]+')
+
+
+class WordFilter(object):
+    def __init__(self, bits, size, hashes, tiers=TIERS):
+        """A Bloom filter of dictionary words, usually memory-mapped.
+
+        Membership tests can give false positives at about the error rate
+        the filter was built for, but never false negatives.  Filters loaded
+        from a file share its pages between every process that maps it.
+
+        Attributes:
+            size: Number of bits in the filter.
+            hashes: Number of bits set per word.
+            tiers: Number of frequency tiers words can belong to.
+            path: File the filter was loaded from, if any.
+            digest: Hex SHA-1 of the packed filter.
+        """
+        self.size = size
+        self.hashes = hashes
+        self.tiers = tiers
+        self.path = None
+        self._bits = bits
+        self._mapped = None
+        self._digest = None
+
+    @classmethod
+    def build(cls, tiers, error_rate=ERROR_RATE):
+        """Builds a filter from lists of words, most common tier first.
+
+        Each tier implicitly includes the words of the tiers before it.
+
+        Args:
+            tiers: Sequence of iterables of words.  Words of the first tier
+                count most.
+            error_rate: Wanted rate of false positives.
+
+        Returns:
+            WordFilter.
+        """
+        tiers = list(tiers)
+        cumulative = set()
+        for i, words in enumerate(tiers):
+            cumulative.update(word.lower() for word in words)
+            tiers[i] = sorted(cumulative)
+        count = max(sum(len(words) for words in tiers), 1)
+        size = int(math.ceil(- count * math.log(error_rate) /
+                             math.log(2) ** 2))
+        size += -size % 8
+        hashes = max(int(round(size / float(count) * math.log(2))), 1)
+        words = cls(bytearray(size // 8), size, hashes, len(tiers))
+        for tier, members in enumerate(tiers):
+            for word in members:
+                for position in words._positions(word, len(tiers) - tier):
+                    words._bits[position >> 3] |= 1 << (position & 7)
+        return words
+
+    @classmethod
+    def loads(cls, data):
+        """Builds a filter from its packed bytes without copying them."""
+        magic, version, hashes, tiers, size = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a version {0} word filter.".format(VERSION))
+        bits = memoryview(data)[HEADER.size:HEADER.size + size // 8]
+        return cls(bits, size, hashes, tiers)
+
+    @classmethod
+    def load(cls, path):
+        """Memory-maps a filter from a packed file."""
+        with open(path, 'rb') as handle:
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        words = cls.loads(mapped)
+        words._mapped = mapped
+        words.path = path
+        return words
+
+    def dumps(self):
+        """Returns the filter packed as bytes."""
+        return HEADER.pack(MAGIC, VERSION, self.hashes, self.tiers,
+                           self.size) + bytes(self._bits)
+
+    @property
+    def digest(self):
+        if self._digest is None:
+            self._digest = hashlib.sha1(self.dumps()).hexdigest()
+        return self._digest
+
+    def save(self, path):
+        """Writes the filter to a packed file."""
+        with open(path, 'wb') as handle:
+            handle.write(self.dumps())
+
+    def _hash(self, word):
+        # Double hashing: every bit position of every tier derives from one
+        # digest of the word.
+        first, second = struct.unpack('<QQ', hashlib.blake2b(
+            word.encode('utf-8'), digest_size=16).digest())
+        return first, second | 1
+
+    def _positions(self, word, tier):
+        first, second = self._hash(word)
+        start = (tier - 1) * self.hashes
+        return [(first + i * second) % self.size
+                for i in range(start, start + self.hashes)]
+
+    def _has(self, first, second, tier):
+        bits = self._bits
+        size = self.size
+        start = (tier - 1) * self.hashes
+        for i in range(start, start + self.hashes):
+            position = (first + i * second) % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def tier(self, word):
+        """Returns how common a word is, from 0 (unknown) to tiers."""
+        first, second = self._hash(word.lower())
+        for tier in range(self.tiers, 0, -1):
+            if self._has(first, second, tier):
+                return tier
+        return 0
+
+    def __contains__(self, word):
+        first, second = self._hash(word.lower())
+        return self._has(first, second, 1)
+
+    def coverage(self, text):
+        """Scores how much of a text is made of known words.
+
+        Each word counts its length times its tier, divided by the length of
+        all words scored, so plaintext of common words scores highest.
+
+        Args:
+            text: A str to score.
+
+        Returns:
+            Float from 0 to tiers (higher is better).
+        """
+        total = known = 0
+        for word in WORD.findall(text):
+            if len(word) < MIN_LENGTH:
+                continue
+            total += len(word)
+            known += len(word) * self.tier(word)
+        if not total:
+            return 0.0
+        return known / float(total)
+
+    def __reduce__(self):
+        # Workers map the same file rather than receiving a copy of the bits.
+        if self.path is not None:
+            return WordFilter.load, (self.path,)
+        return WordFilter.loads, (self.dumps(),)
+
+    def __repr__(self):
+        return "WordFilter(size={0}, hashes={1})".format(self.size,
+                                                         self.hashes)
+
+
+_filters = {}
+
+
+def load_words(name):
+    """Returns the shared word filter for a language, or None if it has none.
+
+    Filters are memory-mapped from the package data directory once per
+    process.
+
+    Args:
+        name: Name of the language, such as 'english'.
+
+    Returns:
+        WordFilter, or None.
+    """
+    if name not in _filters:
+        path = os.path.join(DATA_DIRECTORY, name + '.words')
+        _filters[name] = WordFilter.load(path) if os.path.exists(path) \
+            else None
+    return _filters[name]
@@ -15,10 +15,20 @@ setup_args = {
     'packages': ['caesarcipher', 'tests'],
     'scripts': ['bin/caesarcipher'],
     'include_package_data': True,
+    'package_data': {'caesarcipher': ['data/*']},
+    'python_requires': '>=3.8',
+    'extras_require': {
+        'numpy': ['numpy'],
+    },
     'classifiers': [
         'Programming Language :: Python',
-        'Programming Language :: Python :: 2',
         'Programming Language :: Python :: 3',
+        'Programming Language :: Python :: 3 :: Only',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
+        'Programming Language :: Python :: 3.12',
         'License :: OSI Approved :: MIT License',
         'Operating System :: OS Independent',
         'Development Status :: 5 - Production/Stable',
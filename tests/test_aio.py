@@ -0,0 +1,58 @@
+import asyncio
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from caesarcipher import CaesarCipher
+from caesarcipher.aio import acrack_stream
+from caesarcipher.aio import adecode
+from caesarcipher.aio import aencode
+from caesarcipher.incremental import IncrementalCracker
+
+
+async def iterate(chunks):
+    for chunk in chunks:
+        await asyncio.sleep(0)
+        yield chunk
+
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+class AsyncTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.plaintext = "The quick brown fox jumps over the lazy dog. " * 20
+        self.ciphertext = CaesarCipher(self.plaintext, offset=9).encoded
+        self.chunks = [self.ciphertext[i:i + 50]
+                       for i in range(0, len(self.ciphertext), 50)]
+
+    async def test_encode_decode(self):
+        encoded = await collect(aencode(iterate([self.plaintext[:10],
+                                                 self.plaintext[10:]]), 9))
+        self.assertEqual(self.ciphertext, ''.join(encoded))
+        decoded = await collect(adecode(iterate(self.chunks), 9,
+                                        offload_size=20))
+        self.assertEqual(3 * len(self.chunks), len(decoded))
+        self.assertEqual(self.plaintext, ''.join(decoded))
+
+    async def test_process_executor(self):
+        with ProcessPoolExecutor(1) as executor:
+            encoded = await collect(aencode(
+                iterate([self.plaintext.encode('ascii')]), 9,
+                executor=executor, offload_size=300))
+        self.assertEqual(3, len(encoded))
+        self.assertEqual(self.ciphertext.encode('ascii'), b''.join(encoded))
+
+    async def test_crack_stream(self):
+        cracker = IncrementalCracker()
+        plaintext = await collect(acrack_stream(iterate(self.chunks),
+                                                offload_size=100,
+                                                cracker=cracker))
+        self.assertEqual(self.plaintext, ''.join(plaintext))
+        self.assertEqual(9, cracker.offset)
+        self.assertTrue(len(plaintext) > 1)
+
+    async def test_crack_short_stream(self):
+        plaintext = await collect(acrack_stream(iterate(
+            ['W kobh hc ', 'sbqcrs hvwg ghfwbu.'])))
+        self.assertEqual(['I want to encode this string.'], plaintext)
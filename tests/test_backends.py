@@ -0,0 +1,135 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from caesarcipher import CaesarCipher
+from caesarcipher import backends
+from caesarcipher.backends import crossover
+from caesarcipher.backends import get_backend
+from caesarcipher.backends import select_backend
+from caesarcipher.crack import letter_counts
+from caesarcipher.engine import shift
+from caesarcipher.stats import Stats
+
+
+class BackendTest(unittest.TestCase):
+    def setUp(self):
+        self.message = "The Quick Brown Fox jumps over the Lazy Dog."
+        self.alphabet = 'ueyplkizjgncdbqshoaxmrwftv'
+
+    def test_engines_agree(self):
+        for name in backends.names():
+            backend = get_backend(name)
+            for data in (self.message, self.message.encode('ascii'),
+                         bytearray(self.message.encode('ascii'))):
+                for alphabet in (None, self.alphabet):
+                    if not backend.supports('shift', data, alphabet):
+                        continue
+                    result = backend.shift(data, 7, alphabet, 2)
+                    self.assertEqual(type(data), type(result))
+                    self.assertEqual(shift(data, 7, alphabet), result)
+                    if backend.supports('count', data, alphabet):
+                        self.assertEqual(letter_counts(data, alphabet),
+                                         list(backend.count(data, alphabet)))
+
+    def test_default_is_translate(self):
+        self.assertEqual('translate',
+                         select_backend('shift', self.message,
+                                        thresholds={}).name)
+
+    def test_selects_by_size(self):
+        thresholds = {'shift/str': {'python': 10, 'multiprocess': 20}}
+        self.assertEqual('translate',
+                         select_backend('shift', 'abc',
+                                        thresholds=thresholds).name)
+        self.assertEqual('python',
+                         select_backend('shift', 'a' * 15,
+                                        thresholds=thresholds).name)
+        self.assertEqual('multiprocess',
+                         select_backend('shift', 'a' * 25,
+                                        thresholds=thresholds).name)
+        self.assertEqual('translate',
+                         select_backend('shift', b'a' * 25,
+                                        thresholds=thresholds).name)
+
+    def test_skips_engines_that_cannot_handle_input(self):
+        thresholds = {'shift/str': {'multiprocess': 0}}
+        self.assertEqual('translate',
+                         select_backend('shift', 'abc', u'αβγ',
+                                        thresholds=thresholds).name)
+
+    def test_override(self):
+        self.assertEqual('python',
+                         select_backend('shift', 'abc', engine='python').name)
+        self.assertEqual('translate',
+                         select_backend('count', 'abc',
+                                        engine='multiprocess',
+                                        thresholds={}).name)
+        self.assertRaises(ValueError, select_backend, 'shift', 'abc',
+                          engine='missing')
+        self.assertRaises(ValueError, select_backend, 'shift', b'abc',
+                          u'αβγ', engine='translate')
+
+    def test_crossover(self):
+        baseline = {1: 1.0, 10: 10.0, 100: 100.0}
+        self.assertEqual(10, crossover({1: 2.0, 10: 5.0, 100: 50.0},
+                                       baseline))
+        self.assertEqual(None, crossover({1: 0.5, 10: 5.0, 100: 200.0},
+                                         baseline))
+        self.assertEqual(None, crossover({1: 0.5}, baseline))
+
+
+class CalibrationTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'nested', 'calibration.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        backends._thresholds.pop(self.path, None)
+
+    def test_calibrate_caches_results(self):
+        thresholds = backends.calibrate((64, 128), self.path, workers=1)
+        backends._thresholds.clear()
+        self.assertEqual(thresholds, backends.load_thresholds(self.path))
+        self.assertEqual(set(['shift/str', 'shift/bytes', 'count/str',
+                              'count/bytes']), set(thresholds))
+
+    def test_stale_calibration_is_ignored(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'w') as handle:
+            json.dump({'fingerprint': {'python': '0.0'},
+                       'thresholds': {'shift/str': {'python': 0}}}, handle)
+        self.assertEqual(backends.DEFAULT_THRESHOLDS,
+                         backends.load_thresholds(self.path))
+
+    def test_calibration_path_follows_xdg(self):
+        original = os.environ.get('XDG_CACHE_HOME')
+        os.environ['XDG_CACHE_HOME'] = self.directory
+        try:
+            self.assertEqual(os.path.join(self.directory, 'caesarcipher',
+                                          'calibration.json'),
+                             backends.calibration_path())
+        finally:
+            if original is None:
+                del os.environ['XDG_CACHE_HOME']
+            else:
+                os.environ['XDG_CACHE_HOME'] = original
+
+
+class CaesarCipherEngineTest(unittest.TestCase):
+    def test_reports_engine(self):
+        stats = Stats()
+        cipher = CaesarCipher('W kobh hc sbqcrs hvwg ghfwbu.', engine='python',
+                              stats=stats)
+        self.assertEqual('I want to encode this string.', cipher.cracked)
+        self.assertEqual({'shift': 'python', 'count': 'python'},
+                         stats.engines)
+        self.assertTrue("Engine for shift: python" in stats.report())
+
+    def test_unsupported_engine(self):
+        cipher = CaesarCipher(u'dög', offset=3, alphabet=u'dögx',
+                              engine='multiprocess')
+        self.assertRaises(ValueError, lambda: cipher.encoded)
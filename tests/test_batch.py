@@ -0,0 +1,43 @@
+import unittest
+
+from caesarcipher import CaesarCipher
+from caesarcipher.batch import crack_many
+from caesarcipher.batch import decode_many
+from caesarcipher.batch import encode_many
+
+
+class BatchTest(unittest.TestCase):
+    def setUp(self):
+        self.messages = ["London calling to the faraway towns",
+                         "Now war is declared and battle come down",
+                         "London calling to the underworld",
+                         "Come out of the cupboard, you boys and girls"]
+
+    def test_encode_many(self):
+        expected = [CaesarCipher(message, offset=9).encoded
+                    for message in self.messages]
+        self.assertEqual(expected, list(encode_many(self.messages, 9)))
+
+    def test_decode_many(self):
+        encoded = list(encode_many(self.messages, 9))
+        self.assertEqual(self.messages, list(decode_many(encoded, 9)))
+
+    def test_encode_many_generator_input(self):
+        messages = (message for message in self.messages)
+        self.assertEqual(4, len(list(encode_many(messages, 3))))
+
+    def test_crack_many(self):
+        ciphertexts = [CaesarCipher(message, offset=i + 5).encoded
+                       for i, message in enumerate(self.messages)]
+        self.assertEqual(self.messages, list(crack_many(ciphertexts)))
+
+    def test_crack_many_workers(self):
+        ciphertexts = [CaesarCipher(message, offset=i + 5).encoded
+                       for i, message in enumerate(self.messages)] * 10
+        self.assertEqual(self.messages * 10,
+                         list(crack_many(ciphertexts, workers=2,
+                                         chunksize=3)))
+
+    def test_encode_many_workers(self):
+        self.assertEqual(list(encode_many(self.messages, 4)),
+                         list(encode_many(self.messages, 4, workers=2)))
@@ -0,0 +1,27 @@
+import unittest
+
+from caesarcipher import bench
+
+
+class BenchTest(unittest.TestCase):
+    def test_make_message(self):
+        self.assertEqual(10, len(bench.make_message('mixed', 10)))
+        self.assertEqual(1000, len(bench.make_message('punctuation', 1000)))
+
+    def test_run(self):
+        current = bench.run(sizes=[10], alphabets=['custom'],
+                            corpora=['mixed'], min_time=0)
+        self.assertEqual(3, len(current['results']))
+        result = current['results']['crack/mixed/custom/10']
+        self.assertEqual(10, result['size'])
+        self.assertTrue(result['seconds'] > 0)
+
+    def test_compare(self):
+        baseline = {'results': {'encode/mixed/default/10': {'seconds': 1.0},
+                                'decode/mixed/default/10': {'seconds': 1.0}}}
+        current = {'results': {'encode/mixed/default/10': {'seconds': 1.5},
+                               'decode/mixed/default/10': {'seconds': 1.1},
+                               'crack/mixed/default/10': {'seconds': 9.0}}}
+        regressions = bench.compare(current, baseline, threshold=0.2)
+        self.assertEqual(['encode/mixed/default/10'],
+                         [regression['name'] for regression in regressions])
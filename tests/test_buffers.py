@@ -0,0 +1,67 @@
+import array
+import mmap
+import unittest
+
+from caesarcipher import Codec
+from caesarcipher.buffers import decode_into
+from caesarcipher.buffers import encode_into
+from caesarcipher.buffers import shift_into
+from caesarcipher.engine import shift
+
+
+class BuffersTest(unittest.TestCase):
+    def setUp(self):
+        self.plaintext = b'I want to encode this string.'
+        self.ciphertext = b'W kobh hc sbqcrs hvwg ghfwbu.'
+
+    def test_into_preallocated(self):
+        destination = bytearray(len(self.plaintext) + 3)
+        self.assertEqual(len(self.plaintext),
+                         encode_into(self.plaintext, destination, 14))
+        self.assertEqual(self.ciphertext, bytes(destination[:-3]))
+        self.assertEqual(b'\0\0\0', bytes(destination[-3:]))
+
+    def test_in_place(self):
+        buffer = bytearray(self.ciphertext)
+        decode_into(buffer, buffer, 14)
+        self.assertEqual(self.plaintext, bytes(buffer))
+
+    def test_memoryview_slice(self):
+        buffer = bytearray(b'--' + self.plaintext)
+        view = memoryview(buffer)[2:]
+        encode_into(view, view, 14)
+        self.assertEqual(b'--' + self.ciphertext, bytes(buffer))
+
+    def test_array_and_mmap(self):
+        source = array.array('B', self.plaintext)
+        destination = mmap.mmap(-1, len(self.plaintext))
+        try:
+            encode_into(source, destination, 14)
+            self.assertEqual(self.ciphertext, destination[:])
+        finally:
+            destination.close()
+
+    def test_large_buffers_in_blocks(self):
+        data = bytearray(self.plaintext * 5000)
+        expected = shift(bytes(data), 3)
+        destination = bytearray(len(data))
+        shift_into(data, destination, 3, block_size=1000)
+        self.assertEqual(expected, bytes(destination))
+        shift_into(data, data, 3, block_size=1000)
+        self.assertEqual(expected, bytes(data))
+
+    def test_rejects_bad_destinations(self):
+        self.assertRaises(TypeError, encode_into, self.plaintext,
+                          bytes(len(self.plaintext)), 14)
+        self.assertRaises(ValueError, encode_into, self.plaintext,
+                          bytearray(3), 14)
+        self.assertRaises(ValueError, encode_into, self.plaintext,
+                          bytearray(len(self.plaintext)), 1, u'αβγ')
+
+    def test_codec(self):
+        codec = Codec(offset=14)
+        buffer = bytearray(self.plaintext)
+        codec.encode_into(buffer, buffer)
+        self.assertEqual(self.ciphertext, bytes(buffer))
+        codec.decode_into(buffer, buffer)
+        self.assertEqual(self.plaintext, bytes(buffer))
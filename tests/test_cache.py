@@ -0,0 +1,119 @@
+import io
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from caesarcipher import CaesarCipher
+from caesarcipher import cache as cache_module
+from caesarcipher.cache import CrackCache
+from caesarcipher.cache import cached_crack
+from caesarcipher.language import LanguageModel
+from caesarcipher.language import english
+from caesarcipher.records import process_records
+
+
+class CrackCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'cracks.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_key_depends_on_text_alphabet_and_language(self):
+        model = english()
+        other = LanguageModel.from_frequency('other', {'a': 0.5, 'b': 0.5})
+        key = CrackCache.key('abc', None, model)
+        self.assertEqual(key, CrackCache.key('abc', None, model))
+        self.assertNotEqual(key, CrackCache.key('abd', None, model))
+        self.assertNotEqual(key, CrackCache.key(b'abc', None, model))
+        self.assertNotEqual(key, CrackCache.key('abc', 'abcd', model))
+        self.assertNotEqual(key, CrackCache.key('abc', None, other))
+        self.assertNotEqual(key, CrackCache.key('abc', None, model,
+                                                'sample:16'))
+
+    def test_memory_lru(self):
+        cache = CrackCache(memory_size=2)
+        cache.put(b'a', 1, 1.0)
+        cache.put(b'b', 2, 2.0)
+        cache.get(b'a')
+        cache.put(b'c', 3, 3.0)
+        self.assertEqual((1, 1.0), cache.get(b'a'))
+        self.assertEqual(None, cache.get(b'b'))
+        self.assertEqual(2, cache.hits)
+        self.assertEqual(1, cache.misses)
+
+    def test_persists(self):
+        cache = CrackCache(self.path)
+        cache.put(b'key', 7, 12.5)
+        cache.close()
+        cache = CrackCache(self.path)
+        self.assertEqual(1, len(cache))
+        self.assertEqual((7, 12.5), cache.get(b'key'))
+        cache.close()
+
+    def test_evicts_least_recently_used(self):
+        cache = CrackCache(self.path, memory_size=1, max_entries=10)
+        for i in range(10):
+            cache.put(str(i).encode(), i, 0.0)
+        cache.get(b'0')
+        cache.put(b'10', 10, 0.0)
+        self.assertEqual(9, len(cache))
+        self.assertEqual((0, 0.0), cache.get(b'0'))
+        self.assertEqual(None, cache.get(b'1'))
+        cache.close()
+
+    def test_hit_skips_scoring(self):
+        cache = CrackCache()
+        text = 'W kobh hc sbqcrs hvwg ghfwbu.'
+        first = cached_crack(text, english(), cache=cache)
+        original = cache_module.crack_candidates
+        cache_module.crack_candidates = None
+        try:
+            second = cached_crack(text, english(), cache=cache)
+        finally:
+            cache_module.crack_candidates = original
+        self.assertEqual(first.offset, second.offset)
+        self.assertEqual('I want to encode this string.', second.plaintext)
+
+    def test_cracked_uses_cache(self):
+        cache = CrackCache(self.path)
+        for _ in range(2):
+            cipher = CaesarCipher('W kobh hc sbqcrs hvwg ghfwbu.', cache=cache)
+            self.assertEqual('I want to encode this string.', cipher.cracked)
+            self.assertEqual(-14, cipher.offset)
+        self.assertEqual(1, cache.hits)
+        cache.close()
+
+    def test_sampled_cracks_cached_apart(self):
+        cache = CrackCache()
+        text = CaesarCipher("London calling to the faraway towns. " * 50,
+                            offset=3).encoded
+        cached_crack(text, english(), cache=cache, sample_size=64)
+        cached_crack(text, english(), cache=cache)
+        self.assertEqual(0, cache.hits)
+        cached_crack(text, english(), cache=cache, sample_size=64)
+        cached_crack(text, english(), cache=cache)
+        self.assertEqual(2, cache.hits)
+
+    def test_pickles_by_path(self):
+        cache = CrackCache(self.path, memory_size=3)
+        cache.put(b'key', 7, 12.5)
+        copy = pickle.loads(pickle.dumps(cache))
+        self.assertEqual(3, copy.memory_size)
+        self.assertEqual((7, 12.5), copy.get(b'key'))
+        copy.close()
+        cache.close()
+
+    def test_records_use_cache(self):
+        cache = CrackCache(self.path)
+        line = json.dumps({'message': 'W kobh hc sbqcrs hvwg ghfwbu.'})
+        destination = io.StringIO()
+        process_records(io.StringIO(line + '\n' + line), destination,
+                        'jsonl', 'message', 'crack', cache=cache)
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(1, len(cache))
+        cache.close()
@@ -0,0 +1,167 @@
+import gzip
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from caesarcipher import CaesarCipher
+from caesarcipher import CaesarCipherError
+from caesarcipher import backends
+from caesarcipher.cmdline import main
+
+
+class CommandLineTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.plaintext = "London calling to the faraway towns.\n" * 20
+        self.ciphertext = CaesarCipher(self.plaintext, offset=9).encoded
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def path(self, *names):
+        return os.path.join(self.directory, *names)
+
+    def write(self, name, text):
+        path = self.path(name)
+        parent = os.path.dirname(path)
+        if not os.path.isdir(parent):
+            os.makedirs(parent)
+        with open(path, 'w') as handle:
+            handle.write(text)
+        return path
+
+    def read(self, path):
+        with open(path) as handle:
+            return handle.read()
+
+    def run_main(self, *argv):
+        original = sys.argv
+        sys.argv = ['caesarcipher'] + list(argv)
+        try:
+            with self.assertLogs(level=logging.INFO) as logs:
+                logging.info("Running %s", ' '.join(argv))
+                main()
+        finally:
+            sys.argv = original
+        return [record.getMessage() for record in logs.records]
+
+    def test_message(self):
+        messages = self.run_main('-e', '-o', '14', 'I want to encode this '
+                                 'string.')
+        self.assertTrue("Encoded message: W kobh hc sbqcrs hvwg ghfwbu." in
+                        messages)
+        messages = self.run_main('-c', 'W kobh hc sbqcrs hvwg ghfwbu.')
+        self.assertTrue("Cracked message: I want to encode this string." in
+                        messages)
+
+    def test_engine(self):
+        messages = self.run_main('-e', '-o', '14', '--engine', 'python',
+                                 '--stats', 'I want to encode this string.')
+        self.assertTrue("Encoded message: W kobh hc sbqcrs hvwg ghfwbu." in
+                        messages)
+        self.assertTrue("Engine for shift: python" in messages)
+        messages = self.run_main('-e', '-o', '3', '-w', '2', '--engine',
+                                 'multiprocess', '')
+        self.assertTrue("Encoded message: " in messages)
+
+    def test_engine_errors(self):
+        self.assertRaises(CaesarCipherError, self.run_main, '-e', '-o', '3',
+                          '--engine', 'missing', 'abc')
+        path = self.write('plain.txt', self.plaintext)
+        self.assertRaises(CaesarCipherError, self.run_main, '-e', '-o', '3',
+                          '--engine', 'python', '-i', path)
+
+    def test_stream(self):
+        source = self.write('cipher.txt', self.ciphertext)
+        destination = self.path('plain.txt.gz')
+        messages = self.run_main('-c', '-i', source, '--output', destination)
+        self.assertTrue("Most likely offset: 9" in messages)
+        with gzip.open(destination, 'rt') as handle:
+            self.assertEqual(self.plaintext, handle.read())
+
+        decoded = self.path('decoded.txt')
+        self.run_main('-d', '-o', '9', '-i', source, '--output', decoded)
+        self.assertEqual(self.plaintext, self.read(decoded))
+
+    def test_follow(self):
+        source = self.write('cipher.txt', self.ciphertext)
+        destination = self.path('plain.txt')
+        self.run_main('-c', '--follow', '-i', source, '--output', destination)
+        self.assertEqual(self.plaintext, self.read(destination))
+
+    def test_in_place(self):
+        path = self.write('message.txt', self.plaintext)
+        self.run_main('-e', '-o', '9', '--in-place', path)
+        self.assertEqual(self.ciphertext, self.read(path))
+        messages = self.run_main('-c', '--in-place', path)
+        self.assertTrue("Most likely offset: 9" in messages)
+        self.assertEqual(self.plaintext, self.read(path))
+
+    def test_records_with_cache(self):
+        lines = [json.dumps({'id': i, 'message': self.ciphertext})
+                 for i in range(3)]
+        source = self.write('records.jsonl', '\n'.join(lines) + '\n')
+        destination = self.path('plain.jsonl')
+        cache = self.path('cracks.db')
+        self.run_main('-c', '--format', 'jsonl', '-i', source, '--output',
+                      destination, '--cache', cache)
+        records = [json.loads(line)
+                   for line in self.read(destination).splitlines()]
+        self.assertEqual([self.plaintext] * 3,
+                         [record['message'] for record in records])
+        self.assertEqual([9] * 3, [record['offset'] for record in records])
+        self.assertTrue(os.path.exists(cache))
+
+    def test_cache_rejected_for_streams(self):
+        source = self.write('cipher.txt', self.ciphertext)
+        self.assertRaises(CaesarCipherError, self.run_main, '-c', '-i', source,
+                          '--cache', self.path('cracks.db'))
+
+    def test_corpus(self):
+        for i, line in enumerate(["Now war is declared", "and battle come",
+                                  "down"]):
+            self.write(os.path.join('in', 'part{0}.txt'.format(i)),
+                       CaesarCipher(line, offset=4).encoded)
+        output = self.path('out')
+        messages = self.run_main('-c', '--corpus', self.path('in'),
+                                 '--output', output, '-w', '1')
+        self.assertTrue("Most likely offset: 4" in messages)
+        self.assertEqual("Now war is declared",
+                         self.read(os.path.join(output, 'part0.txt')))
+
+    def test_corpus_over_itself(self):
+        for i, line in enumerate(["Now war is declared", "and battle come"]):
+            self.write(os.path.join('in', 'part{0}.txt'.format(i)),
+                       CaesarCipher(line, offset=5).encoded)
+        for output in (self.path('in'), self.path('in', 'out')):
+            self.assertRaises(CaesarCipherError, self.run_main, '-c',
+                              '--corpus', self.path('in'), '--output', output)
+            self.assertRaises(CaesarCipherError, self.run_main, '-d', '-o',
+                              '5', '--corpus', self.path('in'), '--output',
+                              output)
+        self.assertEqual(CaesarCipher("Now war is declared", offset=5).encoded,
+                         self.read(self.path('in', 'part0.txt')))
+
+    def test_records_corpus(self):
+        lines = [json.dumps({'message': CaesarCipher(line, offset=4).encoded})
+                 for line in ["Now war is declared", "and battle come"]]
+        source = self.write('records.jsonl', '\n'.join(lines) + '\n')
+        destination = self.path('plain.jsonl')
+        messages = self.run_main('-c', '--format', 'jsonl', '--corpus', '-i',
+                                 source, '--output', destination)
+        self.assertTrue("Most likely offset: 4" in messages)
+        self.assertRaises(CaesarCipherError, self.run_main, '-c', '--format',
+                          'jsonl', '--corpus', source)
+
+    def test_calibrate(self):
+        path = self.path('calibration.json')
+        try:
+            self.assertRaises(SystemExit, self.run_main, 'calibrate',
+                              '--output', path, '-s', '64', '-w', '1')
+            self.assertTrue(os.path.exists(path))
+        finally:
+            backends._thresholds.pop(path, None)
@@ -0,0 +1,71 @@
+import threading
+import unittest
+
+from caesarcipher import CaesarCipher
+from caesarcipher import Codec
+
+
+class CodecTest(unittest.TestCase):
+    def setUp(self):
+        self.message = "The quick brown fox jumps over the lazy dog."
+        self.alphabet = 'ueyplkizjgncdbqshoaxmrwftv'
+
+    def test_encode(self):
+        codec = Codec(offset=7)
+        self.assertEqual("Aol xbpjr iyvdu mve qbtwz vcly aol shgf kvn.",
+                         codec.encode(self.message))
+
+    def test_decode(self):
+        codec = Codec(offset=10008)
+        self.assertEqual(self.message,
+                         codec.decode(codec.encode(self.message)))
+        self.assertEqual(10008 % 26, codec.offset)
+
+    def test_arbitrary_alphabet(self):
+        codec = Codec(self.alphabet, 7)
+        self.assertEqual(CaesarCipher(self.message, offset=7,
+                                      alphabet=self.alphabet).encoded,
+                         codec.encode(self.message))
+
+    def test_bytes(self):
+        codec = Codec(offset=1)
+        self.assertEqual(b"Uxjmjp", codec.encode(b"Twilio"))
+        self.assertEqual(bytearray(b"Twilio"),
+                         codec.decode(bytearray(b"Uxjmjp")))
+
+    def test_crack_is_pure(self):
+        codec = Codec(offset=3)
+        ciphertext = "Rfc osgai zpmul dmv hsknq mtcp rfc jyxw bme."
+        self.assertEqual(self.message, codec.crack(ciphertext))
+        self.assertEqual(24, codec.crack_candidates(ciphertext)[0].offset)
+        self.assertEqual(3, codec.offset)
+
+    def test_immutable(self):
+        codec = Codec(offset=3)
+        self.assertRaises(AttributeError, setattr, codec, 'offset', 4)
+        self.assertRaises(AttributeError, delattr, codec, 'offset')
+        self.assertRaises(AttributeError, setattr, codec, 'message', 'x')
+        self.assertFalse(hasattr(codec, '__dict__'))
+
+    def test_equality(self):
+        self.assertEqual(Codec(offset=3), Codec(offset=29))
+        self.assertEqual(hash(Codec(offset=3)), hash(Codec(offset=29)))
+        self.assertNotEqual(Codec(offset=3), Codec(offset=4))
+        self.assertEqual(Codec(offset=4), Codec(offset=3).with_offset(4))
+
+    def test_shared_between_threads(self):
+        codec = Codec(offset=11)
+        results = []
+
+        def work():
+            for i in range(200):
+                ciphertext = codec.encode(self.message)
+                results.append(codec.decode(ciphertext) == self.message and
+                               codec.crack(ciphertext) == self.message)
+
+        threads = [threading.Thread(target=work) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([True] * 800, results)
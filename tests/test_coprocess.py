@@ -0,0 +1,53 @@
+import io
+import unittest
+
+from caesarcipher.coprocess import ERROR_PREFIX
+from caesarcipher.coprocess import answer
+from caesarcipher.coprocess import serve
+
+
+class CoprocessTest(unittest.TestCase):
+    def run_commands(self, *commands):
+        destination = io.StringIO()
+        answered = serve(io.StringIO(''.join(command + '\n'
+                                             for command in commands)),
+                         destination)
+        self.assertEqual(len(commands), answered)
+        return destination.getvalue().split('\n')[:-1]
+
+    def test_encode_decode_crack(self):
+        self.assertEqual(['W kobh hc sbqcrs hvwg ghfwbu.',
+                          'I want to encode this string.',
+                          'I want to encode this string.'],
+                         self.run_commands(
+                             'encode 14 I want to encode this string.',
+                             'decode 14 W kobh hc sbqcrs hvwg ghfwbu.',
+                             'crack W kobh hc sbqcrs hvwg ghfwbu.'))
+
+    def test_text_keeps_spaces(self):
+        self.assertEqual(['  b  '], self.run_commands('encode 1   a  '))
+
+    def test_codecs_bounded_by_alphabet(self):
+        codecs = {}
+        for offset in range(-100, 100):
+            answer('encode {0} a'.format(offset), codecs)
+        self.assertEqual(26, len(codecs))
+        self.assertEqual('b', answer('encode 27 a', codecs))
+
+    def test_errors_answer_one_line(self):
+        answers = self.run_commands('rot13 abc', 'encode x abc',
+                                    'encode -1 b')
+        self.assertTrue(answers[0].startswith(ERROR_PREFIX))
+        self.assertTrue(answers[1].startswith(ERROR_PREFIX))
+        self.assertEqual('a', answers[2])
+
+    def test_flushes_every_answer(self):
+        class Recorder(io.StringIO):
+            flushes = 0
+
+            def flush(self):
+                self.flushes += 1
+
+        destination = Recorder()
+        serve(io.StringIO('encode 1 a\nencode 2 a\n'), destination)
+        self.assertEqual(2, destination.flushes)
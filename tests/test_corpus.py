@@ -0,0 +1,84 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from caesarcipher import CaesarCipher
+from caesarcipher.corpus import check_destinations
+from caesarcipher.corpus import count_messages
+from caesarcipher.corpus import crack_corpus
+from caesarcipher.corpus import destination_paths
+from caesarcipher.corpus import expand_paths
+from caesarcipher.engine import shift
+from caesarcipher.language import english
+
+
+class CorpusTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.plaintexts = ["good night", "see you soon", "meet at noon",
+                           "bring the map", "call me", "buy milk"]
+        self.paths = []
+        for i, plaintext in enumerate(self.plaintexts):
+            folder = os.path.join(self.directory, 'in', 'ab'[i % 2])
+            if not os.path.isdir(folder):
+                os.makedirs(folder)
+            ciphertext = shift(plaintext, 9).encode('ascii')
+            path = os.path.join(folder, 'm{0}.txt'.format(i))
+            if i % 3 == 0:
+                path += '.gz'
+                ciphertext = gzip.compress(ciphertext)
+            with open(path, 'wb') as output:
+                output.write(ciphertext)
+            self.paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_expand_paths(self):
+        root = os.path.join(self.directory, 'in')
+        self.assertEqual(sorted(self.paths), sorted(expand_paths([root])))
+        self.assertEqual(4, len(expand_paths(
+            [os.path.join(root, '**', '*.txt'), self.paths[1]])))
+
+    def test_destination_paths(self):
+        paths = [os.path.join('x', 'a', 'm.txt'),
+                 os.path.join('x', 'b', 'm.txt')]
+        self.assertEqual([os.path.join('out', 'a', 'm.txt'),
+                          os.path.join('out', 'b', 'm.txt')],
+                         destination_paths(paths, 'out'))
+
+    def test_crack_corpus(self):
+        # At least one message is too short to crack on its own.
+        self.assertTrue(any(CaesarCipher(shift(plaintext, 9)).cracked !=
+                            plaintext for plaintext in self.plaintexts))
+        output = os.path.join(self.directory, 'out')
+        offset = crack_corpus([os.path.join(self.directory, 'in')], english(),
+                              workers=2, directory=output)
+        self.assertEqual(9, offset)
+        with gzip.open(os.path.join(output, 'a', 'm0.txt.gz')) as source:
+            self.assertEqual(b'good night', source.read())
+        with open(os.path.join(output, 'b', 'm1.txt')) as source:
+            self.assertEqual('see you soon', source.read())
+
+    def test_crack_corpus_without_files(self):
+        self.assertRaises(ValueError, crack_corpus,
+                          [os.path.join(self.directory, 'missing')],
+                          english())
+
+    def test_check_destinations(self):
+        root = os.path.join(self.directory, 'in')
+        check_destinations(self.paths, os.path.join(self.directory, 'out'),
+                           [root])
+        self.assertRaises(ValueError, check_destinations, self.paths, root)
+        self.assertRaises(ValueError, check_destinations, self.paths,
+                          os.path.join(root, 'out'), [root])
+        self.assertRaises(ValueError, crack_corpus, [root], english(),
+                          directory=root)
+        with open(self.paths[1], 'rb') as source:
+            self.assertEqual(shift('see you soon', 9).encode('ascii'),
+                             source.read())
+
+    def test_count_messages(self):
+        self.assertEqual([2, 1, 1], count_messages(['Ab', b'ac'])[:3])
@@ -0,0 +1,100 @@
+import unittest
+
+from caesarcipher import CaesarCipher
+from caesarcipher.crack import confidence
+from caesarcipher.crack import crack_candidates
+from caesarcipher.crack import letter_counts
+from caesarcipher.crack import letter_weights
+from caesarcipher.crack import sample_crack
+from caesarcipher.crack import score_offsets
+from caesarcipher.stats import Stats
+
+
+class LetterCountsTest(unittest.TestCase):
+    def test_letter_counts_case_insensitive(self):
+        counts = letter_counts("AaBz!")
+        self.assertEqual(2, counts[0])
+        self.assertEqual(1, counts[1])
+        self.assertEqual(1, counts[25])
+        self.assertEqual(4, sum(counts))
+
+    def test_letter_counts_bytes(self):
+        self.assertEqual(letter_counts("Hello, World"),
+                         letter_counts(b"Hello, World"))
+
+
+class ScoreOffsetsTest(unittest.TestCase):
+    def test_score_matches_calculate_entropy(self):
+        message = "The quick brown fox jumps over the lazy dog."
+        cipher = CaesarCipher(message)
+        weights = letter_weights(None, cipher.frequency)
+        scores = score_offsets(letter_counts(message), weights)
+        self.assertAlmostEqual(cipher.calculate_entropy(message), scores[0])
+
+
+class CrackCandidatesTest(unittest.TestCase):
+    def setUp(self):
+        self.ciphertext = "Rfc osgai zpmul dmv hsknq mtcp rfc jyxw bme."
+        self.frequency = CaesarCipher().frequency
+
+    def test_crack_candidates_ranked(self):
+        candidates = crack_candidates(self.ciphertext, self.frequency, k=3)
+        self.assertEqual(3, len(candidates))
+        self.assertEqual(24, candidates[0].offset)
+        self.assertTrue(candidates[0].score <= candidates[1].score)
+        self.assertEqual("The quick brown fox jumps over the lazy dog.",
+                         candidates[0].plaintext)
+
+    def test_crack_candidates_lazy(self):
+        candidate = crack_candidates(self.ciphertext, self.frequency)[0]
+        self.assertEqual(None, candidate._plaintext)
+
+    def test_crack_candidates_method(self):
+        cipher = CaesarCipher(self.ciphertext)
+        candidates = cipher.crack_candidates(k=26)
+        self.assertEqual(26, len(candidates))
+        self.assertEqual(list(range(26)),
+                         sorted(candidate.offset for candidate in candidates))
+        self.assertEqual(self.ciphertext, cipher.message)
+
+    def test_cracked_sets_offset(self):
+        cipher = CaesarCipher(self.ciphertext)
+        cipher.cracked
+        self.assertEqual(-24, cipher.offset)
+
+
+class SampleCrackTest(unittest.TestCase):
+    def setUp(self):
+        self.frequency = CaesarCipher().frequency
+        self.plaintext = ("London calling to the faraway towns, now war is "
+                          "declared and battle come down. ") * 2000
+
+    def test_confidence(self):
+        self.assertAlmostEqual(0.5, confidence([1.0, 1.0]))
+        self.assertTrue(confidence([0.0, 40.0, 50.0]) > 0.999)
+
+    def test_sample_crack(self):
+        ciphertext = CaesarCipher(self.plaintext, offset=9).encoded
+        candidate = sample_crack(ciphertext, self.frequency, sample_size=256)
+        self.assertEqual(9, candidate.offset)
+        self.assertTrue(candidate.confidence >= 0.999)
+        self.assertEqual(self.plaintext, candidate.plaintext)
+
+    def test_sample_crack_widens_when_ambiguous(self):
+        stats = Stats()
+        candidate = sample_crack("Yxo", self.frequency, sample_size=1,
+                                 stats=stats)
+        self.assertEqual(10, candidate.offset)
+        self.assertTrue(candidate.confidence < 0.999)
+        self.assertEqual(26, stats.candidates)
+
+    def test_sample_crack_bytes(self):
+        ciphertext = CaesarCipher(self.plaintext, offset=4).encoded
+        candidate = sample_crack(ciphertext.encode('ascii'), self.frequency)
+        self.assertEqual(4, candidate.offset)
+
+    def test_cracked_with_sample_size(self):
+        ciphertext = CaesarCipher(self.plaintext, offset=21).encoded
+        cipher = CaesarCipher(ciphertext, sample_size=128)
+        self.assertEqual(self.plaintext, cipher.cracked)
+        self.assertEqual(-21, cipher.offset)
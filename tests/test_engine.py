@@ -0,0 +1,60 @@
+import string
+import unittest
+
+from caesarcipher.engine import compile_byte_table
+from caesarcipher.engine import compile_table
+from caesarcipher.engine import shift
+
+
+def reference_shift(message, offset, alphabet):
+    # Letter by letter implementation the engine replaced.
+    ciphered_message_list = list(message)
+    for i, letter in enumerate(ciphered_message_list):
+        if letter.isalpha():
+            if letter.isupper():
+                letters = [character.upper() for character in alphabet]
+            else:
+                letters = alphabet
+            value = letters.index(letter)
+            ciphered_message_list[i] = letters[(value + offset) % 26]
+    return ''.join(ciphered_message_list)
+
+
+class EngineShiftTest(unittest.TestCase):
+    def setUp(self):
+        self.message = "The quick brown fox jumps over the lazy dog. 123!"
+
+    def test_shift_matches_reference(self):
+        alphabet = tuple(string.ascii_lowercase)
+        for offset in range(-30, 30):
+            self.assertEqual(reference_shift(self.message, offset, alphabet),
+                             shift(self.message, offset))
+
+    def test_shift_matches_reference_arbitrary_alphabet(self):
+        alphabet = 'ueyplkizjgncdbqshoaxmrwftv'
+        for offset in range(0, 26):
+            self.assertEqual(reference_shift(self.message, offset, alphabet),
+                             shift(self.message, offset, alphabet))
+
+    def test_shift_bytes(self):
+        encoded = shift(self.message.encode('ascii'), 7)
+        self.assertEqual(shift(self.message, 7).encode('ascii'), encoded)
+
+    def test_shift_bytearray(self):
+        encoded = shift(bytearray(b"Twilio"), 1)
+        self.assertEqual(bytearray(b"Uxjmjp"), encoded)
+
+    def test_shift_bytes_non_ascii_alphabet(self):
+        self.assertRaises(ValueError, shift, b"abc", 1, u'\xe0bcdefghij')
+
+    def test_shift_letter_with_long_uppercase(self):
+        # 'ß'.upper() is 'SS', which has no single character to map to.
+        alphabet = string.ascii_lowercase + u'\xdf'
+        encoded = shift(u'stra\xdfe Stra\xdfe', 3, alphabet)
+        self.assertEqual(u'vwudch Vwudch', encoded)
+        self.assertEqual(u'stra\xdfe Stra\xdfe', shift(encoded, -3, alphabet))
+
+    def test_tables_cached_by_equivalent_offset(self):
+        self.assertTrue(compile_table(None, 3) is compile_table(None, 29))
+        self.assertTrue(compile_byte_table(None, -1) is
+                        compile_byte_table(None, 25))
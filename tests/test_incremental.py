@@ -0,0 +1,59 @@
+import unittest
+
+from caesarcipher import CaesarCipher
+from caesarcipher.incremental import IncrementalCracker
+
+
+class IncrementalCrackerTest(unittest.TestCase):
+    def setUp(self):
+        self.plaintext = ("It was the best of times, it was the worst of "
+                          "times, it was the age of wisdom. ") * 20
+        self.ciphertext = CaesarCipher(self.plaintext, offset=9).encoded
+
+    def feed_all(self, cracker, text, size):
+        output = []
+        for i in range(0, len(text), size):
+            output.append(cracker.feed(text[i:i + size]))
+        output.append(cracker.close())
+        return output
+
+    def test_locks_early_and_streams(self):
+        cracker = IncrementalCracker()
+        output = self.feed_all(cracker, self.ciphertext, 16)
+        self.assertEqual(self.plaintext, ''.join(output))
+        self.assertEqual(9, cracker.offset)
+        self.assertTrue(cracker.locked)
+        # Once locked, each chunk comes straight back out.
+        self.assertTrue(output[-2])
+        self.assertTrue(cracker.confidence >= cracker.threshold)
+
+    def test_holds_back_until_confident(self):
+        cracker = IncrementalCracker()
+        self.assertEqual(None, cracker.offset)
+        self.assertEqual(0.0, cracker.confidence)
+        self.assertEqual('', cracker.feed(self.ciphertext[:10]))
+        self.assertFalse(cracker.locked)
+        self.assertEqual(sum(cracker.counts),
+                         sum(c.isalpha() for c in self.ciphertext[:10]))
+
+    def test_bytes(self):
+        cracker = IncrementalCracker()
+        output = self.feed_all(cracker, self.ciphertext.encode('ascii'), 7)
+        self.assertEqual(self.plaintext.encode('ascii'), b''.join(output))
+
+    def test_max_buffer_forces_lock(self):
+        cracker = IncrementalCracker(threshold=1.1, max_buffer=100)
+        output = self.feed_all(cracker, self.ciphertext, 50)
+        self.assertEqual('', output[0])
+        self.assertTrue(output[1])
+        self.assertEqual(self.plaintext, ''.join(output))
+
+    def test_uses_language_model(self):
+        cracker = IncrementalCracker(CaesarCipher().language)
+        self.assertEqual(self.plaintext,
+                         ''.join(self.feed_all(cracker, self.ciphertext, 64)))
+
+    def test_empty(self):
+        cracker = IncrementalCracker()
+        self.assertEqual('', cracker.close())
+        self.assertEqual(0, cracker.offset)
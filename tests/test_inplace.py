@@ -0,0 +1,52 @@
+import mmap
+import os
+import tempfile
+import unittest
+
+from caesarcipher import CaesarCipher
+from caesarcipher import inplace
+
+
+class InPlaceTest(unittest.TestCase):
+    def setUp(self):
+        self.plaintext = (b"The quick brown fox jumps over the lazy dog.\n" *
+                          4000)
+        handle, self.path = tempfile.mkstemp()
+        with os.fdopen(handle, 'wb') as output:
+            output.write(self.plaintext)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def read(self):
+        with open(self.path, 'rb') as handle:
+            return handle.read()
+
+    def test_byte_ranges_cover_file(self):
+        ranges = inplace.byte_ranges(10, 3, block_size=1)
+        self.assertEqual([(0, 4), (4, 8), (8, 10)], ranges)
+        self.assertEqual([], inplace.byte_ranges(0, 3))
+
+    def test_shift_file(self):
+        inplace.shift_file(self.path, 7, workers=1)
+        expected = CaesarCipher(self.plaintext.decode('ascii'),
+                                offset=7).encoded
+        self.assertEqual(expected.encode('ascii'), self.read())
+
+    def test_shift_file_windows_and_workers(self):
+        block_size = mmap.ALLOCATIONGRANULARITY + 3
+        inplace.shift_file(self.path, 5, workers=3, block_size=block_size)
+        inplace.shift_file(self.path, -5, workers=2, block_size=block_size)
+        self.assertEqual(self.plaintext, self.read())
+
+    def test_crack_file(self):
+        inplace.shift_file(self.path, 17, workers=1)
+        offset = inplace.crack_file(self.path, CaesarCipher().frequency,
+                                    workers=2, block_size=4096)
+        self.assertEqual(17, offset)
+        self.assertEqual(self.plaintext, self.read())
+
+    def test_shift_empty_file(self):
+        with open(self.path, 'wb'):
+            pass
+        self.assertEqual(0, inplace.shift_file(self.path, 3))
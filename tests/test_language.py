@@ -0,0 +1,79 @@
+import math
+import pickle
+import unittest
+
+from caesarcipher import CaesarCipher
+from caesarcipher.crack import crack_candidates
+from caesarcipher.language import LanguageModel
+from caesarcipher.language import english
+
+
+class LanguageModelTest(unittest.TestCase):
+    def test_english_shared(self):
+        self.assertTrue(english() is english())
+        self.assertTrue(CaesarCipher().language is CaesarCipher().language)
+
+    def test_english_weights_match_frequency(self):
+        model = english()
+        for letter, probability in CaesarCipher.frequency.items():
+            self.assertEqual(- math.log(probability) / math.log(2),
+                             model.weights[model.index[letter]])
+
+    def test_english_has_bigrams(self):
+        model = english()
+        index = model.index
+        self.assertTrue(model.bigram_weights[index['q'] * 26 + index['u']] <
+                        model.bigram_weights[index['q'] * 26 + index['z']])
+
+    def test_dumps_loads(self):
+        model = LanguageModel.train('test', CaesarCipher.frequency,
+                                    "the quick brown fox")
+        loaded = LanguageModel.loads(model.dumps())
+        self.assertEqual(model.digest, loaded.digest)
+        self.assertEqual(list(model.bigram_weights),
+                         list(loaded.bigram_weights))
+
+    def test_train_words_weights_by_count(self):
+        model = LanguageModel.train('test', CaesarCipher.frequency,
+                                    "the the the fox")
+        counted = LanguageModel.train_words('test', CaesarCipher.frequency,
+                                            [('the', 3), ('fox', 1)])
+        self.assertEqual(model.digest, counted.digest)
+
+    def test_loads_rejects_garbage(self):
+        self.assertRaises(ValueError, LanguageModel.loads, b'NOPE' * 4)
+
+    def test_pickle(self):
+        model = pickle.loads(pickle.dumps(english()))
+        self.assertEqual(english().digest, model.digest)
+
+    def test_unigram_score_text(self):
+        model = LanguageModel.from_frequency('unigram', CaesarCipher.frequency)
+        message = "The quick brown fox jumps over the lazy dog."
+        self.assertAlmostEqual(CaesarCipher().calculate_entropy(message),
+                               model.score_text(message))
+
+    def test_weights_for_unknown_letter(self):
+        model = english()
+        weights = model.weights_for(('a', u'\xe9'))
+        self.assertEqual(max(model.weights), weights[1])
+
+    def test_bigrams_crack_short_text(self):
+        ciphertext = CaesarCipher("might", offset=3).encoded
+        unigram = LanguageModel.from_frequency('unigram',
+                                               CaesarCipher.frequency)
+        self.assertNotEqual("might",
+                            crack_candidates(ciphertext, unigram)[0].plaintext)
+        self.assertEqual("might",
+                         crack_candidates(ciphertext, english())[0].plaintext)
+
+    def test_rerank_keeps_unigram_score(self):
+        ciphertext = "Khoor Zruog"
+        unigram = LanguageModel.from_frequency('unigram',
+                                               CaesarCipher.frequency)
+        expected = dict((candidate.offset, candidate.score)
+                        for candidate in crack_candidates(ciphertext, unigram,
+                                                          k=26))
+        for candidate in crack_candidates(ciphertext, english(), k=5):
+            self.assertEqual(expected[candidate.offset], candidate.score)
+            self.assertTrue(candidate.bigram_score is not None)
@@ -0,0 +1,66 @@
+import unittest
+
+from caesarcipher import CaesarCipher
+from caesarcipher import numpy_backend
+
+
+@unittest.skipUnless(numpy_backend.available(), "NumPy is not installed.")
+class NumpyBackendTest(unittest.TestCase):
+    def setUp(self):
+        self.message = "The quick brown fox jumps over the lazy dog."
+        self.alphabet = 'ueyplkizjgncdbqshoaxmrwftv'
+
+    def test_shift_bytes(self):
+        expected = CaesarCipher(self.message, offset=7).encoded
+        self.assertEqual(expected.encode('ascii'),
+                         numpy_backend.shift(self.message.encode('ascii'), 7))
+
+    def test_shift_arbitrary_alphabet(self):
+        expected = CaesarCipher(self.message, offset=7,
+                                alphabet=self.alphabet).encoded
+        data = bytearray(self.message.encode('ascii'))
+        self.assertEqual(expected.encode('ascii'),
+                         numpy_backend.shift(data, 7, self.alphabet))
+
+    def test_shift_in_place(self):
+        array = numpy_backend.numpy.frombuffer(
+            bytearray(self.message.encode('ascii')), dtype='uint8')
+        numpy_backend.shift(array, 3, out=array)
+        numpy_backend.shift(memoryview(array), -3, out=array)
+        self.assertEqual(self.message.encode('ascii'), array.tobytes())
+
+    def test_letter_counts(self):
+        from caesarcipher.crack import letter_counts
+        self.assertEqual(letter_counts(self.message),
+                         numpy_backend.letter_counts(
+                             self.message.encode('ascii')))
+
+    def test_crack(self):
+        frequency = CaesarCipher().frequency
+        ciphertext = CaesarCipher(self.message, offset=19,
+                                  alphabet=self.alphabet).encoded
+        offset, score = numpy_backend.crack(ciphertext.encode('ascii'),
+                                            frequency, self.alphabet)
+        self.assertEqual(19, offset)
+        self.assertAlmostEqual(
+            CaesarCipher().calculate_entropy(self.message), score)
+
+    def test_rejects_wide_arrays(self):
+        array = numpy_backend.numpy.zeros(4, dtype='int32')
+        self.assertRaises(ValueError, numpy_backend.shift, array, 1)
+
+
+class MissingNumpyTest(unittest.TestCase):
+    def setUp(self):
+        self.numpy = numpy_backend.numpy
+        numpy_backend.numpy = None
+
+    def tearDown(self):
+        numpy_backend.numpy = self.numpy
+
+    def test_raises_import_error(self):
+        self.assertFalse(numpy_backend.available())
+        self.assertRaises(ImportError, numpy_backend.shift, b'abc', 1)
+        self.assertRaises(ImportError, numpy_backend.letter_counts, b'abc')
+        self.assertRaises(ImportError, numpy_backend.score_offsets,
+                          [0] * 26, [0.0] * 26)
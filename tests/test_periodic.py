@@ -0,0 +1,73 @@
+import unittest
+
+from caesarcipher import CaesarCipher
+from caesarcipher.periodic import column_counts
+from caesarcipher.periodic import crack_periodic
+from caesarcipher.periodic import decode_periodic
+from caesarcipher.periodic import encode_periodic
+from caesarcipher.periodic import index_of_coincidence
+from caesarcipher.periodic import key_lengths
+from caesarcipher.periodic import letter_positions
+from caesarcipher.periodic import normalize_key
+from caesarcipher.periodic import shortest_period
+
+
+PLAINTEXT = (
+    "It was the best of times, it was the worst of times, it was the age of "
+    "wisdom, it was the age of foolishness, it was the epoch of belief, it "
+    "was the epoch of incredulity, it was the season of Light, it was the "
+    "season of Darkness, it was the spring of hope, it was the winter of "
+    "despair, we had everything before us, we had nothing before us, we "
+    "were all going direct to Heaven, we were all going direct the other "
+    "way - in short, the period was so far like the present period, that "
+    "some of its noisiest authorities insisted on its being received, for "
+    "good or for evil, in the superlative degree of comparison only.")
+
+
+class PeriodicTest(unittest.TestCase):
+    def test_encode_decode(self):
+        self.assertEqual('Lxfopv ef rnhr', encode_periodic('Attack at dawn',
+                                                           'lemon'))
+        self.assertEqual('Attack at dawn', decode_periodic('Lxfopv ef rnhr',
+                                                           (11, 4, 12, 14,
+                                                            13)))
+
+    def test_single_offset_is_caesar(self):
+        self.assertEqual(CaesarCipher(PLAINTEXT, offset=7).encoded,
+                         encode_periodic(PLAINTEXT, [7]))
+
+    def test_empty_key(self):
+        self.assertRaises(ValueError, encode_periodic, 'abc', [])
+
+    def test_letter_positions(self):
+        self.assertEqual([0, 1, 25], letter_positions('A b-z!'))
+
+    def test_column_counts(self):
+        columns = column_counts([0, 1, 0, 2], 2, 3)
+        self.assertEqual([[2, 0, 0], [0, 1, 1]], columns)
+
+    def test_index_of_coincidence(self):
+        self.assertEqual(1.0, index_of_coincidence([5, 0]))
+        self.assertEqual(0.0, index_of_coincidence([1, 1]))
+        self.assertEqual(0.0, index_of_coincidence([1]))
+
+    def test_key_lengths_rank_true_length(self):
+        positions = letter_positions(encode_periodic(PLAINTEXT, 'key'))
+        ranked = [length for length, _ in key_lengths(positions, 26)]
+        self.assertTrue(ranked.index(3) < ranked.index(2))
+        self.assertTrue(ranked.index(3) < ranked.index(4))
+
+    def test_shortest_period(self):
+        self.assertEqual((1, 2), shortest_period((1, 2, 1, 2, 1, 2)))
+        self.assertEqual((1, 2, 3), shortest_period((1, 2, 3)))
+
+    def test_crack(self):
+        for key in ('lemon', 'key', (9,)):
+            candidate = crack_periodic(encode_periodic(PLAINTEXT, key))
+            self.assertEqual(PLAINTEXT, candidate.plaintext)
+            self.assertEqual(normalize_key(key), candidate.key)
+
+    def test_crack_known_length(self):
+        candidate = crack_periodic(encode_periodic(PLAINTEXT, 'lemon'),
+                                   key_length=5)
+        self.assertEqual((11, 4, 12, 14, 13), candidate.key)
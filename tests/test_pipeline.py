@@ -0,0 +1,68 @@
+import io
+import threading
+import unittest
+
+from caesarcipher.pipeline import BackgroundWriter
+from caesarcipher.pipeline import prefetch
+
+
+class BrokenStream(io.RawIOBase):
+    def __init__(self, failures=None):
+        self.failures = failures
+        self.written = []
+
+    def writable(self):
+        return True
+
+    def write(self, chunk):
+        if self.failures is None or self.failures:
+            if self.failures:
+                self.failures -= 1
+            raise IOError("Disk full.")
+        self.written.append(chunk)
+        return len(chunk)
+
+
+class PipelineTest(unittest.TestCase):
+    def test_prefetch_keeps_order(self):
+        self.assertEqual(list(range(100)), list(prefetch(range(100), 2)))
+
+    def test_prefetch_raises_producer_errors(self):
+        def failing():
+            yield 1
+            raise ValueError("Bad chunk.")
+
+        items = prefetch(failing())
+        self.assertEqual(1, next(items))
+        self.assertRaises(ValueError, next, items)
+
+    def test_prefetch_stops_when_abandoned(self):
+        before = threading.active_count()
+        items = prefetch(iter(range(1000)), 1)
+        next(items)
+        items.close()
+        self.assertEqual(before, threading.active_count())
+
+    def test_background_writer(self):
+        destination = io.BytesIO()
+        writer = BackgroundWriter(destination, 1)
+        for chunk in (b'a', b'b', b'c'):
+            writer.write(chunk)
+        writer.flush()
+        self.assertEqual(b'abc', destination.getvalue())
+        writer.close()
+
+    def test_background_writer_raises_errors(self):
+        writer = BackgroundWriter(BrokenStream())
+        writer.write(b'a')
+        self.assertRaises(IOError, writer.close)
+
+    def test_background_writer_errors_stick(self):
+        destination = BrokenStream(failures=1)
+        writer = BackgroundWriter(destination)
+        writer.write(b'a')
+        self.assertRaises(IOError, writer.flush)
+        self.assertRaises(IOError, writer.write, b'b')
+        self.assertRaises(IOError, writer.flush)
+        self.assertRaises(IOError, writer.close)
+        self.assertEqual([], destination.written)
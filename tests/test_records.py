@@ -0,0 +1,103 @@
+import io
+import json
+import unittest
+
+from caesarcipher import CaesarCipher
+from caesarcipher.records import crack_records_corpus
+from caesarcipher.records import process_record
+from caesarcipher.records import process_records
+from caesarcipher.stats import Stats
+
+
+class RecordsTest(unittest.TestCase):
+    def setUp(self):
+        self.plaintexts = ["London calling to the faraway towns",
+                           "Now war is declared and battle come down",
+                           "London calling to the underworld"]
+        self.ciphertexts = [CaesarCipher(plaintext, offset=i + 3).encoded
+                            for i, plaintext in enumerate(self.plaintexts)]
+
+    def test_process_record_missing_field(self):
+        record = {'id': 1}
+        self.assertEqual({'id': 1},
+                         process_record(record, 'message', 'crack'))
+
+    def test_jsonl_crack(self):
+        source = io.StringIO(''.join(
+            json.dumps({'id': i, 'message': ciphertext}) + '\n'
+            for i, ciphertext in enumerate(self.ciphertexts)))
+        destination = io.StringIO()
+        written = process_records(source, destination, 'jsonl', 'message',
+                                  'crack')
+        self.assertEqual(3, written)
+        records = [json.loads(line)
+                   for line in destination.getvalue().splitlines()]
+        self.assertEqual(self.plaintexts,
+                         [record['message'] for record in records])
+        self.assertEqual([3, 4, 5], [record['offset'] for record in records])
+        self.assertEqual([0, 1, 2], [record['id'] for record in records])
+        self.assertTrue(all('score' in record for record in records))
+
+    def test_jsonl_values_that_are_not_objects(self):
+        source = io.StringIO('[1, 2]\n"text"\n3\nnull\n' +
+                             json.dumps({'message': self.ciphertexts[0]}))
+        destination = io.StringIO()
+        stats = Stats()
+        written = process_records(source, destination, 'jsonl', 'message',
+                                  'crack', stats=stats)
+        self.assertEqual(5, written)
+        lines = destination.getvalue().splitlines()
+        self.assertEqual(['[1, 2]', '"text"', '3', 'null'], lines[:4])
+        self.assertEqual(self.plaintexts[0], json.loads(lines[4])['message'])
+        self.assertEqual(len(self.plaintexts[0]), stats.characters)
+        self.assertTrue(stats.timings['cipher'] > 0)
+
+    def test_jsonl_crack_workers_keep_order(self):
+        lines = [json.dumps({'message': ciphertext})
+                 for ciphertext in self.ciphertexts] * 20
+        destination = io.StringIO()
+        process_records(io.StringIO('\n'.join(lines)), destination, 'jsonl',
+                        'message', 'crack', workers=2, chunksize=7)
+        records = [json.loads(line)
+                   for line in destination.getvalue().splitlines()]
+        self.assertEqual(self.plaintexts * 20,
+                         [record['message'] for record in records])
+
+    def test_csv_encode_decode(self):
+        source = io.StringIO('id,message\r\n1,Twilio\r\n2,"Hello, there"\r\n')
+        encoded = io.StringIO()
+        process_records(source, encoded, 'csv', 'message', 'encode',
+                        offset=1)
+        self.assertEqual('id,message\r\n1,Uxjmjp\r\n2,"Ifmmp, uifsf"\r\n',
+                         encoded.getvalue())
+        decoded = io.StringIO()
+        process_records(io.StringIO(encoded.getvalue()), decoded, 'csv',
+                        'message', 'decode', offset=1)
+        self.assertEqual(source.getvalue(), decoded.getvalue())
+
+    def test_csv_crack_adds_columns(self):
+        source = io.StringIO('message\r\nYxo\r\n')
+        destination = io.StringIO()
+        process_records(source, destination, 'csv', 'message', 'crack')
+        lines = destination.getvalue().splitlines()
+        self.assertEqual('message,offset,score', lines[0])
+        self.assertTrue(lines[1].startswith('One,10,'))
+
+    def test_unknown_format(self):
+        self.assertRaises(ValueError, process_records, io.StringIO(),
+                          io.StringIO(), 'xml', 'message', 'crack')
+
+    def test_crack_records_corpus(self):
+        ciphertexts = [CaesarCipher(plaintext, offset=4).encoded
+                       for plaintext in ("good night", "see you soon",
+                                         "meet at noon", "call me")]
+        source = io.StringIO(''.join(
+            json.dumps({'id': i, 'message': ciphertext}) + '\n'
+            for i, ciphertext in enumerate(ciphertexts)))
+        destination = io.StringIO()
+        offset = crack_records_corpus(source, destination, 'jsonl',
+                                      'message')
+        self.assertEqual(4, offset)
+        records = [json.loads(line)
+                   for line in destination.getvalue().splitlines()]
+        self.assertEqual("good night", records[0]['message'])
@@ -0,0 +1,140 @@
+import asyncio
+import json
+import unittest
+from unittest.mock import patch
+
+from caesarcipher.server import LINE_LIMIT
+from caesarcipher.server import OFFLOAD_SIZE
+from caesarcipher.server import CipherServer
+from caesarcipher.server import RequestError
+from caesarcipher.server import handle
+
+
+def handle_or_fail(request, codecs=None):
+    # Stands in for a handle() bug that only some requests trigger.
+    if request.get('fail'):
+        raise TypeError("Failed on purpose.")
+    return handle(request, codecs)
+
+
+class HandleTest(unittest.TestCase):
+    def test_encode(self):
+        response = handle({'op': 'encode', 'text': 'Twilio', 'offset': 1})
+        self.assertEqual({'result': 'Uxjmjp'}, response)
+
+    def test_crack(self):
+        response = handle({'op': 'crack', 'text': 'Yxo'})
+        self.assertEqual('One', response['result'])
+        self.assertEqual(10, response['offset'])
+
+    def test_shares_codecs(self):
+        codecs = {}
+        handle({'op': 'encode', 'text': 'a', 'offset': 1}, codecs)
+        handle({'op': 'decode', 'text': 'b', 'offset': 1}, codecs)
+        self.assertEqual(1, len(codecs))
+
+    def test_bad_requests(self):
+        self.assertRaises(RequestError, handle, {'op': 'shout', 'text': ''})
+        self.assertRaises(RequestError, handle, {'op': 'encode', 'text': 1})
+        self.assertRaises(RequestError, handle, {'op': 'encode', 'text': 'a',
+                                                 'offset': 'x'})
+        self.assertRaises(RequestError, handle, {'op': 'crack', 'text': 'a',
+                                                 'alphabet': ''})
+
+
+class CipherServerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await self.start_server(offload_size=100)
+
+    async def asyncTearDown(self):
+        await self.cipher_server.close()
+
+    async def start_server(self, **options):
+        self.cipher_server = CipherServer(workers=1, **options)
+        server = await self.cipher_server.start('127.0.0.1', 0)
+        self.port = server.sockets[0].getsockname()[1]
+
+    async def request_lines(self, requests):
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port,
+                                                       limit=LINE_LIMIT)
+        for request in requests:
+            writer.write(request + b'\n')
+        await writer.drain()
+        responses = [json.loads(await reader.readline())
+                     for request in requests]
+        writer.close()
+        return dict((response.get('id'), response)
+                    for response in responses)
+
+    async def test_pipelined_requests(self):
+        plaintext = "London calling to the faraway towns. " * 10
+        requests = [json.dumps({'id': 1, 'op': 'encode', 'text': plaintext,
+                                'offset': 9}).encode('utf-8'),
+                    json.dumps({'id': 2, 'op': 'decode', 'text': 'Uxjmjp',
+                                'offset': 1}).encode('utf-8')]
+        responses = await self.request_lines(requests)
+        ciphertext = responses[1]['result']
+        self.assertEqual('Twilio', responses[2]['result'])
+        self.assertTrue(responses[1]['latency_ms'] >= 0)
+
+        crack = json.dumps({'id': 3, 'op': 'crack',
+                            'text': ciphertext}).encode('utf-8')
+        responses = await self.request_lines([crack])
+        self.assertEqual(plaintext, responses[3]['result'])
+        self.assertEqual(9, responses[3]['offset'])
+
+    async def test_errors(self):
+        responses = await self.request_lines([b'not json',
+                                              b'{"id": 5, "op": "nope"}'])
+        self.assertTrue('error' in responses[None])
+        self.assertTrue('error' in responses[5])
+
+    async def test_offloads_long_lines(self):
+        await self.cipher_server.close()
+        await self.start_server()
+        plaintext = "London calling to the faraway towns. " * 3000
+        self.assertTrue(len(plaintext) > max(OFFLOAD_SIZE, 1 << 16))
+        encode = json.dumps({'id': 1, 'op': 'encode', 'text': plaintext,
+                             'offset': 9}).encode('utf-8')
+        ciphertext = (await self.request_lines([encode]))[1]['result']
+        crack = json.dumps({'id': 2, 'op': 'crack',
+                            'text': ciphertext}).encode('utf-8')
+        responses = await self.request_lines([crack])
+        self.assertEqual(plaintext, responses[2]['result'])
+        self.assertEqual(9, responses[2]['offset'])
+
+    async def test_overlong_line(self):
+        await self.cipher_server.close()
+        await self.start_server(line_limit=1024)
+        overlong = json.dumps({'id': 1, 'op': 'encode', 'text': 'a' * 4096,
+                               'offset': 1}).encode('utf-8')
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        writer.write(overlong + b'\n')
+        writer.write(b'{"id": 2, "op": "decode", "text": "Uxjmjp", '
+                     b'"offset": 1}\n')
+        await writer.drain()
+        error = json.loads(await reader.readline())
+        response = json.loads(await reader.readline())
+        writer.close()
+        self.assertEqual(None, error['id'])
+        self.assertTrue('1024 bytes' in error['error'])
+        self.assertEqual('Twilio', response['result'])
+
+    async def test_unexpected_errors(self):
+        requests = [{'id': 1, 'op': 'encode', 'text': 'abc', 'offset': 1,
+                     'fail': True},
+                    {'id': 2, 'op': 'crack', 'text': 'Yxo ' * 30,
+                     'fail': True},
+                    {'id': 3, 'op': 'decode', 'text': 'Uxjmjp', 'offset': 1}]
+        with patch('caesarcipher.server.handle', handle_or_fail), \
+                self.assertLogs(level='ERROR'):
+            responses = await self.request_lines(
+                [json.dumps(request).encode('utf-8') for request in requests])
+            self.assertTrue('TypeError' in responses[1]['error'])
+            self.assertTrue('TypeError' in responses[2]['error'])
+            self.assertEqual('Twilio', responses[3]['result'])
+
+            # The batcher survives to answer later connections.
+            responses = await self.request_lines([json.dumps(
+                requests[2]).encode('utf-8')])
+            self.assertEqual('Twilio', responses[3]['result'])
@@ -0,0 +1,51 @@
+import unittest
+
+from caesarcipher import CaesarCipher
+from caesarcipher import shared
+from caesarcipher.engine import shift
+from caesarcipher.shared import parallel_shift
+
+
+class ParallelShiftTest(unittest.TestCase):
+    def setUp(self):
+        self.plaintext = (u"The quick brown fox jumps over the lazy dög. " *
+                          1000)
+
+    def test_parallel_str(self):
+        self.assertEqual(shift(self.plaintext, 5),
+                         parallel_shift(self.plaintext, 5, workers=2,
+                                        threshold=0))
+
+    def test_parallel_bytes(self):
+        data = self.plaintext.encode('utf-8')
+        result = parallel_shift(data, -3, workers=2, threshold=0)
+        self.assertTrue(isinstance(result, bytes))
+        self.assertEqual(shift(data, -3), result)
+        result = parallel_shift(bytearray(data), -3, workers=2, threshold=0)
+        self.assertTrue(isinstance(result, bytearray))
+
+    def test_empty(self):
+        for data in (u'', b'', bytearray()):
+            result = parallel_shift(data, 3, workers=2, threshold=0)
+            self.assertEqual(data, result)
+            self.assertEqual(type(data), type(result))
+
+    def test_serial_below_threshold(self):
+        calls = []
+        original = shared.shift
+
+        def recording_shift(*arguments):
+            calls.append(arguments)
+            return original(*arguments)
+
+        shared.shift = recording_shift
+        try:
+            parallel_shift(self.plaintext, 5, workers=2)
+            parallel_shift(self.plaintext, 5, u'αβγ', workers=2, threshold=0)
+        finally:
+            shared.shift = original
+        self.assertEqual(2, len(calls))
+
+    def test_cipher_uses_workers(self):
+        cipher = CaesarCipher(self.plaintext, offset=7, workers=2)
+        self.assertEqual(shift(self.plaintext, 7), cipher.encoded)
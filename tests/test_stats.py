@@ -0,0 +1,61 @@
+import io
+import unittest
+
+from caesarcipher import CaesarCipher
+from caesarcipher.stats import Stats
+from caesarcipher.stats import measure
+from caesarcipher.stream import crack_stream
+
+
+class StatsTest(unittest.TestCase):
+    def setUp(self):
+        self.message = "The quick brown fox jumps over the lazy dog."
+
+    def test_stage_accumulates(self):
+        stats = Stats()
+        with stats.stage('cipher'):
+            pass
+        with stats.stage('custom'):
+            pass
+        self.assertTrue(stats.timings['cipher'] >= 0.0)
+        self.assertTrue('custom' in stats.timings)
+
+    def test_measure_without_stats(self):
+        self.assertEqual(3, measure(None, 'cipher', len, 'abc'))
+
+    def test_encode_stats(self):
+        stats = Stats()
+        CaesarCipher(self.message, offset=3, stats=stats).encoded
+        self.assertEqual(len(self.message), stats.characters)
+        self.assertEqual(0, stats.candidates)
+
+    def test_crack_stats(self):
+        stats = Stats()
+        ciphertext = CaesarCipher(self.message, offset=3).encoded
+        CaesarCipher(ciphertext, stats=stats).cracked
+        self.assertEqual(26, stats.candidates)
+        self.assertTrue(stats.margin > 0)
+        self.assertAlmostEqual(
+            CaesarCipher().calculate_entropy(self.message), stats.score)
+        self.assertTrue(stats.throughput > 0)
+
+    def test_crack_stream_stats(self):
+        stats = Stats()
+        ciphertext = CaesarCipher(self.message, offset=3).encoded
+        crack_stream(io.BytesIO(ciphertext.encode('ascii')), io.BytesIO(),
+                     CaesarCipher().frequency, stats=stats)
+        self.assertEqual(len(self.message), stats.characters)
+        self.assertEqual(26, stats.candidates)
+
+    def test_report(self):
+        stats = Stats()
+        stats.record_crack([3.0, 1.0, 2.0])
+        report = stats.report()
+        self.assertTrue("Winning margin: 1.0" in report)
+        self.assertEqual(1.0, stats.as_dict()['score'])
+
+    def test_record_crack_of_chosen_offset(self):
+        stats = Stats()
+        stats.record_crack([3.0, 1.0, 2.0], 2)
+        self.assertEqual(2.0, stats.score)
+        self.assertEqual(-1.0, stats.margin)
@@ -0,0 +1,182 @@
+import bz2
+import gzip
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from caesarcipher import CaesarCipher
+from caesarcipher.stream import close_stream
+from caesarcipher.stream import count_stream
+from caesarcipher.stream import crack_stream
+from caesarcipher.stream import detect_compression
+from caesarcipher.stream import follow_stream
+from caesarcipher.stream import is_compressed
+from caesarcipher.stream import open_input
+from caesarcipher.stream import open_output
+from caesarcipher.stream import shift_stream
+
+
+class UnseekableStream(io.RawIOBase):
+    def __init__(self, data):
+        self.data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        chunk = self.data.read(len(buffer))
+        buffer[:len(chunk)] = chunk
+        return len(chunk)
+
+
+class StreamTest(unittest.TestCase):
+    def setUp(self):
+        self.plaintext = b"The quick brown fox jumps over the lazy dog.\n" * 50
+        self.frequency = CaesarCipher().frequency
+
+    def test_shift_stream_small_chunks(self):
+        destination = io.BytesIO()
+        shift_stream(io.BytesIO(self.plaintext), destination, 7,
+                     chunk_size=5)
+        expected = CaesarCipher(self.plaintext.decode('ascii'),
+                                offset=7).encoded
+        self.assertEqual(expected.encode('ascii'), destination.getvalue())
+
+    def test_shift_stream_non_ascii_alphabet(self):
+        alphabet = u'αβγδεζabcdefghijklmnopqrst'
+        source = io.BytesIO(u'αβ a'.encode('utf-8'))
+        destination = io.BytesIO()
+        shift_stream(source, destination, 1, alphabet, chunk_size=1)
+        self.assertEqual(u'βγ b',
+                         destination.getvalue().decode('utf-8'))
+
+    def test_count_stream(self):
+        counts = count_stream(io.BytesIO(b"AaB c"), chunk_size=2)
+        self.assertEqual([2, 1, 1], counts[:3])
+
+    def test_crack_stream_seekable(self):
+        ciphertext = io.BytesIO()
+        shift_stream(io.BytesIO(self.plaintext), ciphertext, 11)
+        ciphertext.seek(0)
+        destination = io.BytesIO()
+        offset = crack_stream(ciphertext, destination, self.frequency,
+                              chunk_size=64)
+        self.assertEqual(11, offset)
+        self.assertEqual(self.plaintext, destination.getvalue())
+
+    def test_crack_stream_unseekable(self):
+        ciphertext = io.BytesIO()
+        shift_stream(io.BytesIO(self.plaintext), ciphertext, 3)
+        source = io.BufferedReader(UnseekableStream(ciphertext.getvalue()))
+        destination = io.BytesIO()
+        offset = crack_stream(source, destination, self.frequency)
+        self.assertEqual(3, offset)
+        self.assertEqual(self.plaintext, destination.getvalue())
+
+    def test_follow_stream(self):
+        ciphertext = io.BytesIO()
+        shift_stream(io.BytesIO(self.plaintext), ciphertext, 5)
+        source = io.BufferedReader(UnseekableStream(ciphertext.getvalue()))
+        destination = io.BytesIO()
+        offset = follow_stream(source, destination, chunk_size=100)
+        self.assertEqual(5, offset)
+        self.assertEqual(self.plaintext, destination.getvalue())
+
+    def test_follow_stream_non_ascii_alphabet(self):
+        alphabet = u'αβγδεζabcdefghijklmnopqrst'
+        source = io.BytesIO(u'βγ b'.encode('utf-8'))
+        destination = io.BytesIO()
+        follow_stream(source, destination, alphabet=alphabet, chunk_size=1)
+        self.assertEqual(4, len(destination.getvalue().decode('utf-8')))
+
+    def test_crack_stream_sampled_file(self):
+        ciphertext = io.BytesIO()
+        shift_stream(io.BytesIO(self.plaintext), ciphertext, 6)
+        handle, path = tempfile.mkstemp()
+        try:
+            with os.fdopen(handle, 'wb') as output:
+                output.write(ciphertext.getvalue())
+            destination = io.BytesIO()
+            with open(path, 'rb') as source:
+                offset = crack_stream(source, destination, self.frequency,
+                                      sample_size=64)
+        finally:
+            os.remove(path)
+        self.assertEqual(6, offset)
+        self.assertEqual(self.plaintext, destination.getvalue())
+
+    def test_shift_stream_overlap(self):
+        destination = io.BytesIO()
+        shift_stream(io.BytesIO(self.plaintext), destination, 7,
+                     chunk_size=5, overlap=True)
+        expected = io.BytesIO()
+        shift_stream(io.BytesIO(self.plaintext), expected, 7)
+        self.assertEqual(expected.getvalue(), destination.getvalue())
+
+
+class CompressedStreamTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.plaintext = b"The quick brown fox jumps over the lazy dog.\n" * 50
+        self.frequency = CaesarCipher().frequency
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        for extension in ('.gz', '.bz2', '.xz'):
+            path = os.path.join(self.directory, 'ciphertext' + extension)
+            destination = open_output(path)
+            self.assertTrue(is_compressed(destination))
+            shift_stream(io.BytesIO(self.plaintext), destination, 9,
+                         chunk_size=64, overlap=True)
+            close_stream(destination)
+
+            source = open_input(path)
+            self.assertTrue(is_compressed(source))
+            plaintext = io.BytesIO()
+            offset = crack_stream(source, plaintext, self.frequency,
+                                  chunk_size=64, sample_size=64,
+                                  overlap=True)
+            close_stream(source)
+            self.assertEqual(9, offset)
+            self.assertEqual(self.plaintext, plaintext.getvalue())
+
+    def test_detected_by_content(self):
+        path = os.path.join(self.directory, 'ciphertext')
+        with open(path, 'wb') as output:
+            output.write(gzip.compress(self.plaintext))
+        source = open_input(path)
+        try:
+            self.assertEqual(self.plaintext, source.read())
+        finally:
+            close_stream(source)
+        self.assertEqual('gzip', detect_compression(
+            io.BufferedReader(io.BytesIO(gzip.compress(b'a')))))
+        self.assertEqual(None, detect_compression(
+            io.BufferedReader(io.BytesIO(self.plaintext))))
+
+    def test_text_starting_like_bz2(self):
+        path = os.path.join(self.directory, 'plaintext.txt')
+        with open(path, 'wb') as output:
+            output.write(b'BZh' + self.plaintext)
+        source = open_input(path)
+        try:
+            self.assertFalse(is_compressed(source))
+            self.assertEqual(b'BZh' + self.plaintext, source.read())
+        finally:
+            close_stream(source)
+        for data in (bz2.compress(self.plaintext), bz2.compress(b'')):
+            self.assertEqual('bz2', detect_compression(
+                io.BufferedReader(io.BytesIO(data))))
+
+    def test_explicit_compression(self):
+        path = os.path.join(self.directory, 'ciphertext.txt')
+        destination = open_output(path, 'xz')
+        destination.write(self.plaintext)
+        close_stream(destination)
+        with open(path, 'rb') as source:
+            self.assertEqual('xz', detect_compression(source))
+        self.assertRaises(ValueError, open_output, path, 'zip')
@@ -0,0 +1,100 @@
+import itertools
+import os
+import pickle
+import string
+import sys
+import unittest
+
+from caesarcipher import CaesarCipher
+from caesarcipher.crack import CrackCandidate
+from caesarcipher.crack import crack_candidates
+from caesarcipher.crack import rerank_words
+from caesarcipher.language import LanguageModel
+from caesarcipher.language import english
+from caesarcipher.words import WordFilter
+from caesarcipher.words import load_words
+
+
+TOOLS = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'tools')
+
+
+class WordFilterTest(unittest.TestCase):
+    def setUp(self):
+        self.words = WordFilter.build([['the', 'and'],
+                                       ['the', 'quick', 'brown', 'fox']])
+
+    def test_membership(self):
+        for word in ('the', 'and', 'Quick', 'FOX'):
+            self.assertTrue(word in self.words)
+        self.assertFalse('xqzv' in self.words)
+
+    def test_tiers(self):
+        self.assertEqual(2, self.words.tier('the'))
+        self.assertEqual(2, self.words.tier('and'))
+        self.assertEqual(1, self.words.tier('fox'))
+        self.assertEqual(0, self.words.tier('dog'))
+
+    def test_coverage(self):
+        self.assertEqual(2.0, self.words.coverage('The and, the!'))
+        self.assertEqual(1.0, self.words.coverage('quick brown'))
+        self.assertEqual(0.0, self.words.coverage('a b c 123'))
+        self.assertEqual(0.5, self.words.coverage('fox dog'))
+
+    def test_dumps_loads(self):
+        loaded = WordFilter.loads(self.words.dumps())
+        self.assertEqual(self.words.digest, loaded.digest)
+        self.assertEqual(1, loaded.tier('brown'))
+
+    def test_loads_rejects_garbage(self):
+        self.assertRaises(ValueError, WordFilter.loads, b'NOPE' * 4)
+
+    def test_english_is_mapped_and_shared(self):
+        words = load_words('english')
+        self.assertTrue(words is english().words)
+        self.assertTrue(words.path.endswith('english.words'))
+        self.assertEqual(2, words.tier('the'))
+        self.assertTrue('string' in words)
+        unpickled = pickle.loads(pickle.dumps(words))
+        self.assertEqual(words.digest, unpickled.digest)
+
+    def test_english_two_letter_words(self):
+        words = load_words('english')
+        pairs = [''.join(pair) for pair in
+                 itertools.product(string.ascii_lowercase, repeat=2)]
+        self.assertTrue(sum(1 for pair in pairs if pair in words) < 40)
+        self.assertTrue('of' in words)
+        for token in ('def', 'args', 'str', 'init', 'http', 'www', 'param'):
+            self.assertEqual(0, words.tier(token))
+
+    @unittest.skipUnless(os.path.isdir(TOOLS), "Build tools not present.")
+    def test_english_data_is_reproducible(self):
+        sys.path.insert(0, TOOLS)
+        try:
+            import build_english
+        finally:
+            sys.path.remove(TOOLS)
+        counts = build_english.read_counts()
+        self.assertEqual(english().digest,
+                         build_english.build_model(counts).digest)
+        self.assertEqual(load_words('english').digest,
+                         build_english.build_words(counts).digest)
+
+    def test_models_without_a_dictionary(self):
+        model = LanguageModel.from_frequency('test', CaesarCipher.frequency)
+        self.assertEqual(None, model.words)
+
+    def test_reranks_short_cracks(self):
+        # Letter frequencies alone rank another shift of this first.
+        ciphertext = CaesarCipher('good night', offset=9).encoded
+        candidate = crack_candidates(ciphertext, english())[0]
+        self.assertEqual('good night', candidate.plaintext)
+
+    def test_coverage_ranks_before_scores(self):
+        words = load_words('english')
+        candidates = [CrackCandidate('xqq', 0, 1.0),
+                      CrackCandidate('zzz', 0, 2.0),
+                      CrackCandidate('the', 0, 100.0)]
+        self.assertEqual(['the', 'xqq', 'zzz'],
+                         [candidate.plaintext for candidate in
+                          rerank_words(candidates, words)])
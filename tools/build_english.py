@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# Regenerates the English language model and word filter shipped in
+# caesarcipher/data from the word list next to this script.  Run from
+# anywhere:
+#
+#     python tools/build_english.py
+import argparse
+import os
+import sys
+
+TOOLS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TOOLS))
+
+from caesarcipher import CaesarCipher  # noqa: E402
+from caesarcipher.language import DATA_DIRECTORY  # noqa: E402
+from caesarcipher.language import LanguageModel  # noqa: E402
+from caesarcipher.words import MIN_LENGTH  # noqa: E402
+from caesarcipher.words import WordFilter  # noqa: E402
+
+
+SOURCE = os.path.join(TOOLS, 'english-words.txt')
+
+# Words of the list this frequent or more form the common tier of the word
+# filter.
+COMMON = 3000
+
+# Most of the 676 two letter strings turn up somewhere in a large word list,
+# so only these count as words.  Letting the rest in makes nearly any short
+# plaintext look like English.
+TWO_LETTER_WORDS = frozenset([
+    'ah', 'am', 'an', 'as', 'at', 'be', 'by', 'do', 'go', 'he', 'hi', 'if',
+    'in', 'is', 'it', 'me', 'my', 'no', 'of', 'oh', 'ok', 'on', 'or', 'ox',
+    'so', 'to', 'up', 'us', 'we', 'ye',
+])
+
+# Abbreviations and programming tokens the word list counts as words.  Code
+# is a common thing to encrypt, and none of these should make a wrong shift
+# of it look like English.
+EXCLUDED_WORDS = frozenset([
+    'def', 'dir', 'div', 'ftp', 'init', 'int', 'len', 'lib', 'obj', 'pkg',
+    'std', 'str', 'var',
+])
+
+
+def read_counts(path=SOURCE):
+    """Reads (word, count) pairs, most frequent first, skipping comments."""
+    counts = []
+    with open(path) as handle:
+        for line in handle:
+            if line.startswith('#') or not line.strip():
+                continue
+            word, count = line.split()
+            counts.append((word, int(count)))
+    return counts
+
+
+def build_model(counts):
+    """Builds the English model.
+
+    Unigrams are CaesarCipher.frequency, so scores stay comparable with the
+    plain unigram crack; bigrams are counted from the word list weighted by
+    each word's count.
+    """
+    return LanguageModel.train_words('english', CaesarCipher.frequency,
+                                     counts)
+
+
+def word_tiers(counts, common=COMMON):
+    """Splits the word list into the common and rare tiers of the filter.
+
+    Words shorter than the filter's MIN_LENGTH are dropped, as are two
+    letter words outside TWO_LETTER_WORDS and those in EXCLUDED_WORDS.
+    """
+    words = [word for word, _ in counts
+             if len(word) >= MIN_LENGTH and word not in EXCLUDED_WORDS and
+             (len(word) != 2 or word in TWO_LETTER_WORDS)]
+    return [words[:common], words[common:]]
+
+
+def build_words(counts, common=COMMON):
+    """Builds the English word filter."""
+    return WordFilter.build(word_tiers(counts, common))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the English "
+                                                 "language model and word "
+                                                 "filter.")
+    parser.add_argument('--common', type=int, default=COMMON,
+                        help="Number of words in the common tier.")
+    arguments = parser.parse_args()
+
+    counts = read_counts()
+    model = build_model(counts)
+    path = os.path.join(DATA_DIRECTORY, 'english.lm')
+    model.save(path)
+    print("Wrote {0} ({1})".format(path, model.digest))
+    words = build_words(counts, arguments.common)
+    path = os.path.join(DATA_DIRECTORY, 'english.words')
+    words.save(path)
+    print("Wrote {0} ({1})".format(path, words.digest))
+
+
+if __name__ == '__main__':
+    main()